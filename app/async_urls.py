@@ -0,0 +1,11 @@
+"""URLs con las vistas asincronas de user y recipe, para servir bajo ASGI"""
+from django.contrib import admin
+from django.urls import path, include
+from core.views import metrics_view
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
+    path('api/user/', include('user.async_urls')),
+    path('api/recipe', include('recipe.async_urls')),
+]
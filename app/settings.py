@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import hashlib
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +62,8 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'app.urls'
 
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,10 +89,205 @@ WSGI_APPLICATION = 'app.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+    }
+}
+
+# Con DJANGO_DB_PROFILE=production SQLite usa WAL, pragmas ajustados,
+# conexiones persistentes y transacciones BEGIN IMMEDIATE: los escritores
+# esperan su turno con busy_timeout al empezar en vez de fallar con
+# "database is locked" al pasar de lectura a escritura
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'development')
+
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Lo que el perfil production agrega a cada base SQLite
+SQLITE_PRODUCTION_DATABASE = {
+    'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()),
+    },
+}
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update(SQLITE_PRODUCTION_DATABASE)
+
+# Replicas de solo lectura: archivos SQLite que se copian del primario con
+# manage.py sync_replicas, separados por comas en DJANGO_DB_REPLICAS
+DATABASE_REPLICAS = []
+for number, name in enumerate(filter(None, os.environ.get('DJANGO_DB_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Segundos que las lecturas de un usuario van al primario tras escribir
+REPLICA_PIN_SECONDS = int(os.environ.get('DJANGO_REPLICA_PIN_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+# 'responses' y 'tokens' pueden ser por proceso: las claves y los ETags de
+# 'responses' llevan la version de la coleccion, y cada entrada de 'tokens'
+# su version de revocacion. Ambas viven en COUNTERS_FILE y cambian para
+# todos los procesos del host
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Segundos que un token autenticado se mantiene en cache
+TOKEN_CACHE_TIMEOUT = 300
+
+# El login verifica la contraseña en un pool de hilos propio: a lo sumo
+# LOGIN_HASH_WORKERS hashes a la vez y LOGIN_HASH_QUEUE en espera; con la
+# cola llena responde 503 con Retry-After de LOGIN_RETRY_AFTER segundos.
+# Por defecto deja la mitad de los CPUs para el resto de las peticiones.
+# Bajo WSGI el hilo de la peticion espera el hash: workers + cola debe ser
+# menor que los hilos por proceso para que siempre queden hilos libres
+LOGIN_HASH_WORKERS = int(os.environ.get('DJANGO_LOGIN_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+LOGIN_HASH_QUEUE = int(os.environ.get('DJANGO_LOGIN_HASH_QUEUE', 4))
+LOGIN_RETRY_AFTER = 1
+
+# Archivos que comparten los procesos del host, como las metricas o los
+# buckets de los limites de tasa. Cada despliegue tiene su directorio, derivado de
+# BASE_DIR, en /dev/shm si existe
+RUNTIME_DIR = os.environ.get('DJANGO_RUNTIME_DIR') or os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'api-avanzado-' + hashlib.md5(str(BASE_DIR).encode()).hexdigest()[:12],
+)
+
+# Contadores compartidos por los procesos del host en un mmap, como las
+# versiones de las colecciones que arman los ETags y las claves del cache
+# de respuestas
+COUNTERS_FILE = os.environ.get('DJANGO_COUNTERS_FILE') or os.path.join(RUNTIME_DIR, 'counters')
+COUNTERS_SLOTS = 262144
+
+# Metricas por ruta en /metrics/. Cada proceso escribe sus contadores en
+# METRICS_DIR cada METRICS_FLUSH_INTERVAL segundos y el endpoint suma los
+# de todos los procesos del host; los de procesos terminados se acumulan
+# en un solo archivo. Con METRICS_TOKEN el endpoint pide Authorization:
+# Bearer <token>; sin token solo responde a los clientes de
+# METRICS_ALLOWED_NETWORKS, resueltos con NUM_PROXIES
+METRICS_ENABLED = os.environ.get('DJANGO_METRICS', '1') == '1'
+METRICS_DIR = os.environ.get('DJANGO_METRICS_DIR') or os.path.join(RUNTIME_DIR, 'metrics')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = os.environ.get('DJANGO_METRICS_TOKEN') or None
+METRICS_ALLOWED_NETWORKS = os.environ.get('DJANGO_METRICS_ALLOWED_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+
+# Las respuestas de COMPRESSION_MIN_SIZE bytes o mas se comprimen con
+# gzip. Las que tienen ETag guardan sus variantes comprimidas en
+# COMPRESSION_CACHE
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE = 'responses'
+
+# Limites por cliente con token buckets: rate es 'n/periodo' como en DRF y
+# burst las peticiones seguidas que se permiten. key dice a quien se le
+# cobra: 'ip' (REMOTE_ADDR) o 'email' (el del cuerpo) se revisan en
+# RateLimitMiddleware antes de la vista, sin tocar la base; 'user' es el
+# usuario autenticado y lo revisa SharedRateThrottle despues de la
+# autenticacion. Los buckets viven en RATE_LIMIT_FILE, un mmap que
+# comparten todos los procesos del host; sin archivo cada proceso tiene
+# los suyos. Agotado un presupuesto responde 429 con Retry-After.
+# TEST_RUNNER los desactiva
+RATE_LIMIT_ENABLED = os.environ.get('DJANGO_RATE_LIMIT', '1') == '1'
+RATE_LIMIT_FILE = os.environ.get('DJANGO_RATE_LIMIT_FILE') or os.path.join(RUNTIME_DIR, 'ratelimit')
+RATE_LIMIT_SLOTS = 65536
+RATE_LIMITS = {
+    'login': {
+        'routes': ('user:token',),
+        'methods': ('POST',),
+        'key': 'ip',
+        'rate': '10/min',
+        'burst': 5,
+    },
+    # Frena los intentos contra una cuenta repartidos entre muchas IPs
+    'login-account': {
+        'routes': ('user:token',),
+        'methods': ('POST',),
+        'key': 'email',
+        'rate': '20/hour',
+        'burst': 10,
+    },
+    'signup': {
+        'routes': ('user:create',),
+        'methods': ('POST',),
+        'key': 'ip',
+        'rate': '5/min',
+        'burst': 3,
+    },
+    'recipe-writes': {
+        'routes': ('recipe:*',),
+        'methods': ('POST', 'PUT', 'PATCH', 'DELETE'),
+        'key': 'user',
+        'rate': '120/min',
+        'burst': 30,
+    },
 }
 
+# Con MAX_CONCURRENT_REQUESTS peticiones en curso el proceso responde 503
+# con Retry-After de OVERLOAD_RETRY_AFTER segundos; None no limita
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('DJANGO_MAX_CONCURRENT_REQUESTS', 64))
+OVERLOAD_RETRY_AFTER = 1
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'core.ratelimit.SharedRateThrottle',
+    ),
+    # Proxies inversos delante de la aplicacion: los limites por IP y las
+    # direcciones de /metrics/ usan el cliente de X-Forwarded-For
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', 0)),
+}
+
+# Los listados se arman desde values() sin instanciar modelos ni
+# serializadores; la salida es la misma que la del serializador
+FAST_LIST_RESPONSES = True
+
+# Bajo ASGI las lecturas y altas JSON de recipe usan vistas asincronas
+# nativas; app/asgi.py lo activa por defecto
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+if ASYNC_VIEWS:
+    ROOT_URLCONF = 'app.async_urls'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
+from core.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/user/', include('user.urls')),
     path('api/recipe', include('recipe.urls')),
 ]
@@ -0,0 +1,64 @@
+"""Benchmarks de la API
+
+Se ejecutan desde la raiz del repositorio con ``python -m benchmarks.<modulo>``
+sobre una base de datos de prueba, sin servicios externos.
+"""
+import atexit
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+
+def setup(test_db_name=None, rate_limits=False):
+    """Configura Django y crea la base de datos de prueba
+
+    Con test_db_name la base de prueba es ese archivo en lugar de la base
+    en memoria, necesario para escrituras desde varios hilos. Igual que en
+    los tests, los archivos compartidos van a un directorio temporal y los
+    limites de tasa quedan apagados salvo con rate_limits.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from core.test_runner import isolated_settings
+    setup_test_environment()
+    runtime_dir = tempfile.mkdtemp(prefix='api-avanzado-bench-')
+    atexit.register(shutil.rmtree, runtime_dir, ignore_errors=True)
+    isolated_settings(runtime_dir, rate_limits).enable()
+    if test_db_name is not None:
+        connection.settings_dict['TEST']['NAME'] = str(test_db_name)
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+
+
+def measure(func, iterations):
+    """Ejecuta func varias veces y retorna cada duracion en segundos"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+def percentile(samples, fraction):
+    """Percentil por rango mas cercano"""
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def report(label, samples, queries=None):
+    """Imprime la media y la mediana de las muestras en microsegundos"""
+    line = '{:<48} mean {:>10.1f} us   median {:>10.1f} us'.format(
+        label,
+        statistics.mean(samples) * 1e6,
+        statistics.median(samples) * 1e6,
+    )
+    if queries is not None:
+        line += f'   {queries} queries'
+    print(line)
@@ -0,0 +1,100 @@
+"""Rendimiento de las vistas DRF (WSGI) y asincronas (ASGI) con concurrencia
+
+Lanza --concurrency clientes simultaneos contra el listado de recetas,
+el detalle y el listado de tags: en WSGI un hilo por conexion con el
+handler sincrono, en ASGI una tarea por conexion, primero con las vistas
+DRF (que Django ejecuta en un hilo) y despues con las vistas nativas.
+
+    python -m benchmarks.async_views --concurrency 100 --requests 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks import setup
+
+
+def summary(label, latencies, elapsed):
+    """Imprime el throughput y la latencia por peticion"""
+    print('{:<48} {:>8.0f} req/s   median {:>8.1f} ms   max {:>8.1f} ms'.format(
+        label,
+        len(latencies) / elapsed,
+        statistics.median(latencies) * 1e3,
+        max(latencies) * 1e3,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=20,
+                        help='peticiones por conexion')
+    parser.add_argument('--recipes', type=int, default=200)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, AsyncClient, override_settings
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from core.models import Recipe, Tag
+
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    token = Token.objects.create(user=user)
+    tags = Tag.objects.bulk_create(Tag(user=user, name=f'tag {i}') for i in range(20))
+    recipes = Recipe.objects.bulk_create(
+        Recipe(user=user, title=f'recipe {i}', price=i) for i in range(args.recipes)
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.pk, tag_id=tags[i % len(tags)].pk)
+        for i, recipe in enumerate(recipes)
+    )
+    urls = [
+        reverse('recipe:recipe-list'),
+        reverse('recipe:recipe-detail', args=[recipes[0].pk]),
+        reverse('recipe:tag-list'),
+    ]
+    header = 'Token ' + token.key
+
+    def wsgi_connection():
+        client = Client(HTTP_AUTHORIZATION=header)
+        latencies = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            client.get(urls[i % len(urls)])
+            latencies.append(time.perf_counter() - start)
+
+        return latencies
+
+    async def asgi_connection():
+        client = AsyncClient(AUTHORIZATION=header)
+        latencies = []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            await client.get(urls[i % len(urls)])
+            latencies.append(time.perf_counter() - start)
+
+        return latencies
+
+    async def asgi_run():
+        return await asyncio.gather(*(asgi_connection() for _ in range(args.concurrency)))
+
+    label = f'{args.concurrency} connections x {args.requests} requests'
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(wsgi_connection) for _ in range(args.concurrency)]
+        results = [future.result() for future in futures]
+    summary(f'WSGI {label}', [x for r in results for x in r], time.perf_counter() - start)
+
+    for name, urlconf in (('DRF views', 'app.urls'), ('async views', 'app.async_urls')):
+        with override_settings(ROOT_URLCONF=urlconf):
+            start = time.perf_counter()
+            results = asyncio.run(asgi_run())
+            summary(f'ASGI {name} {label}', [x for r in results for x in r],
+                    time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Costo de la autenticacion por token con y sin cache
+
+    python -m benchmarks.auth --iterations 2000
+"""
+import argparse
+from benchmarks import setup, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient, APIRequestFactory
+    from user.authentication import CachedTokenAuthentication
+    from user.views import ManageUserView
+
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    token = Token.objects.create(user=user)
+    header = 'Token ' + token.key
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=header)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=header)
+    url = reverse('user:me')
+
+    for auth_class in (TokenAuthentication, CachedTokenAuthentication):
+        name = auth_class.__name__
+        auth = auth_class()
+        auth.authenticate(request)
+        with CaptureQueriesContext(connection) as ctx:
+            samples = measure(lambda: auth.authenticate(request), args.iterations)
+        report(f'{name}.authenticate', samples, len(ctx) // args.iterations)
+
+        ManageUserView.authentication_classes = (auth_class,)
+        client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            samples = measure(lambda: client.get(url), args.iterations)
+        report(f'GET {url} ({name})', samples, len(ctx) // args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""CPU por peticion y bytes enviados con y sin compresion
+
+Mide solo el middleware sobre el listado y el detalle ya renderizados:
+sin comprimir, GZipMiddleware de Django, que comprime en cada peticion,
+y CompressionMiddleware, que reutiliza la variante comprimida mientras
+el ETag no cambie. Las peticiones repiten la misma URL, como un
+listado o detalle muy leido.
+
+    python -m benchmarks.compression --recipes 500
+"""
+import argparse
+import statistics
+import time
+from benchmarks import setup
+
+
+def cpu_samples(func, iterations):
+    """CPU del proceso de cada llamada, en segundos"""
+    samples = []
+    for _ in range(iterations):
+        start = time.process_time_ns()
+        func()
+        samples.append((time.process_time_ns() - start) / 1e9)
+
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.http import HttpResponse
+    from django.middleware.gzip import GZipMiddleware
+    from django.test import RequestFactory
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from core import compression
+    from core.middleware import CompressionMiddleware
+    from core.models import Recipe, Tag, Ingredient
+
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    tags = [Tag.objects.create(user=user, name=f'tag {i}') for i in range(10)]
+    ingredients = [Ingredient.objects.create(user=user, name=f'ingredient {i}') for i in range(60)]
+    for i in range(args.recipes):
+        recipe = Recipe.objects.create(
+            user=user, title=f'Tomato soup with garlic {i}', price=i % 100,
+            link=f'https://example.com/recipes/{i}',
+        )
+        recipe.tags.add(*tags[i % 7:i % 7 + 3])
+        recipe.ingredients.add(*ingredients[i % 20:i % 20 + 40])
+
+    client = APIClient()
+    client.force_authenticate(user)
+    urls = {
+        f'list x{args.recipes}': reverse('recipe:recipe-list') + f'?page_size={args.recipes}',
+        'detail': reverse('recipe:recipe-detail', args=[recipe.id]),
+    }
+    variants = [('identity', CompressionMiddleware, '')]
+    variants.append(('GZipMiddleware gzip', GZipMiddleware, 'gzip'))
+    variants.extend(
+        (f'CompressionMiddleware {encoding}', CompressionMiddleware, encoding)
+        for encoding in compression.ENCODERS
+    )
+
+    for label, url in urls.items():
+        # Respuesta ya renderizada de la vista: se mide solo el middleware
+        rendered = client.get(url)
+        factory = RequestFactory()
+
+        def get_response(request):
+            response = HttpResponse(rendered.content, content_type=rendered['Content-Type'])
+            response['ETag'] = rendered['ETag']
+            return response
+
+        for name, middleware_class, encoding in variants:
+            middleware = middleware_class(get_response)
+            request = factory.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            size = len(middleware(request).content)
+            samples = cpu_samples(lambda: middleware(request), args.iterations)
+            print('{:<12} {:<30} cpu mean {:>8.1f} us   median {:>8.1f} us   {:>7} bytes'.format(
+                label, name,
+                statistics.mean(samples) * 1e6,
+                statistics.median(samples) * 1e6,
+                size,
+            ))
+
+
+if __name__ == '__main__':
+    main()
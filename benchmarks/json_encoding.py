@@ -0,0 +1,58 @@
+"""JSONRenderer/JSONParser de DRF contra las versiones con orjson
+
+    python -m benchmarks.json_encoding --recipes 100
+"""
+import argparse
+import io
+from benchmarks import setup, measure, report
+
+
+def recipe_payload(count):
+    """Respuesta de listado y de detalle con la forma de la API"""
+    results = [
+        {
+            'id': i,
+            'title': f'Receta número {i} con salsa de champiñones',
+            'ingredients': list(range(i, i + 8)),
+            'tags': list(range(i, i + 3)),
+            'price': '%d.%02d' % (i % 1000, i % 100),
+            'link': f'https://example.com/recetas/{i}',
+        }
+        for i in range(count)
+    ]
+    detail = dict(
+        results[0],
+        ingredients=[{'id': i, 'name': f'ingrediente {i}'} for i in range(8)],
+        tags=[{'id': i, 'name': f'tag {i}'} for i in range(3)],
+    )
+
+    return {'next': 'https://example.com/api/recipe/recipes/?cursor=cD0xMDA%3D',
+            'previous': None, 'results': results}, detail
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer
+
+    listing, detail = recipe_payload(args.recipes)
+    for label, data in ((f'list x{args.recipes}', listing), ('detail', detail)):
+        body = JSONRenderer().render(data)
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            assert renderer.render(data) == body
+            samples = measure(lambda: renderer.render(data), args.iterations)
+            report(f'render {label} {type(renderer).__name__}', samples)
+        for parser_ in (JSONParser(), ORJSONParser()):
+            samples = measure(lambda: parser_.parse(io.BytesIO(body)), args.iterations)
+            report(f'parse {label} {type(parser_).__name__}', samples)
+
+
+if __name__ == '__main__':
+    main()
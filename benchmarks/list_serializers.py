@@ -0,0 +1,61 @@
+"""Listado de recetas: serializador DRF contra filas de values()
+
+    python -m benchmarks.list_serializers --recipes 1000
+"""
+import argparse
+from benchmarks import setup, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db.models import Prefetch
+    from rest_framework.renderers import JSONRenderer
+    from core.models import Recipe, Tag, Ingredient
+    from recipe.projections import recipe_rows
+    from recipe.serializers import RecipeSerializer
+
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    tags = Tag.objects.bulk_create([Tag(user=user, name=f't{i}') for i in range(5)])
+    ingredients = Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=f'i{i}') for i in range(8)]
+    )
+    recipes = Recipe.objects.bulk_create([
+        Recipe(user=user, title=f'recipe {i}', price=i % 1000, link='https://example.com')
+        for i in range(args.recipes)
+    ])
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=r.pk, tag_id=t.pk) for r in recipes for t in tags
+    ])
+    Recipe.ingredients.through.objects.bulk_create([
+        Recipe.ingredients.through(recipe_id=r.pk, ingredient_id=i.pk)
+        for r in recipes for i in ingredients
+    ])
+    queryset = Recipe.objects.filter(user=user).order_by('id')
+    renderer = JSONRenderer()
+
+    def serializer():
+        page = queryset.prefetch_related(
+            Prefetch('ingredients', queryset=Ingredient.objects.only('id').order_by('id')),
+            Prefetch('tags', queryset=Tag.objects.only('id').order_by('id')),
+        )
+        return renderer.render(RecipeSerializer(page, many=True).data)
+
+    def projection():
+        rows = queryset.values('id', 'title', 'price', 'link')
+        return renderer.render(recipe_rows(list(rows)))
+
+    assert serializer() == projection()
+    for name, func in (('RecipeSerializer', serializer), ('recipe_rows', projection)):
+        samples = measure(func, args.iterations)
+        report(f'{name} x{args.recipes}', samples)
+        print(f'{"":<48} {args.recipes * len(samples) / sum(samples):,.0f} recipes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Login en rafaga: throughput del token y p99 de las lecturas de recetas
+
+Durante --seconds, --logins clientes piden tokens sin pausa mientras
+--readers clientes leen el listado de recetas. En WSGI las peticiones
+pasan por un pool de --threads hilos, como un servidor con hilos; en
+ASGI cada cliente es una tarea. Se compara authenticate() en el hilo de
+la peticion (como antes) con el pool acotado de user.login.
+
+    python -m benchmarks.login_storm --seconds 10 --threads 8
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from benchmarks import setup, percentile
+
+
+def summary(label, logins, reads, elapsed):
+    """Imprime logins por segundo y la latencia de las lecturas"""
+    ok = sum(1 for code in logins if code == 200)
+    rejected = sum(1 for code in logins if code == 503)
+    print('{:<34} logins {:>6.1f}/s ok {:>6.1f}/s 503   reads {:>7.1f}/s '
+          'p50 {:>8.1f} ms   p99 {:>8.1f} ms'.format(
+              label,
+              ok / elapsed,
+              rejected / elapsed,
+              len(reads) / elapsed,
+              statistics.median(reads) * 1e3,
+              percentile(reads, 0.99) * 1e3,
+          ))
+
+
+def inline_check_credentials(request, email, password):
+    """Como antes: authenticate() hashea en el hilo de la peticion"""
+    from django.contrib.auth import authenticate
+    return authenticate(request=request, username=email, password=password)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='hilos del servidor WSGI')
+    parser.add_argument('--logins', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+    setup()
+    # Los 503 esperados se registran como errores
+    logging.getLogger('django.request').disabled = True
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client, AsyncClient, override_settings
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from core.models import Recipe
+    from user import login
+
+    users = [
+        get_user_model().objects.create_user(f'user{i}@example.com', 'password')
+        for i in range(args.logins)
+    ]
+    for user in users:
+        Token.objects.create(user=user)
+    reader = users[0]
+    Recipe.objects.bulk_create(
+        Recipe(user=reader, title=f'recipe {i}', price=i % 100) for i in range(100)
+    )
+    header = 'Token ' + Token.objects.get(user=reader).key
+    token_url = reverse('user:token')
+    recipes_url = reverse('recipe:recipe-list')
+
+    def run_wsgi(label):
+        server = ThreadPoolExecutor(max_workers=args.threads)
+        deadline = time.perf_counter() + args.seconds
+
+        def login_client(user):
+            client = Client()
+            payload = {'email': user.email, 'password': 'password'}
+            codes = []
+            while time.perf_counter() < deadline:
+                res = server.submit(client.post, token_url, payload).result()
+                codes.append(res.status_code)
+            return codes
+
+        def read_client():
+            client = Client(HTTP_AUTHORIZATION=header)
+            latencies = []
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                server.submit(client.get, recipes_url).result()
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.logins + args.readers) as clients:
+            logins = [clients.submit(login_client, user) for user in users]
+            reads = [clients.submit(read_client) for _ in range(args.readers)]
+            codes = [code for future in logins for code in future.result()]
+            latencies = [x for future in reads for x in future.result()]
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        summary(label, codes, latencies, elapsed)
+
+    async def run_asgi(label):
+        deadline = time.perf_counter() + args.seconds
+
+        async def login_client(user):
+            client = AsyncClient()
+            payload = {'email': user.email, 'password': 'password'}
+            codes = []
+            while time.perf_counter() < deadline:
+                res = await client.post(token_url, payload, content_type='application/json')
+                codes.append(res.status_code)
+            return codes
+
+        async def read_client():
+            client = AsyncClient(AUTHORIZATION=header)
+            latencies = []
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.get(recipes_url)
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(login_client(user) for user in users),
+            *(read_client() for _ in range(args.readers)),
+        )
+        logins, reads = results[:len(users)], results[len(users):]
+        elapsed = time.perf_counter() - start
+        summary(label, [c for r in logins for c in r], [x for r in reads for x in r], elapsed)
+
+    with mock.patch.object(login, 'check_credentials', inline_check_credentials):
+        run_wsgi('WSGI authenticate() inline')
+    run_wsgi('WSGI bounded hash pool')
+
+    with override_settings(ROOT_URLCONF='app.urls'):
+        asyncio.run(run_asgi('ASGI DRF views'))
+    with override_settings(ROOT_URLCONF='app.async_urls'):
+        asyncio.run(run_asgi('ASGI async token view'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Filtros ?tags= y ?ingredients= del listado de recetas
+
+Agrega recetas por etapas hasta --recipes, cada una con --relations tags
+y --relations ingredientes, y mide la primera pagina filtrada con
+semantica all y any. Para comparar mide solo la consulta de ids con los
+filtros y con join (y DISTINCT) sobre las tablas intermedias.
+
+    python -m benchmarks.recipe_filters --recipes 100000 --relations 5
+"""
+import argparse
+import random
+from benchmarks import setup, measure, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=100000)
+    parser.add_argument('--relations', type=int, default=5)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--stages', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from core.models import Recipe, Tag, Ingredient
+    from recipe.cache import get_cache
+    from recipe.filters import filter_recipes
+
+    rng = random.Random(0)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f'user{i}@example.com') for i in range(args.users)
+    )
+    tags = {
+        user.pk: Tag.objects.bulk_create(Tag(user=user, name=f'tag {i}') for i in range(20))
+        for user in users
+    }
+    ingredients = {
+        user.pk: Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=f'ingredient {i}') for i in range(50)
+        )
+        for user in users
+    }
+
+    user = users[0]
+    client = APIClient()
+    client.force_authenticate(user)
+    url = reverse('recipe:recipe-list')
+    two_tags = [tag.pk for tag in tags[user.pk][:2]]
+    two_ingredients = [ingredient.pk for ingredient in ingredients[user.pk][:2]]
+    cases = {
+        'tags all': {'tags': two_tags},
+        'tags any': {'tags': two_tags, 'tags_match': 'any'},
+        'ingredients all': {'ingredients': two_ingredients},
+        'tags any + ingredients all': {
+            'tags': two_tags, 'tags_match': 'any', 'ingredients': two_ingredients,
+        },
+    }
+
+    def seed(count):
+        recipes = Recipe.objects.bulk_create(
+            Recipe(user=users[i % len(users)], title=f'recipe {i}', price=i % 100)
+            for i in range(count)
+        )
+        for field, related in (('tags', tags), ('ingredients', ingredients)):
+            through = getattr(Recipe, field).through
+            column = through._meta.get_field(field[:-1]).attname
+            through.objects.bulk_create(
+                through(recipe_id=recipe.pk, **{column: item.pk})
+                for recipe in recipes
+                for item in rng.sample(related[recipe.user_id], args.relations)
+            )
+
+    step = args.recipes // args.stages
+    for stage in range(args.stages):
+        for offset in range(0, step, 10000):
+            seed(min(10000, step - offset))
+        rows = Recipe.tags.through.objects.count() + Recipe.ingredients.through.objects.count()
+        print(f'--- {rows} through rows')
+
+        for label, params in cases.items():
+            params = {
+                key: ','.join(map(str, value)) if isinstance(value, list) else value
+                for key, value in params.items()
+            }
+
+            def first_page():
+                get_cache().clear()
+                return client.get(url, params)
+
+            report(label, measure(first_page, args.iterations))
+
+        def first_ids(queryset):
+            return list(queryset.order_by('id').values('id')[:101])
+
+        tags_any = {'tags': ','.join(map(str, two_tags)), 'tags_match': 'any'}
+        orm = {
+            'tags any, EXISTS (ORM only)': lambda: first_ids(
+                filter_recipes(Recipe.objects.filter(user=user), tags_any)
+            ),
+            'tags any, join + DISTINCT (ORM only)': lambda: first_ids(
+                Recipe.objects.filter(user=user, tags__in=two_tags).distinct()
+            ),
+            'tags all, HAVING COUNT (ORM only)': lambda: first_ids(
+                filter_recipes(Recipe.objects.filter(user=user), {'tags': tags_any['tags']})
+            ),
+            'tags all, join per tag (ORM only)': lambda: first_ids(
+                Recipe.objects.filter(user=user, tags=two_tags[0]).filter(tags=two_tags[1])
+            ),
+        }
+        for label, func in orm.items():
+            report(label, measure(func, args.iterations))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Velocidad de la importacion NDJSON de recetas
+
+    python -m benchmarks.recipe_import --recipes 20000
+"""
+import argparse
+import json
+import random
+import time
+from benchmarks import setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=20000)
+    parser.add_argument('--relations', type=int, default=5)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from core.models import Recipe, Tag, Ingredient
+
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    tags = Tag.objects.bulk_create(
+        [Tag(user=user, name=f'tag {i}') for i in range(50)]
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=f'ingredient {i}') for i in range(200)]
+    )
+    rng = random.Random(0)
+    body = '\n'.join(
+        json.dumps({
+            'title': f'recipe {i}',
+            'price': '%.2f' % rng.uniform(1, 100),
+            'tags': [t.pk for t in rng.sample(tags, args.relations)],
+            'ingredients': [i.pk for i in rng.sample(ingredients, args.relations)],
+        })
+        for i in range(args.recipes)
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+
+    start = time.perf_counter()
+    res = client.post(
+        reverse('recipe:recipe-import'), body, content_type='application/x-ndjson'
+    )
+    lines = b''.join(res.streaming_content).count(b'\n')
+    elapsed = time.perf_counter() - start
+
+    assert lines == args.recipes == Recipe.objects.count()
+    print(f'{args.recipes} recipes in {elapsed:.2f}s '
+          f'({args.recipes / elapsed * 60:,.0f} recipes/min)')
+
+
+if __name__ == '__main__':
+    main()
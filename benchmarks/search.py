@@ -0,0 +1,98 @@
+"""Latencia de la busqueda de recetas con el indice FTS5
+
+Crea --recipes recetas repartidas entre --users usuarios, con titulos e
+ingredientes tomados de un vocabulario, regenera el indice y mide la
+primera pagina y la siguiente para terminos frecuentes, raros y prefijos.
+
+    python -m benchmarks.search --recipes 1000000 --users 100
+"""
+import argparse
+import random
+import time
+from benchmarks import setup, measure, report
+
+WORDS = (
+    'tomato soup garlic bread chicken rice beans lentil pasta salad onion '
+    'pepper cheese lemon honey ginger curry potato carrot spinach mushroom '
+    'apple banana orange chocolate vanilla almond walnut coconut mango'
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from core.models import Recipe, Ingredient
+    from recipe import search
+    from recipe.cache import get_cache
+
+    rng = random.Random(0)
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f'user{i}@example.com') for i in range(args.users)
+    )
+    ingredients = {
+        user.pk: Ingredient.objects.bulk_create(
+            Ingredient(user=user, name=word) for word in WORDS
+        )
+        for user in users
+    }
+
+    start = time.perf_counter()
+    batch = 10000
+    for offset in range(0, args.recipes, batch):
+        recipes = Recipe.objects.bulk_create(
+            Recipe(
+                user=users[i % len(users)],
+                title=' '.join(rng.sample(WORDS, 3)) + f' {i}',
+                price=i % 100,
+            )
+            for i in range(offset, min(offset + batch, args.recipes))
+        )
+        Recipe.ingredients.through.objects.bulk_create(
+            Recipe.ingredients.through(recipe_id=recipe.pk, ingredient_id=ingredient.pk)
+            for recipe in recipes
+            for ingredient in rng.sample(ingredients[recipe.user_id], 2)
+        )
+    print(f'seeded {args.recipes} recipes in {time.perf_counter() - start:.1f}s')
+
+    start = time.perf_counter()
+    search.rebuild()
+    print(f'rebuilt search index in {time.perf_counter() - start:.1f}s')
+
+    user = users[0]
+    client = APIClient()
+    client.force_authenticate(user)
+    url = reverse('recipe:recipe-list')
+    per_user = args.recipes // args.users
+    print(f'{per_user} recipes per user')
+
+    for text in ('soup', 'tomato garlic', 'choc', f'{per_user // 2 * args.users}'):
+        def first_page():
+            get_cache().clear()
+            return client.get(url, {'q': text})
+
+        res = first_page()
+        next_url = res.data['next']
+        with CaptureQueriesContext(connection) as ctx:
+            samples = measure(first_page, args.iterations)
+        report(f'q={text!r} first page', samples, len(ctx) // args.iterations)
+
+        if next_url:
+            def next_page():
+                get_cache().clear()
+                return client.get(next_url)
+
+            report(f'q={text!r} next page', measure(next_page, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
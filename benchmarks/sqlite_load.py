@@ -0,0 +1,114 @@
+"""Carga mixta de lecturas y escrituras sobre SQLite por perfil de base
+
+Cada perfil corre en su propio proceso sobre un archivo nuevo: varios
+hilos emulan peticiones (cerrando o reutilizando la conexion como lo
+hace Django al terminar cada una) que listan recetas o crean una receta
+con sus tags dentro de una transaccion.
+
+    python -m benchmarks.sqlite_load --threads 16 --duration 10 --writes 0.2
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROFILES = ('development', 'production')
+
+
+def run_profile(args):
+    """Corre la carga con el perfil de DJANGO_DB_PROFILE"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    import django
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import OperationalError, close_old_connections, connection, transaction
+    from core.models import Recipe, Tag
+
+    call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create_user('bench@example.com', 'password')
+    tags = Tag.objects.bulk_create(Tag(user=user, name=f'tag {i}') for i in range(10))
+    connection.close()
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def read():
+        list(Recipe.objects.filter(user=user).order_by('-id').values('id', 'title')[:50])
+
+    def write():
+        with transaction.atomic():
+            count = Recipe.objects.filter(user=user).count()
+            recipe = Recipe.objects.create(user=user, title=f'recipe {count}', price=1)
+            recipe.tags.add(random.choice(tags))
+
+    def worker():
+        local = {'reads': 0, 'writes': 0, 'locked': 0}
+        while time.perf_counter() < deadline:
+            kind, operation = ('writes', write) if random.random() < args.writes else ('reads', read)
+            try:
+                operation()
+                local[kind] += 1
+            except OperationalError:
+                local['locked'] += 1
+            # Igual que request_started/request_finished
+            close_old_connections()
+        connection.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print('{:<16} {:>8.0f} reads/s {:>8.0f} writes/s {:>8} locked errors'.format(
+        os.environ['DJANGO_DB_PROFILE'],
+        counts['reads'] / elapsed,
+        counts['writes'] / elapsed,
+        counts['locked'],
+    ), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--writes', type=float, default=0.2,
+                        help='proporcion de escrituras')
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args)
+        return
+
+    print(f'{args.threads} threads, {args.duration:g}s, {args.writes:.0%} writes')
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in PROFILES:
+            env = {
+                **os.environ,
+                'DJANGO_DB_PROFILE': profile,
+                'DJANGO_DB_NAME': str(Path(directory) / f'{profile}.sqlite3'),
+            }
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.sqlite_load', '--profile', profile,
+                 *sys.argv[1:]],
+                env=env,
+                check=True,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+"""Suite de carga de todos los endpoints de la API
+
+Crea --users usuarios, cada uno con --tags tags, --ingredients
+ingredientes y --recipes recetas, en una base SQLite temporal en disco.
+Despues ejecuta cada escenario con --concurrency clientes simultaneos
+(un hilo y un Client por cliente, como un servidor WSGI con hilos) y
+reporta throughput, latencia p50/p95/p99 y consultas por peticion.
+
+Con --output guarda el resultado en JSON junto con el commit y los
+parametros; con --compare muestra la diferencia con un resultado previo.
+Las respuestas de error se cuentan por codigo. Con el perfil de
+desarrollo las escrituras concurrentes pueden fallar con la base
+bloqueada; DJANGO_DB_PROFILE=production usa la configuracion de despliegue.
+Los limites de tasa solo se aplican con --rate-limits.
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --compare before.json --output after.json
+    python -m benchmarks.suite --scenarios recipes-list,recipes-search
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from benchmarks import setup, percentile
+
+WORDS = (
+    'tomato soup garlic bread chicken rice beans lentil pasta salad onion '
+    'pepper cheese lemon honey ginger curry potato carrot spinach'
+).split()
+
+
+class Scenario:
+    """Una peticion a medir; request(client, ctx, i) retorna la respuesta"""
+
+    def __init__(self, name, method, path, request, requests=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.request = request
+        # Algunos escenarios (el login) son caros por diseño
+        self.requests = requests
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(args):
+    """Crea los datos con bulk_create y regenera los indices derivados"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+    from core.models import Recipe, Tag, Ingredient
+    from recipe import search, stats
+
+    rng = random.Random(0)
+    # Un solo hash para todos: sembrar no debe medir PBKDF2
+    password = make_password('password')
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f'user{i}@example.com', name=f'User {i}', password=password)
+        for i in range(args.users)
+    )
+    tokens = Token.objects.bulk_create(
+        Token(user=user, key=Token.generate_key()) for user in users
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=f'{rng.choice(WORDS)} {i}')
+        for user in users for i in range(args.tags)
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(user=user, name=f'{rng.choice(WORDS)} {i}')
+        for user in users for i in range(args.ingredients)
+    )
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            user=user,
+            title=' '.join(rng.sample(WORDS, 3)),
+            price=rng.randint(100, 9999) / 100,
+        )
+        for user in users for _ in range(args.recipes)
+    )
+
+    by_user = {}
+    for kind, items in (('tags', tags), ('ingredients', ingredients)):
+        for item in items:
+            by_user.setdefault((kind, item.user_id), []).append(item.pk)
+
+    for kind, column in (('tags', 'tag_id'), ('ingredients', 'ingredient_id')):
+        through = getattr(Recipe, kind).through
+        through.objects.bulk_create(
+            through(recipe_id=recipe.pk, **{column: pk})
+            for recipe in recipes
+            for pk in rng.sample(
+                by_user.get((kind, recipe.user_id), []),
+                min(args.relations, len(by_user.get((kind, recipe.user_id), []))),
+            )
+        )
+
+    search.rebuild()
+    for kind in stats.RELATIONS:
+        stats.recompute(kind)
+
+    return [
+        {
+            'user': user,
+            'token': token.key,
+            'tags': by_user.get(('tags', user.pk), []),
+            'ingredients': by_user.get(('ingredients', user.pk), []),
+            'recipes': [],
+        }
+        for user, token in zip(users, tokens)
+    ], recipes
+
+
+def build_scenarios():
+    from django.urls import reverse
+
+    users_url = reverse('user:create')
+    token_url = reverse('user:token')
+    me_url = reverse('user:me')
+    tags_url = reverse('recipe:tag-list')
+    ingredients_url = reverse('recipe:ingredient-list')
+    recipes_url = reverse('recipe:recipe-list')
+
+    def detail_url(ctx, i):
+        return reverse('recipe:recipe-detail', args=[ctx['recipes'][i % len(ctx['recipes'])]])
+
+    def recipe_payload(ctx, i):
+        return {
+            'title': f'bench recipe {i}',
+            'price': '9.99',
+            'tags': ctx['tags'][:2],
+            'ingredients': ctx['ingredients'][:3],
+        }
+
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+
+    def unique():
+        with counter_lock:
+            return next(counter)
+
+    return [
+        Scenario('user-create', 'POST', users_url, lambda c, ctx, i: c.post(
+            users_url,
+            {'email': f'new{unique()}@example.com', 'password': 'password', 'name': 'New'},
+            format='json',
+        ), requests=5),
+        Scenario('token', 'POST', token_url, lambda c, ctx, i: c.post(
+            token_url,
+            {'email': ctx['user'].email, 'password': 'password'},
+            format='json',
+        ), requests=5),
+        Scenario('me', 'GET', me_url, lambda c, ctx, i: c.get(me_url)),
+        Scenario('me-update', 'PATCH', me_url, lambda c, ctx, i: c.patch(
+            me_url, {'name': f'User {i}'}, format='json',
+        )),
+        Scenario('tags-list', 'GET', tags_url, lambda c, ctx, i: c.get(tags_url)),
+        Scenario('tags-create', 'POST', tags_url, lambda c, ctx, i: c.post(
+            tags_url, {'name': f'bench tag {i}'}, format='json',
+        )),
+        Scenario('tags-price-stats', 'GET', reverse('recipe:tag-price-stats'),
+                 lambda c, ctx, i: c.get(reverse('recipe:tag-price-stats'))),
+        Scenario('ingredients-list', 'GET', ingredients_url,
+                 lambda c, ctx, i: c.get(ingredients_url)),
+        Scenario('ingredients-create', 'POST', ingredients_url, lambda c, ctx, i: c.post(
+            ingredients_url, {'name': f'bench ingredient {i}'}, format='json',
+        )),
+        Scenario('recipes-list', 'GET', recipes_url, lambda c, ctx, i: c.get(recipes_url)),
+        Scenario('recipes-list-uncached', 'GET', recipes_url + '?page_size=<n>',
+                 lambda c, ctx, i: c.get(recipes_url, {'page_size': 50 + unique() % 50})),
+        Scenario('recipes-search', 'GET', recipes_url + '?q=',
+                 lambda c, ctx, i: c.get(recipes_url, {'q': WORDS[i % len(WORDS)]})),
+        Scenario('recipes-filter', 'GET', recipes_url + '?tags=',
+                 lambda c, ctx, i: c.get(recipes_url, {
+                     'tags': ','.join(map(str, ctx['tags'][:2])), 'tags_match': 'any',
+                 })),
+        Scenario('recipes-detail', 'GET', recipes_url + '<id>/',
+                 lambda c, ctx, i: c.get(detail_url(ctx, i))),
+        Scenario('recipes-create', 'POST', recipes_url,
+                 lambda c, ctx, i: c.post(recipes_url, recipe_payload(ctx, i), format='json')),
+        Scenario('recipes-update', 'PATCH', recipes_url + '<id>/',
+                 lambda c, ctx, i: c.patch(detail_url(ctx, i), {'price': f'{i % 90 + 1}.50'},
+                                           format='json')),
+        Scenario('recipes-import', 'POST', reverse('recipe:recipe-import'),
+                 lambda c, ctx, i: c.post(
+                     reverse('recipe:recipe-import'),
+                     b'\n'.join(
+                         json.dumps({'title': f'imported {i} {n}', 'price': 1}).encode()
+                         for n in range(10)
+                     ),
+                     content_type='application/x-ndjson',
+                 )),
+        Scenario('recipes-export', 'GET', reverse('recipe:recipe-export'),
+                 lambda c, ctx, i: c.get(
+                     reverse('recipe:recipe-export'), HTTP_ACCEPT='application/x-ndjson',
+                 )),
+    ]
+
+
+def read(response):
+    """Consume las respuestas en streaming para medirlas completas"""
+    if response.streaming:
+        b''.join(response.streaming_content)
+
+    return response
+
+
+def run_scenario(scenario, contexts, args):
+    """Ejecuta el escenario con clientes concurrentes y resume las muestras"""
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    requests = min(scenario.requests or args.requests, args.requests)
+
+    def client_loop(number):
+        ctx = contexts[number % len(contexts)]
+        # Un error del servidor (por ejemplo la base bloqueada) se cuenta
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION='Token ' + ctx['token'])
+        latencies, errors, queries = [], {}, [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            for i in range(args.warmup):
+                read(scenario.request(client, ctx, i))
+
+            with connection.execute_wrapper(count):
+                queries[0] = 0
+                for i in range(requests):
+                    start = time.perf_counter()
+                    res = read(scenario.request(client, ctx, number * requests + i))
+                    latencies.append(time.perf_counter() - start)
+                    if res.status_code >= 400:
+                        errors[res.status_code] = errors.get(res.status_code, 0) + 1
+        finally:
+            connection.close()
+
+        return latencies, errors, queries[0]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(client_loop, range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [x for result in results for x in result[0]]
+    return {
+        'name': scenario.name,
+        'method': scenario.method,
+        'path': scenario.path,
+        'concurrency': args.concurrency,
+        'requests': len(latencies),
+        'errors': {
+            str(code): sum(result[1].get(code, 0) for result in results)
+            for code in sorted({code for result in results for code in result[1]})
+        },
+        'throughput': len(latencies) / elapsed,
+        'mean_ms': statistics.mean(latencies) * 1e3,
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p95_ms': percentile(latencies, 0.95) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'queries_per_request': sum(result[2] for result in results) / len(latencies),
+    }
+
+
+def print_result(result, previous=None):
+    line = ('{name:<24} {throughput:>8.1f} req/s   p50 {p50_ms:>8.1f}   p95 {p95_ms:>8.1f}   '
+            'p99 {p99_ms:>8.1f} ms   {queries_per_request:>5.1f} q/req'.format(**result))
+    if result['errors']:
+        errors = ', '.join(f'{count}x{code}' for code, count in result['errors'].items())
+        line += f'   errors {errors}'
+    if previous is not None:
+        line += '   throughput {:+.0%}  p99 {:+.0%}'.format(
+            result['throughput'] / previous['throughput'] - 1,
+            result['p99_ms'] / previous['p99_ms'] - 1,
+        )
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tags', type=int, default=20, help='por usuario')
+    parser.add_argument('--ingredients', type=int, default=50, help='por usuario')
+    parser.add_argument('--recipes', type=int, default=500, help='por usuario')
+    parser.add_argument('--relations', type=int, default=3,
+                        help='tags e ingredientes por receta')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='por cliente')
+    parser.add_argument('--warmup', type=int, default=1, help='peticiones por cliente')
+    parser.add_argument('--scenarios', help='nombres separados por coma')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--compare', type=Path)
+    parser.add_argument('--rate-limits', action='store_true',
+                        help='mide tambien los limites de RATE_LIMITS')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(Path(tmp) / 'bench.sqlite3', rate_limits=args.rate_limits)
+        # Los errores se cuentan en el resultado
+        logging.getLogger('django.request').disabled = True
+
+        import django
+        start = time.perf_counter()
+        contexts, recipes = seed(args)
+        print(f'seeded {args.users} users, {len(recipes)} recipes '
+              f'in {time.perf_counter() - start:.1f}s')
+        for ctx in contexts:
+            ctx['recipes'] = [recipe.pk for recipe in recipes if recipe.user_id == ctx['user'].pk]
+
+        scenarios = build_scenarios()
+        if args.scenarios:
+            names = set(args.scenarios.split(','))
+            scenarios = [scenario for scenario in scenarios if scenario.name in names]
+
+        previous = {}
+        if args.compare:
+            previous = {
+                result['name']: result
+                for result in json.loads(args.compare.read_text())['results']
+            }
+
+        results = []
+        for scenario in scenarios:
+            result = run_scenario(scenario, contexts, args)
+            print_result(result, previous.get(result['name']))
+            results.append(result)
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {
+                'commit': git_commit(),
+                'date': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'args': {
+                    key: str(value) if isinstance(value, Path) else value
+                    for key, value in vars(args).items()
+                },
+            },
+            'results': results,
+        }, indent=2))
+        print(f'results saved to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+
+GZIP = 'gzip'
+
+# Solo respuestas de la API: el HTML del admin y de la API navegable
+# lleva el token CSRF y refleja datos de la peticion, y comprimirlo sin
+# relleno aleatorio lo expone a BREACH
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+)
+
+
+def gzip_compress(data):
+    # mtime fijo: el mismo contenido comprime a los mismos bytes
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+# Codificaciones disponibles, en orden de preferencia si el cliente no
+# prefiere ninguna
+ENCODERS = {
+    GZIP: gzip_compress,
+}
+
+
+def parse_accept_encoding(header):
+    """Mapea cada codificacion de Accept-Encoding a su q"""
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    return accepted
+
+
+def negotiate(header):
+    """Codificacion de mayor q; a igual q gana el orden de ENCODERS"""
+    if not header:
+        return None
+
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best = None
+    best_quality = 0.0
+    for name in ENCODERS:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+
+    return best
+
+
+def compress(encoding, data):
+    return ENCODERS[encoding](data)
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '')
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.has_header('Content-Encoding')
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+def cache_key(request, response, encoding):
+    """Clave de la variante comprimida, o None si la respuesta no tiene ETag
+
+    El ETag cambia con la version de la coleccion del usuario, asi la
+    misma URL con el mismo ETag tiene siempre el mismo contenido.
+    """
+    etag = response.get('ETag')
+    if not etag:
+        return None
+
+    digest = hashlib.md5(f'{etag}\n{request.get_full_path()}'.encode()).hexdigest()
+
+    return f'compressed:{encoding}:{digest}'
+
+
+def get_cache():
+    return caches[settings.COMPRESSION_CACHE]
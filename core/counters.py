@@ -0,0 +1,57 @@
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from core.shm import SharedTable
+
+
+class Counters(SharedTable):
+    """Enteros compartidos por los procesos del host
+
+    Un contador que falta, o que se perdio al reemplazarse su slot, se
+    crea con time_ns(): un valor nuevo que no coincide con ninguno de los
+    que se entregaron antes. Con la tabla llena se reemplaza el de menor
+    valor, el creado hace mas tiempo.
+    """
+
+    def __init__(self, path, slots, stripes=64):
+        super().__init__(path, slots, 'q', stripes)
+
+    def get(self, key):
+        """Valor de key; lo crea si no existe"""
+        def read(values):
+            if values is None:
+                value = time.time_ns()
+                return (value,), value
+
+            return None, values[0]
+
+        return self.update(key, read)
+
+    def peek(self, key):
+        """Valor de key, o None si no existe"""
+        return self.update(key, lambda values: (None, values and values[0]))
+
+    def incr(self, key):
+        """Suma uno a key y retorna el valor nuevo; lo crea si no existe"""
+        def increment(values):
+            value = time.time_ns() if values is None else values[0] + 1
+            return (value,), value
+
+        return self.update(key, increment)
+
+    def set(self, key, value):
+        self.update(key, lambda values: ((value,), None))
+
+
+@lru_cache(maxsize=None)
+def get_counters():
+    return Counters(settings.COUNTERS_FILE, settings.COUNTERS_SLOTS)
+
+
+@receiver(setting_changed)
+def reset_counters(setting, **kwargs):
+    if setting in ('COUNTERS_FILE', 'COUNTERS_SLOTS') and get_counters.cache_info().currsize:
+        get_counters().close()
+        get_counters.cache_clear()
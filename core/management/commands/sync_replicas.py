@@ -0,0 +1,32 @@
+import sqlite3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.routers import PRIMARY
+
+
+def copy_database(source, target):
+    """Copia una base SQLite con la API de backup, consistente aunque haya lectores"""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+class Command(BaseCommand):
+    """Copia la base primaria sobre cada replica SQLite"""
+    help = 'Copia la base de datos primaria sobre las replicas de DATABASE_REPLICAS'
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No hay replicas configuradas (DJANGO_DB_REPLICAS)')
+
+        source = connections[PRIMARY].settings_dict['NAME']
+        for alias in settings.DATABASE_REPLICAS:
+            target = connections[alias].settings_dict['NAME']
+            connections[alias].close()
+            copy_database(source, target)
+            self.stdout.write(self.style.SUCCESS(f'{alias}: {target}'))
@@ -0,0 +1,370 @@
+import atexit
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+import orjson
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Request latency by route.', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('Response body size by route.', SIZE_BUCKETS),
+}
+COUNTERS = {
+    'http_requests_total': 'Requests by route, method and status.',
+    'db_queries_total': 'SQL queries run while handling requests.',
+    'db_query_duration_seconds_total': 'Time spent in SQL queries.',
+    'serializer_duration_seconds_total': 'Time spent building response data.',
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Suma de los procesos que ya terminaron, dentro de METRICS_DIR
+TOTALS = 'totals.json'
+
+_sample = ContextVar('metrics_sample', default=None)
+
+
+class Sample:
+    """Consultas y tiempo de serializacion de la peticion en curso"""
+    __slots__ = ('queries', 'query_time', 'serializer_time', 'depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.depth = 0
+
+
+def count_queries(execute, sql, params, many, context):
+    """execute_wrapper que suma las consultas a la peticion en curso
+
+    Las conexiones son por hilo; la muestra viaja en el contexto, que
+    sync_to_async copia al hilo donde corre el ORM.
+    """
+    sample = _sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.query_time += time.perf_counter() - start
+
+
+def install(connection):
+    """Agrega count_queries a una conexion, una sola vez"""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def start_sample():
+    """Empieza la muestra de la peticion; devuelve el token para end_sample"""
+    sample = Sample()
+    return sample, _sample.set(sample)
+
+
+def end_sample(token):
+    _sample.reset(token)
+
+
+@contextmanager
+def resume_sample(sample):
+    """Suma a sample las consultas del bloque, como las del cuerpo en streaming
+
+    Sin sample el bloque sigue sumando a la muestra en curso.
+    """
+    if sample is None:
+        yield
+        return
+
+    token = _sample.set(sample)
+    try:
+        yield
+    finally:
+        _sample.reset(token)
+
+
+@contextmanager
+def serializer_timer():
+    """Suma el tiempo del bloque a la peticion
+
+    Las consultas dentro del bloque se descuentan, ya se cuentan como
+    tiempo de SQL; los bloques anidados no se vuelven a sumar.
+    """
+    sample = _sample.get()
+    if sample is None or sample.depth:
+        yield
+        return
+
+    sample.depth += 1
+    query_time = sample.query_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        sample.serializer_time += elapsed - (sample.query_time - query_time)
+        sample.depth -= 1
+
+
+@lru_cache(maxsize=None)
+def timed_serializer(serializer_class):
+    """Subclase del serializador que mide to_representation"""
+
+    class TimedSerializer(serializer_class):
+        def to_representation(self, instance):
+            with serializer_timer():
+                return super().to_representation(instance)
+
+    TimedSerializer.__name__ = serializer_class.__name__
+    TimedSerializer.__qualname__ = serializer_class.__qualname__
+
+    return TimedSerializer
+
+
+class SerializerMetricsMixin:
+    """Mide el tiempo de los serializadores de la vista
+
+    Envuelve la clase en get_serializer porque las vistas redefinen
+    get_serializer_class por accion.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = timed_serializer(self.get_serializer_class())
+        kwargs.setdefault('context', self.get_serializer_context())
+
+        return serializer_class(*args, **kwargs)
+
+
+class Registry:
+    """Contadores e histogramas del proceso
+
+    Cada peticion se registra con una sola toma del lock. Con METRICS_DIR
+    el proceso escribe cada METRICS_FLUSH_INTERVAL segundos una copia en
+    un archivo propio, y el endpoint suma los archivos de todos los
+    procesos.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.last_flush = time.monotonic()
+        # Unico por vida del proceso: un pid reutilizado no pisa contadores
+        self.name = f'{os.getpid()}-{time.time_ns()}.json'
+
+    def observe(self, name, labels, value):
+        """Debe llamarse con el lock tomado"""
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [[0] * (len(HISTOGRAMS[name][1]) + 1), 0.0, 0]
+
+        histogram[0][bisect_left(HISTOGRAMS[name][1], value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def record(self, route, method, status, duration, size, sample):
+        labels = (('route', route), ('method', method))
+        with self.lock:
+            self.counters['http_requests_total', labels + (('status', str(status)),)] += 1
+            self.counters['db_queries_total', labels] += sample.queries
+            self.counters['db_query_duration_seconds_total', labels] += sample.query_time
+            self.counters['serializer_duration_seconds_total', labels] += sample.serializer_time
+            self.observe('http_request_duration_seconds', labels, duration)
+            if size is not None:
+                self.observe('http_response_size_bytes', labels, size)
+
+        directory = settings.METRICS_DIR
+        if directory and time.monotonic() - self.last_flush > settings.METRICS_FLUSH_INTERVAL:
+            self.flush(directory)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, labels, list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def flush(self, directory):
+        """Escribe la copia del proceso de forma atomica"""
+        self.last_flush = time.monotonic()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        write_atomic(directory / self.name, self.snapshot())
+
+
+def write_atomic(path, snapshot):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(orjson.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+
+@atexit.register
+def flush_at_exit():
+    if settings.configured and getattr(settings, 'METRICS_DIR', None):
+        REGISTRY.flush(settings.METRICS_DIR)
+
+
+def merge(snapshots):
+    """Suma copias de varios procesos"""
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+
+    return counters, histograms
+
+
+def to_snapshot(counters, histograms, merged=()):
+    """Inverso de merge, con el formato de Registry.snapshot"""
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+        'histograms': [
+            [name, labels, buckets, total, count]
+            for (name, labels), (buckets, total, count) in histograms.items()
+        ],
+        'merged': list(merged),
+    }
+
+
+def read_snapshot(path):
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        # Otro proceso lo reemplazo o lo borro mientras se leia
+        return None
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+@contextmanager
+def locked(directory):
+    """Lock del directorio entre los procesos que leen las metricas"""
+    with open(directory / '.lock', 'a') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        yield
+
+
+def prune(directory):
+    """Suma a TOTALS las copias de los procesos terminados y las borra
+
+    TOTALS guarda los nombres que suma: si el proceso se corta antes de
+    borrarlas, la siguiente poda las borra sin volver a sumarlas.
+    Debe llamarse con el lock del directorio tomado.
+    """
+    totals = read_snapshot(directory / TOTALS) if (directory / TOTALS).exists() else None
+    already = set(totals['merged']) if totals else set()
+    dead = []
+    for path in directory.glob('*-*.json'):
+        pid = path.name.split('-', 1)[0]
+        if pid.isdigit() and not is_running(int(pid)):
+            dead.append(path)
+
+    pending = [path for path in dead if path.name not in already]
+    if pending:
+        snapshots = [totals] if totals else []
+        snapshots += filter(None, map(read_snapshot, pending))
+        write_atomic(directory / TOTALS, to_snapshot(*merge(snapshots), [path.name for path in pending]))
+    for path in dead:
+        path.unlink(missing_ok=True)
+
+
+def collect():
+    """Copia de este proceso mas las de los demas procesos en METRICS_DIR
+
+    Las copias de los procesos que terminaron se suman a TOTALS.
+    """
+    directory = settings.METRICS_DIR
+    if not directory:
+        return merge([REGISTRY.snapshot()])
+
+    REGISTRY.flush(directory)
+    directory = Path(directory)
+    with locked(directory):
+        prune(directory)
+        snapshots = filter(None, map(read_snapshot, directory.glob('*.json')))
+
+        return merge(snapshots)
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in pairs) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render(counters, histograms):
+    """Formato de texto de Prometheus"""
+    lines = []
+    for name, (description, bounds) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip((*bounds, '+Inf'), buckets):
+                cumulative += bucket
+                le = bound if bound == '+Inf' else format_value(float(bound))
+                lines.append(f'{name}_bucket{format_labels(labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_value(total)}')
+            lines.append(f'{name}_count{format_labels(labels)} {count}')
+
+    for name, description in COUNTERS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+
+    return '\n'.join(lines) + '\n'
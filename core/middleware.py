@@ -0,0 +1,243 @@
+import time
+from functools import partial
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import Throttled
+from core import compression, metrics, ratelimit
+
+
+class ClosingStream:
+    """Cuerpo en streaming que llama a on_close(size) al cerrarse la respuesta
+
+    Django registra close() entre los cierres de la respuesta, que el
+    servidor llama al terminar de enviarla o si el cliente se desconecta.
+    Con sample, las consultas de cada trozo se suman a esa muestra.
+    """
+
+    def __init__(self, content, on_close, sample=None):
+        self.content = content
+        self.on_close = on_close
+        self.sample = sample
+        self.size = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with metrics.resume_sample(self.sample):
+            chunk = next(self.content)
+        self.size += len(chunk)
+
+        return chunk
+
+    def close(self):
+        on_close, self.on_close = self.on_close, None
+        if on_close is not None:
+            on_close(self.size)
+
+
+class AsyncClosingStream(ClosingStream):
+    """ClosingStream para los cuerpos asincronos de ASGI"""
+    __iter__ = None
+    __next__ = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        with metrics.resume_sample(self.sample):
+            chunk = await anext(self.content)
+        self.size += len(chunk)
+
+        return chunk
+
+
+def on_close(response, callback, sample=None):
+    """Llama a callback(size) cuando se cierre la respuesta
+
+    Las respuestas comunes ya estan completas y se cierran en el acto; en
+    las de streaming la vista devuelve antes de generar el cuerpo.
+    """
+    if not response.streaming:
+        callback(len(response.content))
+        return
+
+    stream = AsyncClosingStream if response.is_async else ClosingStream
+    content = response.streaming_content
+    response.streaming_content = stream(aiter(content) if response.is_async else iter(content), callback, sample)
+
+
+class MetricsMiddleware:
+    """Registra latencia, consultas, tamaño y serializacion por ruta
+
+    La ruta es el nombre de la URL resuelta (recipe:recipe-list). Las
+    respuestas en streaming se registran al cerrarse, con el tiempo y las
+    consultas del cuerpo. Funciona tanto bajo WSGI como bajo ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        sample, token = metrics.start_sample()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_sample(token)
+        on_close(response, partial(self.record, request, response, sample, start), sample)
+
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        sample, token = metrics.start_sample()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_sample(token)
+        on_close(response, partial(self.record, request, response, sample, start), sample)
+
+        return response
+
+    def record(self, request, response, sample, start, size):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        route = match.view_name if match is not None else 'unmatched'
+        metrics.REGISTRY.record(route, request.method, response.status_code, duration, size, sample)
+
+
+class RateLimitMiddleware:
+    """Rechaza peticiones antes de que lleguen a la vista y a la base
+
+    Con MAX_CONCURRENT_REQUESTS peticiones en curso en el proceso responde
+    503 sin resolver la URL; las de streaming siguen en curso hasta que se
+    cierra el cuerpo. Despues de resolverla, si el cliente agoto
+    alguno de los presupuestos de RATE_LIMITS por IP o por email para la
+    ruta, responde 429. Ambas respuestas llevan Retry-After. Los
+    presupuestos por usuario los revisa SharedRateThrottle tras autenticar.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Asi Django no la corre en un hilo aparte
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not ratelimit.LIMITER.acquire(settings.MAX_CONCURRENT_REQUESTS):
+            return self.overloaded()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            ratelimit.LIMITER.release()
+            raise
+        on_close(response, self.release)
+
+        return response
+
+    async def __acall__(self, request):
+        if not ratelimit.LIMITER.acquire(settings.MAX_CONCURRENT_REQUESTS):
+            return self.overloaded()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            ratelimit.LIMITER.release()
+            raise
+        on_close(response, self.release)
+
+        return response
+
+    def release(self, size):
+        ratelimit.LIMITER.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return self.throttle(request)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return self.throttle(request)
+
+    def throttle(self, request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+
+        wait = ratelimit.check(request, ratelimit.PRE_VIEW_KEYS)
+        if wait:
+            return ratelimit.error_response(Throttled(wait))
+
+        return None
+
+    def overloaded(self):
+        return ratelimit.error_response(ratelimit.Overloaded(settings.OVERLOAD_RETRY_AFTER))
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas con gzip segun Accept-Encoding
+
+    Reemplaza a GZipMiddleware. Las respuestas con ETag se comprimen una
+    vez por codificacion y se guardan en COMPRESSION_CACHE; las siguientes
+    peticiones con el mismo ETag y URL usan los bytes guardados. Solo se
+    comprimen respuestas 200 de JSON o NDJSON, no streaming, de
+    COMPRESSION_MIN_SIZE bytes o mas; el HTML queda sin comprimir.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if not compression.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        cache = compression.get_cache()
+        key = compression.cache_key(request, response, encoding)
+        body = cache.get(key) if key else None
+        if body is None:
+            body = compression.compress(encoding, response.content)
+            if len(body) >= len(response.content):
+                return response
+            if key:
+                cache.set(key, body)
+
+        response.content = body
+        response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(body))
+
+        return response
@@ -0,0 +1,72 @@
+import re
+from django.db import migrations, models
+import django.db.models.deletion
+import core.models
+
+
+def search_terms(user_id, text):
+    if not text:
+        return ''
+
+    return ' '.join(f'u{user_id}_{word}' for word in re.findall(r'\w+', text))
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.connection.connection.create_function(
+        'recipe_search_terms', 2, search_terms, deterministic=True
+    )
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE core_recipe_search USING fts5("
+        "title, ingredients, tags, "
+        "tokenize = \"unicode61 remove_diacritics 2 tokenchars '_'\")"
+    )
+    # El titulo pesa el doble que los nombres de ingredientes y tags
+    schema_editor.execute(
+        "INSERT INTO core_recipe_search(core_recipe_search, rank) "
+        "VALUES ('rank', 'bm25(10.0, 5.0, 5.0)')"
+    )
+    schema_editor.execute(
+        "INSERT INTO core_recipe_search(rowid, title, ingredients, tags) "
+        "SELECT r.id, recipe_search_terms(r.user_id, r.title), "
+        "recipe_search_terms(r.user_id, (SELECT group_concat(i.name, ' ') "
+        "FROM core_recipe_ingredients ri JOIN core_ingredient i ON i.id = ri.ingredient_id "
+        "WHERE ri.recipe_id = r.id)), "
+        "recipe_search_terms(r.user_id, (SELECT group_concat(t.name, ' ') "
+        "FROM core_recipe_tags rt JOIN core_tag t ON t.id = rt.tag_id "
+        "WHERE rt.recipe_id = r.id)) "
+        "FROM core_recipe r"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE core_recipe_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_user_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeSearch',
+            fields=[
+                ('recipe', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='core.recipe')),
+                ('title', models.TextField()),
+                ('ingredients', models.TextField()),
+                ('tags', models.TextField()),
+                ('document', core.models.SearchDocumentField(db_column='core_recipe_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_recipe_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
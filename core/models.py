@@ -44,6 +44,12 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        # Mismo orden que el listado paginado: -name, id
+        indexes = [
+            models.Index(fields=['user', '-name', 'id'], name='core_tag_user_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -55,6 +61,11 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-name', 'id'], name='core_ingr_user_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -73,3 +84,79 @@ class Recipe(models.Model):
     def __str__(self):
         return self.title
 
+
+
+class Match(models.Lookup):
+    """Consulta FTS5: columna MATCH consulta"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class SearchDocumentField(models.TextField):
+    """Columna oculta de FTS5 con el nombre de la tabla"""
+
+
+SearchDocumentField.register_lookup(Match)
+
+
+class RecipeSearch(models.Model):
+    """Indice FTS5 de recetas, mantenido por recipe.search
+
+    Es una tabla virtual de SQLite creada por su migracion; el rowid es
+    el id de la receta. Cada palabra se guarda calificada con el usuario
+    ('u<id>_<palabra>') para que las listas del indice invertido sean
+    por usuario y la busqueda no crezca con el total de recetas.
+    """
+    recipe = models.OneToOneField(
+        Recipe,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+        on_delete=models.DO_NOTHING,
+    )
+    title = models.TextField()
+    ingredients = models.TextField()
+    tags = models.TextField()
+    document = SearchDocumentField(db_column='core_recipe_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_recipe_search'
+
+
+class PriceStats(models.Model):
+    """Resumen de Recipe.price de las recetas de un tag o ingrediente
+
+    Lo mantiene recipe.stats a medida que cambian las recetas; una fila
+    con count 0 equivale a no tener recetas.
+    """
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    min_price = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=5, decimal_places=2, null=True)
+
+    class Meta:
+        abstract = True
+
+
+class TagPriceStats(PriceStats):
+    tag = models.OneToOneField(
+        Tag,
+        primary_key=True,
+        related_name='price_stats',
+        on_delete=models.CASCADE,
+    )
+
+
+class IngredientPriceStats(PriceStats):
+    ingredient = models.OneToOneField(
+        Ingredient,
+        primary_key=True,
+        related_name='price_stats',
+        on_delete=models.CASCADE,
+    )
@@ -0,0 +1,238 @@
+import fnmatch
+import threading
+import time
+from functools import lru_cache
+import orjson
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.http.multipartparser import MultiPartParserError
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from core.renderers import dumps
+from core.shm import SharedTable
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Claves de los presupuestos: a quien se le cobra cada peticion
+IP = 'ip'
+EMAIL = 'email'
+USER = 'user'
+
+# El middleware revisa antes de la vista las claves que no dependen de la
+# autenticacion; las de usuario las revisa el throttle de DRF
+PRE_VIEW_KEYS = (IP, EMAIL)
+USER_KEYS = (USER,)
+
+
+class Overloaded(exceptions.APIException):
+    """El proceso tiene demasiadas peticiones en curso"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many requests in progress, try again later.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+def parse_rate(rate):
+    """Tokens por segundo de una tasa como las de DRF: '10/min'"""
+    num, period = rate.split('/')
+    return int(num) / DURATIONS[period[0]]
+
+
+class BucketStore(SharedTable):
+    """Token buckets en un mmap compartido por los procesos del host
+
+    Cada slot guarda la ultima recarga y los tokens disponibles. Con la
+    tabla llena se reemplaza el bucket con la recarga mas vieja, que es el
+    que mas probablemente ya esta lleno.
+    """
+
+    def __init__(self, path, slots, stripes=64):
+        super().__init__(path, slots, 'dd', stripes)
+
+    def take(self, key, rate, burst, now=None):
+        """Saca un token del bucket de key
+
+        Retorna 0 si habia, o los segundos hasta el proximo token.
+        """
+        now = time.time() if now is None else now
+
+        def take_token(values):
+            updated, tokens = values if values is not None else (now, burst)
+            # Con el reloj atrasado no se recarga
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            if tokens >= 1:
+                return (now, tokens - 1), 0.0
+
+            return (now, tokens), (1 - tokens) / rate
+
+        return self.update(key, take_token)
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    return BucketStore(settings.RATE_LIMIT_FILE, settings.RATE_LIMIT_SLOTS)
+
+
+@lru_cache(maxsize=1024)
+def budgets_for(route, method, keys):
+    """Presupuestos de RATE_LIMITS que aplican: (nombre, clave, tokens/s, rafaga)"""
+    return tuple(
+        (name, budget['key'], parse_rate(budget['rate']), budget['burst'])
+        for name, budget in settings.RATE_LIMITS.items()
+        if budget['key'] in keys
+        and method in budget['methods']
+        and any(fnmatch.fnmatchcase(route, pattern) for pattern in budget['routes'])
+    )
+
+
+@receiver(setting_changed)
+def reset_limits(setting, **kwargs):
+    if setting in ('RATE_LIMIT_FILE', 'RATE_LIMIT_SLOTS') and get_store.cache_info().currsize:
+        get_store().close()
+        get_store.cache_clear()
+    if setting == 'RATE_LIMITS':
+        budgets_for.cache_clear()
+
+
+def submitted_email(request):
+    """Email del cuerpo de la peticion, en JSON o formulario, o None"""
+    if request.content_type == 'application/json':
+        try:
+            data = orjson.loads(request.body)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+    elif request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        try:
+            data = request.POST
+        except MultiPartParserError:
+            return None
+    else:
+        return None
+
+    email = data.get('email')
+    if not isinstance(email, str) or not email.strip():
+        return None
+
+    return email.strip().lower()
+
+
+def client_address(request):
+    """IP del cliente, como BaseThrottle.get_ident de DRF
+
+    Detras de NUM_PROXIES proxies es la direccion que agrego el mas
+    externo en X-Forwarded-For. A diferencia de DRF, sin NUM_PROXIES no se
+    confia en el encabezado, que el cliente puede inventar.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    num_proxies = api_settings.NUM_PROXIES
+    if not num_proxies or not forwarded:
+        return remote_addr
+
+    addresses = forwarded.split(',')
+    return addresses[-min(num_proxies, len(addresses))].strip()
+
+
+def client_id(request, key):
+    """Cliente de un presupuesto segun su clave, o None si no aplica
+
+    'user' es el usuario ya autenticado; sin usuario cuenta la IP.
+    """
+    if key == EMAIL:
+        email = submitted_email(request)
+        return None if email is None else 'email:' + email
+
+    user = getattr(request, 'user', None) if key == USER else None
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+
+    return 'ip:' + client_address(request)
+
+
+def check(request, keys):
+    """Segundos a esperar si algun presupuesto de la ruta esta agotado, o 0
+
+    Solo revisa los presupuestos cuya clave esta en keys.
+    """
+    match = request.resolver_match
+    if match is None:
+        return 0
+
+    budgets = budgets_for(match.view_name, request.method, keys)
+    if not budgets:
+        return 0
+
+    store = get_store()
+    wait = 0
+    for name, key, rate, burst in budgets:
+        client = client_id(request, key)
+        if client is not None:
+            wait = max(wait, store.take(f'{name}\0{client}', rate, burst))
+
+    return wait
+
+
+def user_wait(request):
+    """Segundos a esperar por los presupuestos por usuario autenticado, o 0"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return 0
+
+    return check(request, USER_KEYS)
+
+
+class SharedRateThrottle(BaseThrottle):
+    """Throttle de DRF con los presupuestos de RATE_LIMITS por usuario
+
+    DRF lo revisa despues de autenticar, asi el bucket es el del usuario
+    del token valido y no el de cualquier encabezado que mande el cliente.
+    """
+
+    def allow_request(self, request, view):
+        self.delay = user_wait(request)
+        return not self.delay
+
+    def wait(self):
+        return self.delay
+
+
+class ConcurrencyLimiter:
+    """Cuenta las peticiones en curso del proceso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+
+    def acquire(self, limit):
+        """Retorna False si ya hay limit peticiones en curso"""
+        with self.lock:
+            if limit is not None and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+
+        return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+LIMITER = ConcurrencyLimiter()
+
+
+def error_response(exc):
+    """Respuesta JSON como la del exception handler de DRF, con Retry-After"""
+    response = HttpResponse(
+        dumps({'detail': exc.detail}), content_type='application/json', status=exc.status_code
+    )
+    if exc.wait is not None:
+        response['Retry-After'] = '%d' % exc.wait
+
+    return response
@@ -0,0 +1,54 @@
+import decimal
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Las fechas pasan por el encoder de DRF para mantener su formato
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+drf_encoder = JSONEncoder()
+
+
+def default(obj):
+    """Serializa los tipos que orjson no soporta"""
+    if isinstance(obj, decimal.Decimal):
+        # Como texto para no perder precision
+        return str(obj)
+
+    return drf_encoder.default(obj)
+
+
+class DecimalTextEncoder(JSONEncoder):
+    """JSONEncoder de DRF con los Decimal como texto, igual que dumps"""
+
+    def default(self, obj):
+        return default(obj)
+
+
+def dumps(data):
+    """Serializa a JSON compacto en bytes con orjson"""
+    ret = orjson.dumps(data, default=default, option=OPTIONS)
+
+    # Igual que JSONRenderer: la salida debe ser un subconjunto de javascript
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    return ret
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer basado en orjson, con la misma salida compacta
+
+    orjson solo indenta con 2 espacios: la salida indentada, como la de la
+    API navegable, la arma JSONRenderer con el indent pedido.
+    """
+    encoder_class = DecimalTextEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
@@ -0,0 +1,117 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from core.counters import get_counters
+
+PRIMARY = 'default'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Envia a las replicas las lecturas hechas dentro del bloque"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_replicas():
+    """Indica si las lecturas van a una replica, que puede estar atrasada"""
+    return _replica_reads.get() and bool(settings.DATABASE_REPLICAS)
+
+
+def pin_key(user_id):
+    return f'primary-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Mantiene las lecturas del usuario en el primario tras escribir
+
+    El fin de la ventana, en nanosegundos, vive en los contadores
+    compartidos: el worker que atiende la siguiente lectura lo ve aunque
+    la escritura la haya atendido otro.
+    """
+    if settings.DATABASE_REPLICAS and settings.REPLICA_PIN_SECONDS:
+        until = time.time_ns() + settings.REPLICA_PIN_SECONDS * 1_000_000_000
+        get_counters().set(pin_key(user_id), until)
+
+
+def is_pinned(user_id):
+    until = get_counters().peek(pin_key(user_id))
+    return until is not None and until > time.time_ns()
+
+
+def can_use_replicas(request):
+    """Solo los metodos seguros de usuarios sin escrituras recientes"""
+    return bool(
+        settings.DATABASE_REPLICAS
+        and request.method in SAFE_METHODS
+        and request.user.is_authenticated
+        and not is_pinned(request.user.pk)
+    )
+
+
+def pin_after_write(request, response):
+    if (
+        request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and request.user.is_authenticated
+    ):
+        pin_to_primary(request.user.pk)
+
+
+class ReplicaRouter:
+    """Lecturas a una replica dentro de replica_reads, el resto al primario
+
+    Las escrituras siempre van al primario, aunque el objeto se haya
+    leido de una replica. Las replicas no se migran: son copias.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """Atiende los metodos seguros desde las replicas
+
+    La marca se pone despues de autenticar, asi el token se lee del
+    primario. Una escritura exitosa fija al usuario en el primario por
+    REPLICA_PIN_SECONDS para que vea sus propios cambios.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if can_use_replicas(request):
+            self.replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            _replica_reads.reset(token)
+            self.replica_token = None
+        else:
+            pin_after_write(request, response)
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,102 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Una clave puede ocupar cualquiera de los WAYS slots de su grupo
+WAYS = 4
+
+
+def key_hash(key):
+    """Hash de 64 bits de la clave; 0 queda para los slots libres"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+
+class SharedTable:
+    """Tabla hash de tamaño fijo en un mmap compartido por los procesos del host
+
+    Cada slot guarda el hash de la clave y valores con el formato de
+    struct de values. Los slots se agrupan de a WAYS y cada clave vive en
+    un slot de su grupo. Cada operacion toma el lock del grupo: un lock de
+    hilos dentro del proceso y un lock fcntl sobre sus bytes entre
+    procesos. Con el grupo lleno se reemplaza el slot con el menor primer
+    valor, que debe ser el mas viejo. Sin path la tabla es anonima y solo
+    la ve el proceso.
+    """
+
+    def __init__(self, path, slots, values, stripes=64):
+        self.slot = struct.Struct('=Q' + values)
+        self.group_size = WAYS * self.slot.size
+        self.groups = max(1, slots // WAYS)
+        size = self.groups * self.group_size
+        if path is None:
+            self.fd = None
+            self.map = mmap.mmap(-1, size)
+        else:
+            os.makedirs(os.path.dirname(path), 0o700, exist_ok=True)
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+            self.map = mmap.mmap(self.fd, size)
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def close(self):
+        self.map.close()
+        if self.fd is not None:
+            os.close(self.fd)
+
+    def update(self, key, func):
+        """Aplica func a los valores de key con el grupo bloqueado
+
+        func recibe los valores guardados, o None si la clave no esta, y
+        retorna (valores nuevos, resultado); con valores None no se escribe.
+        Retorna el resultado.
+        """
+        digest = key_hash(key)
+        group = digest % self.groups
+        start = group * self.group_size
+
+        with self.locks[group % len(self.locks)]:
+            if self.fd is not None and fcntl is not None:
+                fcntl.lockf(self.fd, fcntl.LOCK_EX, self.group_size, start)
+            try:
+                offset, values = self.find(start, digest)
+                values, result = func(values)
+                if values is not None:
+                    if offset is None:
+                        offset = self.evict(start)
+                    self.slot.pack_into(self.map, offset, digest, *values)
+            finally:
+                if self.fd is not None and fcntl is not None:
+                    fcntl.lockf(self.fd, fcntl.LOCK_UN, self.group_size, start)
+
+        return result
+
+    def find(self, start, digest):
+        """Slot de la clave en el grupo: (offset, valores) o (None, None)"""
+        for way in range(WAYS):
+            offset = start + way * self.slot.size
+            slot_digest, *values = self.slot.unpack_from(self.map, offset)
+            if slot_digest == digest:
+                return offset, tuple(values)
+
+        return None, None
+
+    def evict(self, start):
+        """Slot libre del grupo o, si no hay, el de menor primer valor"""
+        oldest, oldest_value = None, None
+        for way in range(WAYS):
+            offset = start + way * self.slot.size
+            slot_digest, first, *_ = self.slot.unpack_from(self.map, offset)
+            if slot_digest == 0:
+                return offset
+            if oldest is None or first < oldest_value:
+                oldest, oldest_value = offset, first
+
+        return oldest
@@ -0,0 +1,9 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from core import metrics
+
+
+@receiver(connection_created)
+def install_metrics(sender, connection, **kwargs):
+    """Cuenta las consultas de cada conexion para las metricas"""
+    metrics.install(connection)
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+def isolated_settings(runtime_dir, rate_limits=False):
+    """Archivos compartidos en runtime_dir y, salvo rate_limits, sin limites de tasa"""
+    return override_settings(
+        RUNTIME_DIR=runtime_dir,
+        RATE_LIMIT_ENABLED=rate_limits,
+        RATE_LIMIT_FILE=os.path.join(runtime_dir, 'ratelimit'),
+        COUNTERS_FILE=os.path.join(runtime_dir, 'counters'),
+        METRICS_DIR=None,
+    )
+
+
+class TestRunner(DiscoverRunner):
+    """Corre los tests sin limites de tasa y con RUNTIME_DIR temporal
+
+    Todos los tests llegan desde 127.0.0.1 y compartirian los mismos
+    buckets; los tests de los limites los activan con override_settings.
+    Los archivos compartidos van a un directorio propio de la corrida para
+    no mezclarse con los del servidor ni con otras corridas, y las
+    metricas quedan por proceso para que cada test vea solo las suyas.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.runtime_dir = tempfile.mkdtemp(prefix='api-avanzado-test-')
+        self.test_settings = isolated_settings(self.runtime_dir)
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.runtime_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,126 @@
+import gzip
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core import compression
+from core.models import Recipe
+from recipe.cache import get_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+class NegotiateTest(SimpleTestCase):
+    """Prueba la negociacion de Accept-Encoding"""
+
+    def test_quality(self):
+        """Prueba que se respete el q del cliente"""
+        self.assertEqual(compression.negotiate('br;q=1, gzip;q=0.5'), 'gzip')
+        self.assertEqual(compression.negotiate('*;q=0.1'), 'gzip')
+        self.assertIsNone(compression.negotiate('gzip;q=0'))
+        self.assertIsNone(compression.negotiate('*, gzip;q=0'))
+
+    def test_unsupported(self):
+        """Prueba que sin codificaciones conocidas no se comprima"""
+        self.assertIsNone(compression.negotiate(''))
+        self.assertIsNone(compression.negotiate('identity, deflate'))
+        self.assertIsNone(compression.negotiate('br, zstd'))
+
+
+class CompressionMiddlewareTest(TestCase):
+    """Prueba la compresion de respuestas y su cache"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user('test@test.com', 'testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(40):
+            Recipe.objects.create(user=self.user, title=f'Tomato soup {i}', price=5)
+
+    def get(self, **params):
+        return self.client.get(RECIPES_URL, params, HTTP_ACCEPT_ENCODING='gzip')
+
+    def test_gzip(self):
+        """Prueba que la respuesta comprimida tenga el mismo contenido"""
+        plain = self.client.get(RECIPES_URL)
+
+        res = self.get()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(int(res['Content-Length']), len(res.content))
+        self.assertIn('Accept-Encoding', res['Vary'])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotIn('Content-Encoding', plain)
+
+    def test_compresses_once(self):
+        """Prueba que la variante comprimida se reutilice"""
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as spy:
+            first = self.get()
+            second = self.get()
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(first.content, second.content)
+
+    def test_new_version_recompresses(self):
+        """Prueba que un cambio en las recetas invalide la variante"""
+        first = self.get()
+        Recipe.objects.create(user=self.user, title='Bread', price=2)
+
+        second = self.get()
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertIn(b'Bread', gzip.decompress(second.content))
+
+    def test_per_url(self):
+        """Prueba que cada URL tenga su propia variante"""
+        first = self.get(page_size=20)
+        second = self.get(page_size=30)
+
+        self.assertNotEqual(gzip.decompress(first.content), gzip.decompress(second.content))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_below_threshold(self):
+        """Prueba que las respuestas chicas no se compriman"""
+        res = self.get()
+
+        self.assertNotIn('Content-Encoding', res)
+
+    def test_html_not_compressed(self):
+        """Prueba que la API navegable no se comprima"""
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT='text/html', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertTrue(res['Content-Type'].startswith('text/html'))
+        self.assertNotIn('Content-Encoding', res)
+
+    def test_errors_not_compressed(self):
+        """Prueba que solo se compriman las respuestas 200"""
+        res = self.client.get(RECIPES_URL, {'fields': 'x' * 2000}, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertGreater(len(res.content), 1024)
+        self.assertNotIn('Content-Encoding', res)
+
+    def test_streaming_not_compressed(self):
+        """Prueba que las exportaciones en streaming no se compriman"""
+        res = self.client.get(
+            reverse('recipe:recipe-export'), {'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertTrue(res.streaming)
+        self.assertNotIn('Content-Encoding', res)
+        b''.join(res.streaming_content)
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_views(self):
+        """Prueba la compresion de las vistas asincronas"""
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+
+        plain = await client.get(RECIPES_URL)
+        res = await client.get(RECIPES_URL, ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.content), plain.content)
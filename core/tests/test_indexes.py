@@ -0,0 +1,43 @@
+from django.db.models import Q
+from django.test import TestCase
+from core import models
+
+
+class ListQueryPlanTest(TestCase):
+    """Prueba que los listados por usuario usen indices y no ordenen en memoria"""
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_tag_list_uses_index(self):
+        """Prueba el plan del listado de tags"""
+        tags = models.Tag.objects.filter(user_id=1).order_by('-name', 'id')
+        self.assertUsesIndex(tags[:101], 'core_tag_user_name_idx')
+
+        page = tags.filter(Q(name__lt='b') | Q(name='b', id__gt=3))
+        self.assertUsesIndex(page[:101], 'core_tag_user_name_idx')
+
+    def test_ingredient_list_uses_index(self):
+        """Prueba el plan del listado de ingredientes, tambien en reversa"""
+        ingredients = models.Ingredient.objects.filter(user_id=1)
+        self.assertUsesIndex(
+            ingredients.order_by('-name', 'id')[:101],
+            'core_ingr_user_name_idx'
+        )
+
+        previous = ingredients.filter(Q(name__gt='b') | Q(name='b', id__lt=3))
+        self.assertUsesIndex(
+            previous.order_by('name', '-id')[:101],
+            'core_ingr_user_name_idx'
+        )
+
+    def test_recipe_list_uses_index(self):
+        """Prueba el plan del listado de recetas
+
+        En SQLite el indice de la clave foranea ya incluye el rowid (id),
+        asi que sirve para filtrar por usuario y ordenar por id.
+        """
+        recipes = models.Recipe.objects.filter(user_id=1).order_by('id')
+        self.assertUsesIndex(recipes.filter(id__gt=5)[:101], 'core_recipe_user_id')
@@ -0,0 +1,258 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core import metrics
+from core.models import Recipe, Tag
+from recipe.cache import get_cache
+
+METRICS_URL = reverse('metrics')
+TAGS_URL = reverse('recipe:tag-list')
+
+LABELS = (('route', 'recipe:tag-list'), ('method', 'GET'))
+
+# Pid de los procesos terminados en las pruebas de la poda
+FINISHED_PID = 999999
+
+
+class MetricsTest(TestCase):
+    """Prueba las metricas por ruta y el endpoint /metrics/"""
+    def setUp(self):
+        get_cache().clear()
+        self.registry = metrics.Registry()
+        patcher = mock.patch.object(metrics, 'REGISTRY', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = get_user_model().objects.create_user('test@test.com', 'testpass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Tag.objects.create(user=self.user, name='Vegan')
+
+    def test_records_route(self):
+        """Prueba que se registren latencia, estado y tamaño por ruta"""
+        res = self.client.get(TAGS_URL)
+
+        counters, histograms = metrics.collect()
+        self.assertEqual(counters['http_requests_total', LABELS + (('status', '200'),)], 1)
+        self.assertEqual(histograms['http_request_duration_seconds', LABELS][2], 1)
+        size = histograms['http_response_size_bytes', LABELS]
+        self.assertEqual(size[1], len(res.content))
+
+    def test_counts_queries(self):
+        """Prueba que se cuenten las consultas de la peticion"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TAGS_URL)
+
+        counters, _ = metrics.collect()
+        self.assertEqual(counters['db_queries_total', LABELS], len(queries))
+        self.assertGreater(counters['db_query_duration_seconds_total', LABELS], 0)
+
+    def test_serializer_time(self):
+        """Prueba que se mida el tiempo del serializador"""
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+        self.client.get(reverse('recipe:recipe-detail', args=[recipe.id]))
+
+        counters, _ = metrics.collect()
+        labels = (('route', 'recipe:recipe-detail'), ('method', 'GET'))
+        self.assertGreater(counters['serializer_duration_seconds_total', labels], 0)
+
+    def test_streaming_response(self):
+        """Prueba que una exportacion se registre al cerrar el cuerpo, con sus consultas"""
+        Recipe.objects.create(user=self.user, title='Soup', price=5)
+        labels = (('route', 'recipe:recipe-export'), ('method', 'GET'))
+
+        res = self.client.get(reverse('recipe:recipe-export'), {'format': 'ndjson'})
+
+        counters, _ = metrics.collect()
+        self.assertNotIn(('http_requests_total', labels + (('status', '200'),)), counters)
+        with CaptureQueriesContext(connection) as queries:
+            body = b''.join(res.streaming_content)
+        self.assertGreater(len(queries), 0)
+        counters, histograms = metrics.collect()
+        self.assertEqual(counters['http_requests_total', labels + (('status', '200'),)], 1)
+        self.assertGreaterEqual(counters['db_queries_total', labels], len(queries))
+        self.assertEqual(histograms['http_response_size_bytes', labels][1], len(body))
+
+    def test_streaming_import(self):
+        """Prueba que las consultas de una importacion cuenten al cerrar el cuerpo"""
+        labels = (('route', 'recipe:recipe-import'), ('method', 'POST'))
+
+        res = self.client.post(
+            reverse('recipe:recipe-import'), '{"title": "Soup", "price": 5}',
+            content_type='application/x-ndjson',
+        )
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(res.streaming_content)
+
+        self.assertTrue(Recipe.objects.filter(user=self.user, title='Soup').exists())
+        counters, _ = metrics.collect()
+        self.assertGreaterEqual(counters['db_queries_total', labels], len(queries))
+        self.assertGreater(len(queries), 0)
+
+    def test_unmatched_route(self):
+        """Prueba que las URLs desconocidas compartan una sola etiqueta"""
+        self.client.get('/unknown/')
+
+        counters, _ = metrics.collect()
+        labels = (('route', 'unmatched'), ('method', 'GET'), ('status', '404'))
+        self.assertEqual(counters['http_requests_total', labels], 1)
+
+    def test_exposition_format(self):
+        """Prueba el formato de texto con buckets acumulados"""
+        self.client.get(TAGS_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = res.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="recipe:tag-list",method="GET",le="+Inf"} 1',
+            body,
+        )
+        self.assertIn('http_requests_total{route="recipe:tag-list",method="GET",status="200"} 1', body)
+
+    def test_merges_processes(self):
+        """Prueba que el endpoint sume las metricas de otros procesos"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        other = metrics.Registry()
+        other.name = 'other.json'
+        sample = metrics.Sample()
+        sample.queries = 3
+        other.record('recipe:tag-list', 'GET', 200, 0.2, 100, sample)
+        other.flush(directory.name)
+
+        with override_settings(METRICS_DIR=directory.name):
+            self.client.get(TAGS_URL)
+            counters, histograms = metrics.collect()
+
+        self.assertEqual(counters['http_requests_total', LABELS + (('status', '200'),)], 2)
+        self.assertEqual(histograms['http_request_duration_seconds', LABELS][2], 2)
+        self.assertGreaterEqual(counters['db_queries_total', LABELS], 4)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        """Prueba que con METRICS_TOKEN el endpoint pida el token"""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Con token no alcanza con una direccion interna
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer other')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_external_address_forbidden(self):
+        """Prueba que sin METRICS_TOKEN solo respondan las direcciones internas"""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='::1')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8']):
+            res = self.client.get(METRICS_URL, REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_proxied_address(self):
+        """Prueba que detras de un proxy cuente la direccion del cliente"""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.5')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            res = self.client.get(METRICS_URL, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.5')
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+            res = self.client.get(METRICS_URL, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='127.0.0.1')
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_prunes_finished_processes(self):
+        """Prueba que las copias de procesos terminados se sumen a un solo archivo"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for i in range(2):
+            other = metrics.Registry()
+            other.name = f'{FINISHED_PID}-{i}.json'
+            other.record('recipe:tag-list', 'GET', 200, 0.2, 100, metrics.Sample())
+            other.flush(directory.name)
+
+        with override_settings(METRICS_DIR=directory.name), \
+                mock.patch.object(metrics, 'is_running', lambda pid: pid != FINISHED_PID):
+            self.client.get(TAGS_URL)
+            for _ in range(2):
+                counters, histograms = metrics.collect()
+
+        names = sorted(path.name for path in Path(directory.name).glob('*.json'))
+        self.assertEqual(names, sorted([metrics.TOTALS, self.registry.name]))
+        self.assertEqual(counters['http_requests_total', LABELS + (('status', '200'),)], 3)
+        self.assertEqual(histograms['http_request_duration_seconds', LABELS][2], 3)
+
+    def test_prune_interrupted(self):
+        """Prueba que una copia ya sumada a TOTALS no se vuelva a sumar"""
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        other = metrics.Registry()
+        other.name = f'{FINISHED_PID}-0.json'
+        other.record('recipe:tag-list', 'GET', 200, 0.2, 100, metrics.Sample())
+        other.flush(directory)
+        # La poda anterior sumo la copia y se corto antes de borrarla
+        totals = metrics.to_snapshot(*metrics.merge([other.snapshot()]), [other.name])
+        metrics.write_atomic(directory / metrics.TOTALS, totals)
+
+        with mock.patch.object(metrics, 'is_running', lambda pid: False):
+            metrics.prune(directory)
+
+        counters, _ = metrics.merge([metrics.read_snapshot(directory / metrics.TOTALS)])
+        self.assertEqual(counters['http_requests_total', LABELS + (('status', '200'),)], 1)
+        self.assertFalse((directory / other.name).exists())
+
+    def test_escapes_labels(self):
+        """Prueba que los valores de las etiquetas se escapen"""
+        self.assertEqual(
+            metrics.format_labels([('route', 'a"b\\c\nd')]),
+            '{route="a\\"b\\\\c\\nd"}',
+        )
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_views(self):
+        """Prueba que se registren las vistas asincronas"""
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+
+        res = await client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counters, _ = metrics.collect()
+        self.assertEqual(counters['http_requests_total', LABELS + (('status', '200'),)], 1)
+        self.assertGreater(counters['db_queries_total', LABELS], 0)
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_streaming_response(self):
+        """Prueba que una exportacion asincrona se registre al cerrar el cuerpo"""
+        await Recipe.objects.acreate(user=self.user, title='Soup', price=5)
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+        labels = (('route', 'recipe:recipe-export'), ('method', 'GET'))
+
+        res = await client.get(reverse('recipe:recipe-export'), {'format': 'ndjson'})
+        body = b''.join([chunk async for chunk in res.streaming_content])
+
+        counters, histograms = metrics.collect()
+        self.assertEqual(counters['http_requests_total', labels + (('status', '200'),)], 1)
+        self.assertGreater(counters['db_queries_total', labels], 0)
+        self.assertEqual(histograms['http_response_size_bytes', labels][1], len(body))
@@ -0,0 +1,344 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core import ratelimit, shm
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+RECIPES_URL = reverse('recipe:recipe-list')
+EXPORT_URL = reverse('recipe:recipe-export')
+
+RATE_LIMITS = {
+    'login': {'routes': ('user:token',), 'methods': ('POST',), 'key': 'ip', 'rate': '1/min', 'burst': 3},
+    'login-account': {
+        'routes': ('user:token',),
+        'methods': ('POST',),
+        'key': 'email',
+        'rate': '1/min',
+        'burst': 4,
+    },
+    'signup': {'routes': ('user:create',), 'methods': ('POST',), 'key': 'ip', 'rate': '1/min', 'burst': 2},
+    'recipe-writes': {
+        'routes': ('recipe:*',),
+        'methods': ('POST', 'PUT', 'PATCH', 'DELETE'),
+        'key': 'user',
+        'rate': '1/min',
+        'burst': 2,
+    },
+}
+
+
+def take_all(path, key, attempts, results):
+    """Proceso de la prueba de contencion: cuenta los tokens obtenidos"""
+    store = ratelimit.BucketStore(path, 1024)
+    results.put(sum(store.take(key, 0.001, 50) == 0 for _ in range(attempts)))
+
+
+class BucketStoreTest(SimpleTestCase):
+    """Prueba los token buckets en el archivo compartido"""
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'buckets')
+        self.store = ratelimit.BucketStore(self.path, 1024)
+        self.addCleanup(self.store.close)
+
+    def test_burst_and_refill(self):
+        """Prueba la rafaga inicial y la recarga con el tiempo"""
+        waits = [self.store.take('client', 0.5, 3, now=100) for _ in range(4)]
+
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 2.0)
+        self.assertGreater(self.store.take('client', 0.5, 3, now=101), 0)
+        self.assertEqual(self.store.take('client', 0.5, 3, now=102), 0)
+
+    def test_keys_are_independent(self):
+        """Prueba que cada clave tenga su propio bucket"""
+        self.store.take('first', 1, 1, now=100)
+
+        self.assertGreater(self.store.take('first', 1, 1, now=100), 0)
+        self.assertEqual(self.store.take('second', 1, 1, now=100), 0)
+
+    def test_shared_between_stores(self):
+        """Prueba que dos mapeos del mismo archivo vean los mismos buckets"""
+        other = ratelimit.BucketStore(self.path, 1024)
+        self.addCleanup(other.close)
+        self.store.take('client', 1, 1, now=100)
+
+        self.assertGreater(other.take('client', 1, 1, now=100), 0)
+
+    def test_creates_directory(self):
+        """Prueba que el archivo se cree dentro de un directorio nuevo"""
+        path = os.path.join(os.path.dirname(self.path), 'deployment', 'buckets')
+        store = ratelimit.BucketStore(path, 1024)
+        self.addCleanup(store.close)
+
+        self.assertEqual(store.take('client', 1, 1), 0)
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+    def test_full_group_evicts(self):
+        """Prueba que con la tabla llena se reemplacen los buckets viejos"""
+        store = ratelimit.BucketStore(None, shm.WAYS)
+        self.addCleanup(store.close)
+        for i in range(shm.WAYS + 1):
+            self.assertEqual(store.take(f'client {i}', 0.001, 1, now=100 + i), 0)
+
+        self.assertGreater(store.take('client 1', 0.001, 1, now=200), 0)
+        self.assertEqual(store.take('client 0', 0.001, 1, now=200), 0)
+
+    def test_thread_contention(self):
+        """Prueba que los hilos no saquen mas tokens que la rafaga"""
+        granted = []
+
+        def worker():
+            granted.append(sum(self.store.take('client', 0.001, 50) == 0 for _ in range(40)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(granted), 50)
+
+    def test_process_contention(self):
+        """Prueba que varios procesos no saquen mas tokens que la rafaga"""
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [
+            context.Process(target=take_all, args=(self.path, 'client', 40, results))
+            for _ in range(6)
+        ]
+        for process in processes:
+            process.start()
+        granted = sum(results.get(timeout=30) for _ in processes)
+        for process in processes:
+            process.join()
+
+        self.assertEqual(granted, 50)
+
+    def test_parse_rate(self):
+        """Prueba las tasas con el formato de DRF"""
+        self.assertEqual(ratelimit.parse_rate('10/s'), 10)
+        self.assertEqual(ratelimit.parse_rate('120/min'), 2)
+        self.assertEqual(ratelimit.parse_rate('36/hour'), 0.01)
+
+
+class RateLimitMiddlewareTest(TestCase):
+    """Prueba los limites por cliente y el rechazo por concurrencia"""
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(
+            RATE_LIMIT_ENABLED=True,
+            RATE_LIMIT_FILE=os.path.join(directory, 'buckets'),
+            RATE_LIMITS=RATE_LIMITS,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user('test@test.com', 'testpass')
+        self.client = APIClient()
+
+    def login(self, password='testpass', **extra):
+        return self.client.post(TOKEN_URL, {'email': 'test@test.com', 'password': password}, **extra)
+
+    def token_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=user).key)
+        return client
+
+    def test_login_throttled(self):
+        """Prueba que pasada la rafaga el login responda 429 sin consultas"""
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # La recarga sigue mientras corren los hashes del login
+        self.assertIn(res['Retry-After'], ('59', '60'))
+        self.assertIn('throttled', res.json()['detail'])
+
+    def test_fake_tokens_share_ip_budget(self):
+        """Prueba que un token inventado por peticion no de un bucket nuevo"""
+        codes = [
+            self.login('wrong', HTTP_AUTHORIZATION=f'Token fake{i}').status_code
+            for i in range(5)
+        ]
+        signups = [
+            self.client.post(
+                CREATE_USER_URL,
+                {'email': f'new{i}@test.com', 'password': 'testpass', 'name': 'New'},
+                HTTP_AUTHORIZATION=f'Token fake{i}',
+            ).status_code
+            for i in range(3)
+        ]
+
+        self.assertEqual(codes, [400] * 3 + [429] * 2)
+        self.assertEqual(signups, [201, 201, 429])
+
+    def test_proxied_clients(self):
+        """Prueba que detras de un proxy cada cliente tenga su bucket"""
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            codes = [
+                self.login('wrong', REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.1').status_code
+                for _ in range(4)
+            ]
+            # Lo que el cliente agrega antes de la direccion del proxy no cuenta
+            spoofed = self.login(
+                'wrong', REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.7, 198.51.100.1'
+            )
+            other = self.client.post(
+                TOKEN_URL, {'email': 'other@test.com', 'password': 'x'},
+                REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.2',
+            )
+
+        self.assertEqual(codes, [400] * 3 + [429])
+        self.assertEqual(spoofed.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forwarded_ignored_without_proxies(self):
+        """Prueba que sin NUM_PROXIES el encabezado no de buckets nuevos"""
+        codes = [
+            self.login('wrong', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}').status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(codes, [400] * 3 + [429])
+
+    def test_login_per_account(self):
+        """Prueba que los intentos contra una cuenta se limiten desde cualquier IP"""
+        codes = [
+            self.login('wrong', REMOTE_ADDR=f'198.51.100.{i}').status_code
+            for i in range(5)
+        ]
+        other = self.client.post(
+            TOKEN_URL, {'email': 'other@test.com', 'password': 'x'}, REMOTE_ADDR='198.51.100.9'
+        )
+
+        self.assertEqual(codes, [400] * 4 + [429])
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_per_account_json(self):
+        """Prueba que el email se lea tambien de un cuerpo JSON"""
+        for i in range(4):
+            self.client.post(
+                TOKEN_URL, {'email': 'Test@test.com', 'password': 'x'},
+                format='json', REMOTE_ADDR=f'198.51.100.{i}',
+            )
+
+        res = self.login(REMOTE_ADDR='198.51.100.9')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_separate_budgets(self):
+        """Prueba que agotar el login no afecte al alta de usuarios"""
+        for _ in range(4):
+            self.login()
+
+        res = self.client.post(CREATE_USER_URL, {'email': 'new@test.com', 'password': 'testpass', 'name': 'New'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_recipe_writes_per_user(self):
+        """Prueba que las escrituras se limiten por token y no las lecturas"""
+        client = self.token_client(self.user)
+        other = self.token_client(get_user_model().objects.create_user('other@test.com', 'testpass'))
+        payload = {'title': 'Soup', 'price': '5.00'}
+        for _ in range(2):
+            self.assertEqual(client.post(RECIPES_URL, payload).status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            res = client.post(RECIPES_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(client.get(RECIPES_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(other.post(RECIPES_URL, payload).status_code, status.HTTP_201_CREATED)
+
+    def test_recipe_writes_fake_tokens(self):
+        """Prueba que los tokens inventados no lleguen al bucket por usuario"""
+        for i in range(4):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token fake{i}')
+            res = self.client.post(RECIPES_URL, {'title': 'Soup', 'price': '5.00'})
+
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_disabled(self):
+        """Prueba que sin RATE_LIMIT_ENABLED no se limite"""
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    @override_settings(MAX_CONCURRENT_REQUESTS=2)
+    def test_overloaded(self):
+        """Prueba el 503 con el proceso lleno de peticiones en curso"""
+        for _ in range(2):
+            self.assertTrue(ratelimit.LIMITER.acquire(2))
+        self.addCleanup(ratelimit.LIMITER.release)
+        self.addCleanup(ratelimit.LIMITER.release)
+
+        with self.assertNumQueries(0):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+    def test_releases_slot(self):
+        """Prueba que cada peticion libere su lugar al terminar"""
+        before = ratelimit.LIMITER.in_flight
+
+        self.login()
+        self.client.get(RECIPES_URL)
+
+        self.assertEqual(ratelimit.LIMITER.in_flight, before)
+
+    def test_streaming_holds_slot(self):
+        """Prueba que una exportacion siga en curso hasta cerrar el cuerpo"""
+        self.client.force_authenticate(self.user)
+        before = ratelimit.LIMITER.in_flight
+
+        res = self.client.get(EXPORT_URL, {'format': 'ndjson'})
+
+        self.assertEqual(ratelimit.LIMITER.in_flight, before + 1)
+        b''.join(res.streaming_content)
+        self.assertEqual(ratelimit.LIMITER.in_flight, before)
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_streaming_holds_slot(self):
+        """Prueba que una exportacion asincrona siga en curso hasta cerrar el cuerpo"""
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+        before = ratelimit.LIMITER.in_flight
+
+        res = await client.get(EXPORT_URL, {'format': 'ndjson'})
+
+        self.assertTrue(res.is_async)
+        self.assertEqual(ratelimit.LIMITER.in_flight, before + 1)
+        [chunk async for chunk in res.streaming_content]
+        self.assertEqual(ratelimit.LIMITER.in_flight, before)
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_views(self):
+        """Prueba los limites con las vistas asincronas"""
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+        url = reverse('recipe:tag-list')
+        for _ in range(2):
+            res = await client.post(url, {'name': 'Vegan'}, content_type='application/json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = await client.post(url, {'name': 'Vegan'}, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(ratelimit.LIMITER.in_flight, 0)
@@ -0,0 +1,85 @@
+import datetime
+import io
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from core.models import Tag
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(TestCase):
+    """Prueba el renderer y el parser basados en orjson"""
+
+    def test_same_output_as_json_renderer(self):
+        """Prueba que la salida sea igual a la de JSONRenderer"""
+        data = [{
+            'id': 1,
+            'title': 'Crème brûlée   "quoted"',
+            'price': '5.00',
+            'tags': [1, 2],
+            'link': None,
+            'created': datetime.datetime(2022, 8, 27, 16, 7, 1, 123456, datetime.timezone.utc),
+            'day': datetime.date(2022, 8, 27),
+            5: True,
+        }]
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_decimal_keeps_precision(self):
+        """Prueba que los Decimal se rendericen como texto exacto"""
+        data = {'price': Decimal('12345678901234567890.12')}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            b'{"price":"12345678901234567890.12"}'
+        )
+
+    def test_indent(self):
+        """Prueba que se respete el indent pedido, como en JSONRenderer"""
+        data = {'a': [1, 2], 'price': Decimal('5.10')}
+
+        for media_type, context in (
+            ('application/json; indent=4', {}),
+            ('application/json', {'indent': 4}),
+            ('application/json; indent=2', {}),
+        ):
+            with self.subTest(media_type=media_type, context=context):
+                self.assertEqual(
+                    ORJSONRenderer().render(data, media_type, context),
+                    JSONRenderer().render({**data, 'price': '5.10'}, media_type, context)
+                )
+
+        rendered = ORJSONRenderer().render(data, 'application/json; indent=4')
+        self.assertIn(b'\n    "a": [', rendered)
+
+    def test_browsable_api_indent(self):
+        """Prueba que la API navegable muestre el JSON con 4 espacios"""
+        user = get_user_model().objects.create_user('test@test.com', 'testpass')
+        Tag.objects.create(user=user, name='Vegan')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        res = client.get(reverse('recipe:tag-list'), HTTP_ACCEPT='text/html')
+
+        self.assertContains(res, '\n    &quot;results&quot;: [')
+        self.assertNotContains(res, '\n  &quot;results&quot;')
+
+    def test_parse(self):
+        """Prueba que el parser lea lo mismo que JSONParser"""
+        body = '{"title": "Soup", "price": 10.10, "tags": [1, 2], "ok": true}'.encode()
+
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_parse_error(self):
+        """Prueba que un JSON invalido lance ParseError"""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '))
@@ -0,0 +1,227 @@
+import multiprocessing
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.management.commands.sync_replicas import copy_database
+from core.models import Recipe, Tag
+from core.routers import PRIMARY, ReplicaRouter, is_pinned, pin_to_primary, replica_reads
+from recipe.cache import get_cache
+
+REPLICA = 'replica_test'
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+ME_URL = reverse('user:me')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Prueba el ruteo de lecturas a las replicas"""
+    def setUp(self):
+        # La replica es otra conexion a la misma base de prueba
+        settings_dict = dict(connections[PRIMARY].settings_dict)
+        replica = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, REPLICA)
+        connections[REPLICA] = replica
+        self.addCleanup(connections.__delitem__, REPLICA)
+        self.addCleanup(replica.close)
+        self.replica_sql = []
+        replica.execute_wrappers.append(self.record_replica_sql)
+
+        cache.clear()
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.write_aliases = []
+        db_for_write = ReplicaRouter.db_for_write
+
+        def spy(router, model, **hints):
+            alias = db_for_write(router, model, **hints)
+            self.write_aliases.append(alias)
+            return alias
+
+        patcher = mock.patch.object(ReplicaRouter, 'db_for_write', spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_replica_sql(self, execute, sql, params, many, context):
+        self.replica_sql.append(sql)
+        return execute(sql, params, many, context)
+
+    def assertNoReplicaWrites(self):
+        self.assertNotIn(REPLICA, self.write_aliases)
+        for sql in self.replica_sql:
+            self.assertTrue(sql.lstrip().upper().startswith('SELECT'), sql)
+
+    def test_reads_use_replica(self):
+        """Prueba que los listados y el detalle lean de la replica"""
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        for url in (RECIPES_URL, TAGS_URL, reverse('recipe:recipe-detail', args=[recipe.id])):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertTrue(self.replica_sql)
+        self.assertNoReplicaWrites()
+
+    def test_writes_use_primary(self):
+        """Prueba que ninguna escritura llegue a la replica"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        detail = reverse('recipe:recipe-detail', args=[recipe.id])
+
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        self.client.post(RECIPES_URL, {'title': 'Pie', 'price': 3, 'tags': [tag.id]})
+        self.client.patch(detail, {'title': 'Stew'})
+        self.client.patch(ME_URL, {'name': 'New name'})
+        self.client.delete(detail)
+
+        self.assertIn(PRIMARY, self.write_aliases)
+        self.assertNoReplicaWrites()
+        self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_objects_read_from_replica_saved_to_primary(self):
+        """Prueba que guardar un objeto leido de la replica use el primario"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        with replica_reads():
+            tag = Tag.objects.get(user=self.user)
+            self.assertEqual(tag._state.db, REPLICA)
+
+            tag.name = 'Vegetarian'
+            tag.save()
+
+        self.assertEqual(self.write_aliases[-1], PRIMARY)
+        self.assertNoReplicaWrites()
+        self.assertTrue(Tag.objects.filter(name='Vegetarian').exists())
+
+    def test_reads_pinned_after_write(self):
+        """Prueba que tras escribir el usuario lea del primario"""
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        self.replica_sql.clear()
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.data['results'][0]['name'], 'Dessert')
+        self.assertEqual(self.replica_sql, [])
+
+    def test_pin_is_per_user(self):
+        """Prueba que la escritura de un usuario no fije a otros"""
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        self.replica_sql.clear()
+        user2 = get_user_model().objects.create_user('other@test.com', 'password')
+        client = APIClient()
+        client.force_authenticate(user2)
+
+        client.get(TAGS_URL)
+
+        self.assertTrue(self.replica_sql)
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pin_disabled(self):
+        """Prueba que sin ventana las lecturas vuelvan a la replica"""
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        self.replica_sql.clear()
+
+        self.client.get(TAGS_URL)
+
+        self.assertTrue(self.replica_sql)
+
+    def test_pin_shared_between_processes(self):
+        """Prueba que la escritura atendida por otro worker fije al usuario"""
+        context = multiprocessing.get_context('fork')
+        process = context.Process(target=pin_to_primary, args=(self.user.pk,))
+        process.start()
+        process.join()
+
+        self.assertTrue(is_pinned(self.user.pk))
+
+    @override_settings(REPLICA_PIN_SECONDS=1)
+    def test_pin_expires(self):
+        """Prueba que pasada la ventana las lecturas vuelvan a la replica"""
+        with mock.patch('core.routers.time.time_ns', return_value=0):
+            pin_to_primary(self.user.pk)
+
+        self.assertFalse(is_pinned(self.user.pk))
+
+    def test_replica_reads_not_cached(self):
+        """Prueba que lo leido de una replica no se cachee ni lleve ETag"""
+        Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+        for _ in range(2):
+            self.replica_sql.clear()
+            res = self.client.get(RECIPES_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', res)
+            self.assertTrue(self.replica_sql)
+
+    @override_settings(ROOT_URLCONF='app.async_urls')
+    async def test_async_replica_reads_not_cached(self):
+        """Prueba lo mismo con las vistas asincronas"""
+        await Recipe.objects.acreate(user=self.user, title='Soup', price=5)
+        token = await Token.objects.aget(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+
+        for _ in range(2):
+            self.replica_sql.clear()
+            res = await client.get(RECIPES_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', res)
+            self.assertTrue(self.replica_sql)
+
+    def test_primary_reads_cached(self):
+        """Prueba que tras escribir las lecturas del primario si se cacheen"""
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        self.client.post(RECIPES_URL, {'title': 'Soup', 'price': 5})
+
+        first = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertIn('ETag', first)
+        self.assertEqual(second.content, first.content)
+
+    def test_failed_write_does_not_pin(self):
+        """Prueba que una escritura rechazada no fije al usuario"""
+        self.client.post(TAGS_URL, {'name': ''})
+
+        self.client.get(TAGS_URL)
+
+        self.assertTrue(self.replica_sql)
+
+
+class SyncReplicasTest(SimpleTestCase):
+    """Prueba la copia de la base primaria a una replica"""
+    def test_copy_database(self):
+        """Prueba que la replica quede con los datos del primario"""
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / 'primary.sqlite3'
+            target = Path(directory) / 'replica.sqlite3'
+            conn = sqlite3.connect(source)
+            conn.execute('CREATE TABLE item (id integer)')
+            conn.execute('INSERT INTO item VALUES (1)')
+            conn.commit()
+            conn.close()
+
+            copy_database(source, target)
+
+            conn = sqlite3.connect(target)
+            self.assertEqual(conn.execute('SELECT id FROM item').fetchall(), [(1,)])
+            conn.close()
@@ -0,0 +1,51 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+class ProductionSqliteProfileTest(SimpleTestCase):
+    """Prueba las opciones de SQLite del perfil de produccion"""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'db.sqlite3'
+        self.wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            **settings.SQLITE_PRODUCTION_DATABASE,
+            'NAME': str(self.path),
+        }, alias='production')
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Prueba que cada conexion nueva tenga los pragmas"""
+        pragmas = settings.SQLITE_PRAGMAS
+        self.assertEqual(self.pragma('journal_mode'), pragmas['journal_mode'].lower())
+        # NORMAL es el nivel 1 de synchronous
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), pragmas['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+
+    def test_transactions_take_write_lock(self):
+        """Prueba que la transaccion bloquee a otros escritores desde el inicio"""
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        self.wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.addCleanup(self.wrapper.set_autocommit, True)
+        self.addCleanup(self.wrapper.rollback)
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('INSERT INTO item VALUES (1)')
+
+        # Las lecturas siguen funcionando con WAL
+        self.assertEqual(other.execute('SELECT count(*) FROM item').fetchone(), (0,))
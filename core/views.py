@@ -1,3 +1,36 @@
-from django.shortcuts import render
+import hmac
+import ipaddress
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework.settings import api_settings
+from core import metrics, ratelimit
 
-# Create your views here.
+
+def is_allowed(request):
+    """Con METRICS_TOKEN pide el token; sin token, una direccion interna
+
+    La direccion es la del cliente detras de NUM_PROXIES proxies. Una
+    peticion reenviada sin NUM_PROXIES no cuenta como interna: detras de
+    un proxy en el mismo host todas llegarian desde 127.0.0.1.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+    if not api_settings.NUM_PROXIES and 'HTTP_X_FORWARDED_FOR' in request.META:
+        return False
+
+    try:
+        address = ipaddress.ip_address(ratelimit.client_address(request))
+    except ValueError:
+        return False
+
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def metrics_view(request):
+    """Metricas de todos los procesos en formato de texto de Prometheus"""
+    if not is_allowed(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(metrics.render(*metrics.collect()), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,9 @@
+from django.urls import path, include
+from recipe.async_views import async_urlpatterns
+from recipe.urls import router
+
+app_name = 'recipe'
+
+urlpatterns = [
+    path('', include(async_urlpatterns(router.urls)))
+]
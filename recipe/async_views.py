@@ -0,0 +1,366 @@
+from functools import cached_property, wraps
+from itertools import islice
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import URLPattern
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from core import ratelimit
+from core.metrics import serializer_timer
+from core.models import Tag, Ingredient, Recipe
+from core.renderers import dumps
+from core.routers import can_use_replicas, pin_after_write, replica_reads
+from recipe import serializers, cache, search, filters, fieldsets
+from recipe.pagination import NameKeysetPagination, RecipeKeysetPagination
+from recipe.projections import arecipe_rows
+from user.authentication import CachedTokenAuthentication
+
+JSON = 'application/json'
+
+# Partes del cuerpo en streaming que se piden al hilo de la vista por vez
+STREAM_BATCH_SIZE = 100
+
+
+def accepts_json(request):
+    """Las vistas asincronas solo responden JSON"""
+    if 'format' in request.GET:
+        return False
+
+    accept = request.META.get('HTTP_ACCEPT', '')
+    if not accept:
+        return True
+
+    return 'text/html' not in accept and (JSON in accept or '*/*' in accept)
+
+
+async def iterate_in_thread(iterable, batch_size=STREAM_BATCH_SIZE):
+    """Itera un iterador sincrono por bloques en el hilo de las vistas
+
+    Las consultas del iterador corren siempre en el mismo hilo, el de la
+    conexion, y solo hay un bloque en memoria a la vez.
+    """
+    iterator = iter(iterable)
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    try:
+        while batch := await next_batch():
+            for item in batch:
+                yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def async_fallback(view):
+    """Vista DRF como vista asincrona; el streaming queda asincrono
+
+    Bajo ASGI Django consume los cuerpos en streaming sincronos con
+    sync_to_async(list), cargando el cuerpo entero en memoria.
+    """
+    sync_view = sync_to_async(view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        response = await sync_view(request, *args, **kwargs)
+        if response.streaming and not response.is_async:
+            response.streaming_content = iterate_in_thread(response.streaming_content)
+
+        return response
+
+    return wrapper
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(dumps(data), content_type=JSON, status=status_code)
+
+
+def error_response(exc):
+    # Igual que el exception handler de DRF: los errores de validacion
+    # se responden tal cual
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = json_response(data, exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response['WWW-Authenticate'] = CachedTokenAuthentication.keyword
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+
+    return response
+
+
+class AsyncAPIView:
+    """Vista asincrona que atiende las lecturas y altas JSON de un viewset
+
+    Los metodos sin version asincrona, los formatos distintos de JSON y
+    los cuerpos que no son JSON se delegan en la vista DRF original, asi
+    las URLs, la autenticacion y los permisos son los mismos. Los listados
+    son solo la version de FastListMixin: sin FAST_LIST_RESPONSES tambien
+    se delegan. ETags, cache de respuestas, paginacion, limites y replicas
+    usan las mismas funciones que las vistas DRF.
+
+    Los caches se usan con la API sincrona: los backends de Django no
+    tienen API asincrona nativa (aget es sync_to_async(get)) y los caches
+    en memoria no bloquean, asi se evita un salto de hilo por llamada.
+    """
+    authentication = CachedTokenAuthentication()
+    version_collection = None
+    # El GET es un listado armado desde values(), como FastListMixin
+    fast_list = False
+
+    def __init__(self, request, kwargs):
+        self.request = request
+        self.kwargs = kwargs
+
+    @classmethod
+    def as_view(cls, fallback):
+        fallback_view = async_fallback(fallback)
+
+        async def view(request, *args, **kwargs):
+            handler = getattr(cls, request.method.lower(), None)
+            if handler is None or args or 'format' in kwargs or not accepts_json(request):
+                return await fallback_view(request, *args, **kwargs)
+
+            if request.method == 'GET' and cls.fast_list and not settings.FAST_LIST_RESPONSES:
+                return await fallback_view(request, *args, **kwargs)
+
+            if request.method == 'POST' and request.content_type != JSON:
+                return await fallback_view(request, *args, **kwargs)
+
+            try:
+                auth = await cls.authentication.aauthenticate(request)
+                if auth is None:
+                    raise exceptions.NotAuthenticated()
+
+                request.user, request.auth = auth
+                # Igual que SharedRateThrottle en las vistas DRF
+                wait = ratelimit.user_wait(request)
+                if wait:
+                    raise exceptions.Throttled(wait)
+
+                if can_use_replicas(request):
+                    with replica_reads():
+                        return await handler(cls(request, kwargs))
+
+                response = await handler(cls(request, kwargs))
+                pin_after_write(request, response)
+
+                return response
+            except exceptions.APIException as exc:
+                return error_response(exc)
+
+        # Igual que las vistas DRF: la API se autentica por token
+        view.csrf_exempt = True
+        view.view_class = cls
+        view.fallback = fallback
+
+        return view
+
+    def get_queryset(self):
+        return self.model.objects.filter(user=self.request.user)
+
+    @cached_property
+    def sparse_fields(self):
+        """Campos de ?fields= y ?exclude=, igual que SparseFieldsetMixin"""
+        return fieldsets.parse_fields(self.request.GET, self.serializer_class.Meta.fields)
+
+    def get_data(self):
+        try:
+            return orjson.loads(self.request.body)
+        except orjson.JSONDecodeError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+
+    async def conditional_response(self, handler):
+        """Responde 304 si el ETag coincide, igual que ConditionalGetMixin"""
+        version, etag, matches = cache.check_etag(self.request, self.version_collection, JSON)
+        if matches:
+            return cache.not_modified(etag)
+
+        return cache.set_etag(await handler(version), etag)
+
+
+class AsyncCachedResponseMixin:
+    """Comparte el cache de respuestas de CachedResponseMixin"""
+
+    async def cached_response(self, handler, version):
+        cached = cache.get_cached_response(self.request, version)
+        if cached is not None:
+            return cached
+
+        response = await handler()
+        cache.store_response(self.request, version, response)
+
+        return response
+
+
+class AsyncBasicAttrView(AsyncAPIView):
+    """Listado y alta asincronos de tags e ingredientes"""
+    pagination_class = NameKeysetPagination
+    list_values = ('id', 'name')
+    bulk_max_items = 1000
+    fast_list = True
+
+    async def get(self):
+        return await self.conditional_response(self.list)
+
+    async def list(self, version):
+        paginator = self.pagination_class()
+        queryset = self.get_queryset().values(*self.list_values)
+        page = await paginator.apaginate_queryset(queryset, Request(self.request))
+
+        return json_response(paginator.get_paginated_data(fieldsets.project(page, self.sparse_fields)))
+
+    async def post(self):
+        data = self.get_data()
+        kwargs = {}
+        if isinstance(data, list):
+            kwargs.update(many=True, allow_empty=False, max_length=self.bulk_max_items)
+
+        serializer = self.serializer_class(data=data, **kwargs)
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        user = self.request.user
+        if isinstance(data, list):
+            await sync_to_async(serializer.save)(user=user)
+        else:
+            serializer.instance = await self.model.objects.acreate(
+                user=user, **serializer.validated_data
+            )
+        with serializer_timer():
+            data = serializer.data
+
+        return json_response(data, status.HTTP_201_CREATED)
+
+
+class AsyncTagView(AsyncBasicAttrView):
+    model = Tag
+    serializer_class = serializers.TagSerializer
+    version_collection = cache.TAGS
+
+
+class AsyncIngredientView(AsyncBasicAttrView):
+    model = Ingredient
+    serializer_class = serializers.IngredientSerializer
+    version_collection = cache.INGREDIENTS
+
+
+class AsyncRecipeListView(AsyncCachedResponseMixin, AsyncAPIView):
+    """Listado y alta asincronos de recetas"""
+    model = Recipe
+    serializer_class = serializers.RecipeSerializer
+    version_collection = cache.RECIPES
+    pagination_class = RecipeKeysetPagination
+    list_values = ('id', 'title', 'price', 'link')
+    fast_list = True
+
+    async def get(self):
+        return await self.conditional_response(self.list)
+
+    async def list(self, version):
+        return await self.cached_response(self.render_list, version)
+
+    @property
+    def search_query(self):
+        return search.get_query(self.request)
+
+    @property
+    def snapshot_ordering(self):
+        return search.ORDERING if self.search_query else None
+
+    async def render_list(self):
+        paginator = self.pagination_class()
+        queryset = filters.filter_recipes(self.get_queryset(), self.request.GET)
+        values = fieldsets.recipe_columns(self.list_values, self.sparse_fields)
+        if self.search_query:
+            queryset = search.search_recipes(queryset, self.search_query, self.request.user.pk)
+            values = (*values, 'rank')
+        page = await paginator.apaginate_queryset(
+            queryset.values(*values), Request(self.request), view=self
+        )
+
+        with serializer_timer():
+            rows = await arecipe_rows(page, self.sparse_fields)
+
+        return json_response(paginator.get_paginated_data(rows))
+
+    async def post(self):
+        data = self.get_data()
+        # La validacion de las relaciones y el alta con sus tablas
+        # intermedias usan el ORM sincrono dentro de una transaccion
+        return await sync_to_async(self.create)(data)
+
+    def create(self, data):
+        request = Request(self.request)
+        request.user = self.request.user
+        serializer = self.serializer_class(data=data, context={'request': request})
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        serializer.save(user=self.request.user)
+        with serializer_timer():
+            data = serializer.data
+
+        return json_response(data, status.HTTP_201_CREATED)
+
+
+class AsyncRecipeDetailView(AsyncCachedResponseMixin, AsyncAPIView):
+    """Detalle asincrono de una receta"""
+    model = Recipe
+    serializer_class = serializers.RecipeDetailSerializer
+    version_collection = cache.RECIPES
+    columns = ('id', 'title', 'price', 'link')
+
+    async def get(self):
+        return await self.conditional_response(self.retrieve)
+
+    async def retrieve(self, version):
+        return await self.cached_response(self.render_detail, version)
+
+    async def render_detail(self):
+        fields = self.sparse_fields
+        queryset = self.get_queryset().prefetch_related(
+            *fieldsets.prefetches_for(('ingredients', 'tags'), fields)
+        )
+        if fields is not None:
+            queryset = queryset.only(*fieldsets.recipe_columns(self.columns, fields))
+        try:
+            recipe = await queryset.aget(pk=self.kwargs['pk'])
+        except (Recipe.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise exceptions.NotFound(
+                f'No {Recipe._meta.object_name} matches the given query.'
+            )
+
+        with serializer_timer():
+            data = self.serializer_class(recipe, fields=fields).data
+
+        return json_response(data)
+
+
+ASYNC_VIEWS = {
+    'tag-list': AsyncTagView,
+    'ingredient-list': AsyncIngredientView,
+    'recipe-list': AsyncRecipeListView,
+    'recipe-detail': AsyncRecipeDetailView,
+}
+
+
+def async_urlpatterns(patterns):
+    """Cambia las vistas DRF con version asincrona, conservando ruta y nombre
+
+    Las demas pasan por async_fallback, asi sus respuestas en streaming
+    (importacion y exportacion) no se cargan enteras en memoria.
+    """
+    wrapped = []
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern):
+            view_class = ASYNC_VIEWS.get(pattern.name)
+            if view_class is not None:
+                view = view_class.as_view(pattern.callback)
+            else:
+                view = async_fallback(pattern.callback)
+            pattern = URLPattern(pattern.pattern, view, pattern.default_args, pattern.name)
+        wrapped.append(pattern)
+
+    return wrapped
@@ -0,0 +1,187 @@
+import hashlib
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from core.counters import get_counters
+from core.routers import reading_replicas
+
+RESPONSE_CACHE = 'responses'
+
+RECIPES = 'recipes'
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+
+# Coleccion de cada modelo, por su label
+COLLECTIONS = {
+    'core.recipe': RECIPES,
+    'core.tag': TAGS,
+    'core.ingredient': INGREDIENTS,
+}
+
+
+def get_cache():
+    return caches[RESPONSE_CACHE]
+
+
+def version_key(user_id, collection):
+    return f'version:{collection}:{user_id}'
+
+
+def get_version(user_id, collection):
+    """Retorna la version actual de una coleccion del usuario
+
+    Las versiones viven en los contadores compartidos: una escritura en
+    un proceso cambia la version que ven todos los procesos del host.
+    """
+    return get_counters().get(version_key(user_id, collection))
+
+
+def bump_version(user_id, collection):
+    get_counters().incr(version_key(user_id, collection))
+
+
+def invalidate(user_id, *collections):
+    """Invalida las respuestas y ETags de colecciones del usuario"""
+    def bump():
+        for collection in collections:
+            bump_version(user_id, collection)
+
+    bump()
+    # Se repite al confirmar la transaccion para descartar lo que otra
+    # peticion haya cacheado leyendo los datos anteriores mientras tanto
+    transaction.on_commit(bump)
+
+
+def bulk_create(model, objects):
+    """bulk_create que invalida la coleccion de los usuarios de objects
+
+    bulk_create no emite post_save, asi que las señales no invalidan.
+    """
+    created = model.objects.bulk_create(objects)
+    collection = COLLECTIONS[model._meta.label_lower]
+    for user_id in {obj.user_id for obj in created}:
+        invalidate(user_id, collection)
+
+    return created
+
+
+def response_key(request, version):
+    """Clave por usuario, version, url completa y formato aceptado"""
+    digest = hashlib.md5(
+        '\n'.join((
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        )).encode()
+    ).hexdigest()
+
+    return f'recipe-response:{request.user.pk}:{version}:{digest}'
+
+
+def build_etag(user_id, collection, version, media_type):
+    digest = hashlib.md5(
+        f'{user_id}:{collection}:{version}:{media_type}'.encode()
+    ).hexdigest()
+
+    return f'W/"{digest}"'
+
+
+def check_etag(request, collection, media_type):
+    """Version de la coleccion, su ETag y si If-None-Match coincide"""
+    version = get_version(request.user.pk, collection)
+    etag = build_etag(request.user.pk, collection, version, media_type)
+
+    return version, etag, etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag)
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+
+    etags = parse_etags(header)
+    return '*' in etags or etag.removeprefix('W/') in {
+        tag.removeprefix('W/') for tag in etags
+    }
+
+
+def not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+
+    return response
+
+
+def is_current(response):
+    """Las respuestas 200 leidas del primario corresponden a la version
+
+    Las leidas de una replica pueden tener datos anteriores a ella: no
+    llevan ETag ni se cachean.
+    """
+    return response.status_code == 200 and not reading_replicas()
+
+
+def set_etag(response, etag):
+    if is_current(response):
+        response['ETag'] = etag
+
+    return response
+
+
+def get_cached_response(request, version):
+    """Respuesta cacheada para la url y la version, o None"""
+    cached = get_cache().get(response_key(request, version))
+    if cached is None:
+        return None
+
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def store_response(request, version, response):
+    """Cachea una respuesta renderizada si corresponde a la version"""
+    if is_current(response):
+        get_cache().set(response_key(request, version), (response.content, response['Content-Type']))
+
+
+class ConditionalGetMixin:
+    """Responde 304 a If-None-Match sin tocar el ORM ni los serializadores"""
+    version_collection = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        _, etag, matches = check_etag(request, self.version_collection, request.accepted_media_type)
+        if matches:
+            return not_modified(etag)
+
+        return set_etag(handler(request, *args, **kwargs), etag)
+
+
+class CachedResponseMixin:
+    """Cachea las respuestas renderizadas de list y retrieve por usuario"""
+    version_collection = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        version = get_version(request.user.pk, self.version_collection)
+        cached = get_cached_response(request, version)
+        if cached is not None:
+            return cached
+
+        response = handler(request, *args, **kwargs)
+        # La replica se decide ahora: la respuesta se renderiza despues
+        if is_current(response):
+            response.add_post_render_callback(
+                lambda rendered: store_response(request, version, rendered)
+            )
+
+        return response
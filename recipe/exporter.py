@@ -0,0 +1,18 @@
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_rows(queryset, chunk_size=None):
+    """Genera las recetas como filas leyendo la base por bloques
+
+    iterator() con chunk_size precarga las relaciones de cada bloque, asi
+    la memoria usada no depende de la cantidad de recetas.
+    """
+    for recipe in queryset.iterator(chunk_size=chunk_size or EXPORT_CHUNK_SIZE):
+        yield {
+            'id': recipe.id,
+            'title': recipe.title,
+            'ingredients': [ingredient.pk for ingredient in recipe.ingredients.all()],
+            'tags': [tag.pk for tag in recipe.tags.all()],
+            'price': str(recipe.price),
+            'link': recipe.link,
+        }
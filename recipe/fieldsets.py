@@ -0,0 +1,94 @@
+from functools import cached_property
+from rest_framework.exceptions import ValidationError
+
+FIELDS = 'fields'
+EXCLUDE = 'exclude'
+
+# Acciones que aceptan ?fields= y ?exclude=
+READ_ACTIONS = ('list', 'retrieve')
+
+# Campos de RecipeSerializer que vienen de tablas intermedias
+RECIPE_RELATIONS = ('ingredients', 'tags')
+
+
+def parse_names(params, name, available):
+    """Lee una lista de campos separados por coma: ?fields=id,title"""
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+
+    names = {item.strip() for item in value.split(',') if item.strip()}
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise ValidationError({name: [f'Unknown fields: {", ".join(unknown)}.']})
+
+    return names
+
+
+def parse_fields(params, available):
+    """Campos de available que quedan con ?fields= y ?exclude=
+
+    Conserva el orden del serializador; retorna None si no hay recorte.
+    """
+    requested = parse_names(params, FIELDS, available)
+    excluded = parse_names(params, EXCLUDE, available)
+    if requested is None and excluded is None:
+        return None
+
+    fields = tuple(
+        name for name in available
+        if (requested is None or name in requested) and name not in (excluded or ())
+    )
+    if not fields:
+        raise ValidationError({EXCLUDE if excluded else FIELDS: ['At least one field is required.']})
+
+    return fields
+
+
+def project(rows, fields):
+    """Deja en cada fila de values() solo los campos pedidos"""
+    if fields is None:
+        return list(rows)
+
+    return [{name: row[name] for name in fields} for row in rows]
+
+
+def recipe_columns(columns, fields):
+    """Columnas de la receta que hay que leer; id siempre, lo usa la paginacion"""
+    if fields is None:
+        return columns
+
+    return tuple(column for column in columns if column == 'id' or column in fields)
+
+
+def prefetches_for(prefetches, fields):
+    """Quita las precargas de las relaciones que no se piden"""
+    if fields is None:
+        return prefetches
+
+    return tuple(
+        prefetch for prefetch in prefetches
+        if getattr(prefetch, 'prefetch_to', prefetch) in fields
+    )
+
+
+class SparseFieldsetMixin:
+    """Recorta los campos de las lecturas con ?fields= y ?exclude=
+
+    El serializador recibe los campos con el argumento fields; la vista
+    usa sparse_fields para no leer columnas ni relaciones que no salen.
+    """
+
+    @cached_property
+    def sparse_fields(self):
+        """Campos pedidos, o None si la respuesta los lleva todos"""
+        if self.action not in READ_ACTIONS:
+            return None
+
+        return parse_fields(self.request.query_params, self.get_serializer_class().Meta.fields)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.sparse_fields is not None:
+            kwargs.setdefault('fields', self.sparse_fields)
+
+        return super().get_serializer(*args, **kwargs)
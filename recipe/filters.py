@@ -0,0 +1,82 @@
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from core.models import Recipe
+
+MAX_IDS = 50
+
+ALL = 'all'
+ANY = 'any'
+
+# Parametro de la consulta -> (tabla intermedia, columna del relacionado)
+RELATIONS = {
+    'tags': (Recipe.tags.through, 'tag_id'),
+    'ingredients': (Recipe.ingredients.through, 'ingredient_id'),
+}
+
+
+def parse_ids(params, name):
+    """Lee una lista de ids separados por coma: ?tags=3,7"""
+    value = params.get(name, '').strip()
+    if not value:
+        return []
+
+    try:
+        ids = list(dict.fromkeys(int(item) for item in value.split(',')))
+    except ValueError:
+        raise ValidationError({name: ['Expected a comma separated list of ids.']})
+
+    if len(ids) > MAX_IDS:
+        raise ValidationError({name: [f'Ensure there are no more than {MAX_IDS} ids.']})
+
+    return ids
+
+
+def parse_match(params, name):
+    """Lee ?<name>_match=all|any, por defecto all"""
+    param = f'{name}_match'
+    match = params.get(param, ALL)
+    if match not in (ALL, ANY):
+        raise ValidationError({param: [f'Expected "{ALL}" or "{ANY}".']})
+
+    return match
+
+
+def with_any(queryset, through, column, ids):
+    """Recetas con al menos uno de los ids: EXISTS sobre la tabla intermedia"""
+    return queryset.filter(Exists(
+        through.objects.filter(recipe_id=OuterRef('pk'), **{f'{column}__in': ids})
+    ))
+
+
+def with_all(queryset, through, column, ids):
+    """Recetas con todos los ids: IN de un GROUP BY con HAVING COUNT"""
+    matches = (
+        through.objects
+        .filter(**{f'{column}__in': ids})
+        .values('recipe_id')
+        .annotate(matched=Count('*'))
+        .filter(matched=len(ids))
+        .values('recipe_id')
+    )
+
+    return queryset.filter(pk__in=matches)
+
+
+def filter_recipes(queryset, params):
+    """Aplica ?tags= y ?ingredients= con su semantica all/any
+
+    Las consultas recorren solo los indices (relacionado, receta) de las
+    tablas intermedias, sin join ni DISTINCT sobre las recetas.
+    """
+    for name, (through, column) in RELATIONS.items():
+        ids = parse_ids(params, name)
+        match = parse_match(params, name)
+        if not ids:
+            continue
+
+        if match == ANY or len(ids) == 1:
+            queryset = with_any(queryset, through, column, ids)
+        else:
+            queryset = with_all(queryset, through, column, ids)
+
+    return queryset
@@ -0,0 +1,246 @@
+import random
+from decimal import Decimal
+from contextlib import contextmanager
+from itertools import accumulate
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from core.models import Tag, Ingredient, Recipe
+from recipe import search, stats
+
+BATCH_SIZE = 10000
+
+# Cache de paginas de SQLite durante la carga, en KiB
+CACHE_SIZE_KIB = 262144
+
+# Exponente de las distribuciones Zipf: pocos usuarios con muchas
+# recetas y pocos tags e ingredientes en la mayoria de las recetas
+SKEW = 1.1
+
+TAG_NAMES = (
+    'vegan vegetarian dessert breakfast lunch dinner quick healthy spicy '
+    'glutenfree keto italian mexican asian comfort baking grill soup salad '
+    'snack holiday budget kids party seafood'
+).split()
+
+INGREDIENT_NAMES = (
+    'tomato garlic onion pepper salt sugar flour butter egg milk cream cheese '
+    'rice pasta bread chicken beef pork salmon tuna shrimp beans lentil '
+    'chickpea potato carrot spinach mushroom zucchini eggplant broccoli '
+    'lemon lime orange apple banana mango coconut almond walnut honey '
+    'ginger curry cumin paprika oregano basil parsley cilantro vanilla '
+    'chocolate yogurt oil vinegar soy'
+).split()
+
+TITLE_WORDS = (
+    'classic easy creamy spicy roasted grilled baked crispy fresh smoky '
+    'soup stew salad curry pie cake tart bowl pasta risotto tacos '
+    'sandwich burger pancakes omelette casserole skillet'
+).split()
+
+PER_RECIPE_INGREDIENTS = (2, 12)
+PER_RECIPE_TAGS = (0, 5)
+
+
+def zipf_weights(size):
+    """Pesos acumulados de una Zipf de size elementos, para random.choices"""
+    return list(accumulate(1 / rank ** SKEW for rank in range(1, size + 1)))
+
+
+def names(vocabulary, count):
+    """count nombres distintos; si el vocabulario no alcanza se numeran"""
+    return [
+        vocabulary[i % len(vocabulary)] + (f' {i // len(vocabulary)}' if i >= len(vocabulary) else '')
+        for i in range(count)
+    ]
+
+
+def next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+def link_sql(through, column):
+    qn = connection.ops.quote_name
+    return f'INSERT INTO {qn(through._meta.db_table)} (recipe_id, {qn(column)}) VALUES (%s, %s)'
+
+
+@contextmanager
+def bulk_load(tables):
+    """Prepara SQLite para la carga; debe usarse dentro de la transaccion
+
+    Agranda el cache de paginas y quita los indices de tables, que se
+    vuelven a crear al final: armar un indice de una vez es mas rapido que
+    mantenerlo fila por fila. En SQLite el DDL es transaccional, si la
+    carga falla los indices vuelven con el rollback.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        previous = cursor.fetchone()[0]
+        cursor.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KIB}')
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join(['%s'] * len(tables))})",
+            tables,
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    try:
+        yield
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA cache_size = {previous}')
+
+
+def batches(total, size):
+    for offset in range(0, total, size):
+        yield offset, min(size, total - offset)
+
+
+class Generator:
+    """Genera datos sinteticos con bulk_create, determinista por semilla
+
+    Las claves primarias se asignan de antemano, asi las tablas
+    intermedias se arman sin leer los ids insertados. bulk_create no
+    emite signals: el indice de busqueda y las estadisticas de precio se
+    regeneran una sola vez al final. Todos los usuarios comparten un
+    hash de contraseña calculado una vez.
+    """
+
+    def __init__(self, users, recipes, tags=20, ingredients=50, seed=0,
+                 password='password', batch_size=BATCH_SIZE, email_domain='example.com'):
+        self.users = users
+        self.recipes = recipes
+        self.tags = tags
+        self.ingredients = ingredients
+        self.rng = random.Random(seed)
+        self.password = password
+        self.batch_size = batch_size
+        self.email_domain = email_domain
+
+    def run(self, progress=None):
+        """Inserta todo en una transaccion; progress recibe (tabla, filas)"""
+        self.progress = progress or (lambda table, rows: None)
+        links = [Recipe.tags.through._meta.db_table, Recipe.ingredients.through._meta.db_table]
+        with transaction.atomic(), bulk_load(links):
+            user_ids = self.create_users()
+            tag_ids = self.create_attrs(Tag, TAG_NAMES, self.tags, user_ids)
+            ingredient_ids = self.create_attrs(Ingredient, INGREDIENT_NAMES, self.ingredients, user_ids)
+            self.create_recipes(user_ids, tag_ids, ingredient_ids)
+
+        self.rebuild()
+
+    def create_users(self):
+        User = get_user_model()
+        first = next_pk(User)
+        password = make_password(self.password)
+        for offset, size in batches(self.users, self.batch_size):
+            User.objects.bulk_create(
+                [
+                    User(
+                        pk=first + i,
+                        email=f'user{first + i}@{self.email_domain}',
+                        name=f'User {first + i}',
+                        password=password,
+                    )
+                    for i in range(offset, offset + size)
+                ],
+                batch_size=self.batch_size,
+            )
+            self.progress(User._meta.db_table, offset + size)
+
+        return range(first, first + self.users)
+
+    def create_attrs(self, model, vocabulary, per_user, user_ids):
+        """Crea per_user objetos por usuario; retorna sus ids por usuario"""
+        first = next_pk(model)
+        labels = names(vocabulary, per_user)
+        objects = []
+        ids = {}
+        pk = first
+        for user_id in user_ids:
+            ids[user_id] = range(pk, pk + per_user)
+            # El orden de popularidad de los nombres cambia por usuario
+            for name in self.rng.sample(labels, per_user):
+                objects.append(model(pk=pk, user_id=user_id, name=name))
+                pk += 1
+            if len(objects) >= self.batch_size:
+                model.objects.bulk_create(objects, batch_size=self.batch_size)
+                self.progress(model._meta.db_table, pk - first)
+                objects = []
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.progress(model._meta.db_table, pk - first)
+
+        return ids
+
+    def pick(self, population, weights, low, high):
+        """Entre low y high elementos distintos, sesgados hacia los primeros"""
+        if not population:
+            return ()
+
+        high = min(high, len(population))
+        count = self.rng.randint(min(low, high), high)
+        picked = dict.fromkeys(self.rng.choices(population, cum_weights=weights, k=count))
+        while len(picked) < count:
+            # choices repite elementos; se sortean los que faltan
+            picked.update(dict.fromkeys(
+                self.rng.choices(population, cum_weights=weights, k=count - len(picked))
+            ))
+
+        return picked
+
+    def price(self):
+        # Log-normal con mediana ~12, limitada por max_digits=5
+        return Decimal(f'{min(999.99, self.rng.lognormvariate(2.5, 0.8)):.2f}')
+
+    def title(self):
+        return ' '.join(self.rng.sample(TITLE_WORDS, self.rng.randint(2, 4)))
+
+    def create_recipes(self, user_ids, tag_ids, ingredient_ids):
+        """Crea las recetas y sus enlaces con tags e ingredientes
+
+        Las tablas intermedias tienen varias filas por receta; se insertan
+        con executemany, sin instanciar un modelo por fila.
+        """
+        first = next_pk(Recipe)
+        owners = self.rng.choices(user_ids, cum_weights=zipf_weights(len(user_ids)), k=self.recipes)
+        tag_weights = zipf_weights(self.tags)
+        ingredient_weights = zipf_weights(self.ingredients)
+        tags_sql = link_sql(Recipe.tags.through, 'tag_id')
+        ingredients_sql = link_sql(Recipe.ingredients.through, 'ingredient_id')
+
+        for offset, size in batches(self.recipes, self.batch_size):
+            recipes, recipe_tags, recipe_ingredients = [], [], []
+            for pk in range(first + offset, first + offset + size):
+                user_id = owners[pk - first]
+                recipes.append(Recipe(pk=pk, user_id=user_id, title=self.title(), price=self.price()))
+                recipe_tags.extend(
+                    (pk, tag_id)
+                    for tag_id in self.pick(tag_ids[user_id], tag_weights, *PER_RECIPE_TAGS)
+                )
+                recipe_ingredients.extend(
+                    (pk, ingredient_id)
+                    for ingredient_id in self.pick(
+                        ingredient_ids[user_id], ingredient_weights, *PER_RECIPE_INGREDIENTS
+                    )
+                )
+
+            Recipe.objects.bulk_create(recipes, batch_size=self.batch_size)
+            with connection.cursor() as cursor:
+                cursor.executemany(tags_sql, recipe_tags)
+                cursor.executemany(ingredients_sql, recipe_ingredients)
+            self.progress(Recipe._meta.db_table, offset + size)
+
+    def rebuild(self):
+        """Regenera las tablas derivadas que mantienen las signals"""
+        for kind in stats.RELATIONS:
+            stats.recompute(kind)
+        search.rebuild()
@@ -0,0 +1,122 @@
+from itertools import islice
+import orjson
+from django.db import transaction
+from core.models import Recipe, Tag, Ingredient
+from recipe import cache, search, stats
+from recipe.serializers import RecipeImportSerializer
+
+IMPORT_CHUNK_SIZE = 500
+
+INVALID_PK = 'Invalid pk "{pk}" - object does not exist.'
+
+
+def read_lines(stream):
+    """Lee el cuerpo NDJSON linea a linea sin cargarlo entero en memoria"""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_line(line):
+    """Decodifica y valida los campos simples de una linea"""
+    try:
+        data = orjson.loads(line)
+    except orjson.JSONDecodeError as exc:
+        return None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+
+    serializer = RecipeImportSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+
+    return serializer.validated_data, None
+
+
+def existing_ids(model, user, rows, field):
+    ids = {pk for data in rows for pk in data[field]}
+    if not ids:
+        return set()
+
+    return set(
+        model.objects.filter(user=user, pk__in=ids).values_list('pk', flat=True)
+    )
+
+
+def missing_errors(data, known):
+    errors = {}
+    for field in ('ingredients', 'tags'):
+        missing = [pk for pk in data[field] if pk not in known[field]]
+        if missing:
+            errors[field] = [INVALID_PK.format(pk=pk) for pk in missing]
+
+    return errors
+
+
+def import_chunk(lines, user):
+    """Importa un bloque de lineas y retorna el resultado de cada una"""
+    results = {}
+    rows = []
+    for number, line in lines:
+        data, errors = parse_line(line)
+        if errors:
+            results[number] = {'line': number, 'errors': errors}
+        else:
+            rows.append((number, data))
+
+    valid = [data for _, data in rows]
+    known = {
+        'ingredients': existing_ids(Ingredient, user, valid, 'ingredients'),
+        'tags': existing_ids(Tag, user, valid, 'tags'),
+    }
+    recipes = []
+    for number, data in rows:
+        errors = missing_errors(data, known)
+        if errors:
+            results[number] = {'line': number, 'errors': errors}
+        else:
+            recipes.append((number, data))
+
+    if recipes:
+        with transaction.atomic():
+            created = cache.bulk_create(Recipe, [
+                Recipe(
+                    user=user,
+                    title=data['title'],
+                    price=data['price'],
+                    link=data.get('link', ''),
+                )
+                for _, data in recipes
+            ])
+            Recipe.ingredients.through.objects.bulk_create([
+                Recipe.ingredients.through(recipe_id=recipe.pk, ingredient_id=pk)
+                for recipe, (_, data) in zip(created, recipes)
+                for pk in dict.fromkeys(data['ingredients'])
+            ])
+            Recipe.tags.through.objects.bulk_create([
+                Recipe.tags.through(recipe_id=recipe.pk, tag_id=pk)
+                for recipe, (_, data) in zip(created, recipes)
+                for pk in dict.fromkeys(data['tags'])
+            ])
+            search.index_recipes(recipe.pk for recipe in created)
+            for kind in stats.RELATIONS:
+                stats.add_prices(kind, [
+                    (pk, recipe.price)
+                    for recipe, (_, data) in zip(created, recipes)
+                    for pk in dict.fromkeys(data[kind])
+                ])
+        for recipe, (number, _) in zip(created, recipes):
+            results[number] = {'line': number, 'id': recipe.pk}
+
+    return [results[number] for number, _ in lines]
+
+
+def import_recipes(stream, user, chunk_size=IMPORT_CHUNK_SIZE):
+    """Importa recetas NDJSON por bloques y genera un resultado por linea"""
+    for lines in chunked(read_lines(stream), chunk_size):
+        yield from import_chunk(lines, user)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from core.models import RecipeSearch
+from recipe import search
+
+
+class Command(BaseCommand):
+    """Regenera el indice de busqueda de recetas"""
+    help = 'Regenera el indice FTS5 de recetas desde cero'
+
+    def handle(self, *args, **options):
+        connection = search.get_connection()
+        if not search.is_enabled(connection):
+            self.stderr.write('La busqueda solo esta disponible en SQLite')
+            return
+
+        search.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'{RecipeSearch.objects.count()} recetas indexadas'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipe import stats
+
+
+class Command(BaseCommand):
+    """Regenera las estadisticas de precio por tag e ingrediente"""
+    help = (
+        'Compara las estadisticas de precio con la agregacion en vivo y las '
+        'regenera desde cero'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo compara; termina con error si hay diferencias',
+        )
+
+    def handle(self, *args, **options):
+        drift = {kind: stats.compare(kind) for kind in stats.RELATIONS}
+        for kind, pks in drift.items():
+            self.stdout.write(f'{kind}: {len(pks)} filas distintas de la agregacion en vivo')
+            if pks:
+                self.stdout.write(f'  ids: {", ".join(map(str, pks[:20]))}')
+
+        if options['check']:
+            if any(drift.values()):
+                raise CommandError('Las estadisticas de precio no coinciden')
+            return
+
+        for kind in stats.RELATIONS:
+            stats.recompute(kind)
+            if stats.compare(kind):
+                raise CommandError(f'{kind}: el recalculo no coincide con la agregacion en vivo')
+
+        self.stdout.write(self.style.SUCCESS('Estadisticas de precio regeneradas'))
@@ -0,0 +1,254 @@
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Max, Q, Window
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """Paginacion por cursor sobre un orden compuesto y unico
+
+    El cursor guarda los valores de todas las columnas del orden de la
+    ultima fila vista, asi cada pagina es un rango del indice sin OFFSET
+    ni COUNT y los cursores siguen siendo validos aunque se inserten filas.
+    La ultima columna del orden debe ser unica (normalmente 'id').
+
+    Si la vista define snapshot_ordering, un orden como el rank de bm25
+    que cambia con cualquier fila del indice, el cursor no guarda una
+    posicion sino las filas ya mostradas (ver get_snapshot_queryset).
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    # Filas que se recorren con snapshot_ordering: el cursor lleva sus ids
+    max_snapshot_rows = 500
+    # Anotacion con el mayor id de las filas al pedir la primera pagina
+    last_id_field = 'snapshot_last_id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Version asincrona de paginate_queryset"""
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Retorna la consulta de la pagina pedida, con una fila de mas"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        snapshot_ordering = getattr(view, 'snapshot_ordering', None)
+        if snapshot_ordering:
+            return self.get_snapshot_queryset(queryset, snapshot_ordering)
+
+        self.snapshot = False
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.reverse = self.cursor is not None and self.cursor.reverse
+        self.position = self.decode_position(self.cursor, queryset)
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.position, self.reverse))
+
+        return queryset[:self.page_size + 1]
+
+    def get_snapshot_queryset(self, queryset, ordering):
+        """Consulta de la pagina pedida de un orden inestable, con una fila de mas
+
+        El cursor guarda el mayor id que coincidia al pedir la primera
+        pagina y los ids ya mostrados. Cada pagina son las filas mas
+        relevantes que faltan mostrar: aunque el orden cambie entre paginas
+        ninguna fila se repite ni se saltea, y las filas nuevas quedan fuera.
+        Se recorren hasta max_snapshot_rows filas.
+        """
+        self.snapshot = True
+        self.ordering = ordering
+        self.last_id, self.seen = self.decode_snapshot(self.cursor)
+        self.snapshot_limit = min(self.page_size, self.max_snapshot_rows - len(self.seen))
+
+        queryset = queryset.order_by(*ordering)
+        if self.last_id is None:
+            queryset = queryset.annotate(**{self.last_id_field: Window(Max('id'))})
+        else:
+            queryset = queryset.filter(id__lte=self.last_id).exclude(id__in=self.seen)
+
+        return queryset[:self.snapshot_limit + 1]
+
+    def decode_snapshot(self, cursor):
+        """(mayor id, ids mostrados) del cursor, o (None, []) sin cursor"""
+        if cursor is None or cursor.position is None:
+            return None, []
+
+        try:
+            last_id, seen = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(seen, list) or len(seen) > self.max_snapshot_rows:
+            raise NotFound(self.invalid_cursor_message)
+        # bool es int: True no es un id valido
+        if any(type(value) is not int for value in (last_id, *seen)):
+            raise NotFound(self.invalid_cursor_message)
+
+        return last_id, seen
+
+    def set_page(self, results):
+        """Arma la pagina y los cursores a partir de las filas leidas"""
+        if self.snapshot:
+            return self.set_snapshot_page(results)
+
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.position is not None
+
+        if self.page:
+            self.next_position = self.get_position(self.page[-1])
+            self.previous_position = self.get_position(self.page[0])
+        else:
+            self.next_position = self.previous_position = self.position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def set_snapshot_page(self, results):
+        """Igual que set_page para las paginas de snapshot_ordering"""
+        self.page = results[:self.snapshot_limit]
+        shown = len(self.seen) + len(self.page)
+        self.has_next = len(results) > len(self.page) and shown < self.max_snapshot_rows
+        self.has_previous = bool(self.seen)
+        if self.last_id is None and self.page:
+            self.last_id = self.get_value(self.page[0], self.last_id_field)
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_data(self, data):
+        """Mismo contenido que get_paginated_response, sin el Response"""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_ordering(self, request, queryset, view):
+        """La vista puede cambiar el orden con keyset_ordering"""
+        return getattr(view, 'keyset_ordering', None) or self.ordering
+
+    def get_keyset_filter(self, position, reverse):
+        """Construye la condicion "fila posterior al cursor" para el orden"""
+        condition = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, position):
+            field = order.lstrip('-')
+            descending = order.startswith('-') != reverse
+            lookup = '__lt' if descending else '__gt'
+            condition |= equal & Q(**{field + lookup: value})
+            equal &= Q(**{field: value})
+
+        return condition
+
+    def get_position(self, item):
+        """Retorna los valores del orden para una fila"""
+        return [self.get_value(item, order.lstrip('-')) for order in self.ordering]
+
+    def get_value(self, item, field):
+        if isinstance(item, dict):
+            return item[field]
+
+        return getattr(item, field)
+
+    def decode_position(self, cursor, queryset):
+        """Valores del cursor convertidos al tipo de cada columna del orden"""
+        if cursor is None or cursor.position is None:
+            return None
+
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            return [
+                self.to_python(queryset, order.lstrip('-'), value)
+                for order, value in zip(self.ordering, position)
+            ]
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, queryset, name, value):
+        """Valida un valor del cursor con el campo o la anotacion del orden"""
+        # bool es int: True no es un id valido
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise TypeError(name)
+
+        annotation = queryset.query.annotations.get(name)
+        field = annotation.output_field if annotation is not None else queryset.model._meta.get_field(name)
+
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.snapshot:
+            return self.encode_snapshot(self.seen + [self.get_value(item, 'id') for item in self.page])
+
+        return self.encode_position(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.snapshot:
+            # La pagina anterior son las filas mas relevantes sin las ultimas mostradas
+            return self.encode_snapshot(self.seen[:max(0, len(self.seen) - self.page_size)])
+
+        return self.encode_position(self.previous_position, reverse=True)
+
+    def encode_snapshot(self, seen):
+        position = json.dumps([self.last_id, seen], separators=(',', ':'))
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def encode_position(self, position, reverse):
+        if position is not None:
+            position = json.dumps(position, separators=(',', ':'), default=str)
+
+        return self.encode_cursor(Cursor(offset=0, reverse=reverse, position=position))
+
+
+class NameKeysetPagination(KeysetPagination):
+    """Paginacion para tags e ingredientes"""
+    ordering = ('-name', 'id')
+
+
+class RecipeKeysetPagination(KeysetPagination):
+    """Paginacion para recetas"""
+    ordering = ('id',)
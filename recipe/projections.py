@@ -0,0 +1,135 @@
+from functools import lru_cache
+from django.conf import settings
+from rest_framework.response import Response
+from core.metrics import serializer_timer
+from core.models import Recipe
+from recipe.serializers import RecipeSerializer
+
+
+@lru_cache(maxsize=None)
+def price_field():
+    """Campo del serializador, para formatear el precio exactamente igual"""
+    return RecipeSerializer().fields['price']
+
+
+def related_queryset(through, source, target, ids):
+    """Pares (objeto, relacionado) de la tabla intermedia, ordenados"""
+    return (
+        through.objects
+        .filter(**{source + '__in': ids})
+        .order_by(source, target)
+        .values_list(source, target)
+    )
+
+
+def group_related(ids, pairs):
+    """Agrupa los ids relacionados de cada objeto"""
+    related = {pk: [] for pk in ids}
+    for pk, related_pk in pairs:
+        related[pk].append(related_pk)
+
+    return related
+
+
+def ingredient_pairs(ids):
+    return related_queryset(Recipe.ingredients.through, 'recipe_id', 'ingredient_id', ids)
+
+
+def tag_pairs(ids):
+    return related_queryset(Recipe.tags.through, 'recipe_id', 'tag_id', ids)
+
+
+def build_recipe_rows(rows, ingredients, tags, fields=None):
+    """Arma las filas; con fields solo esos campos, en el mismo orden"""
+    to_price = price_field().to_representation
+    if fields is not None:
+        getters = {
+            'id': lambda row: row['id'],
+            'title': lambda row: row['title'],
+            'ingredients': lambda row: ingredients[row['id']],
+            'tags': lambda row: tags[row['id']],
+            'price': lambda row: to_price(row['price']),
+            'link': lambda row: row['link'],
+        }
+        getters = [(name, getters[name]) for name in fields]
+
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'ingredients': ingredients[row['id']],
+            'tags': tags[row['id']],
+            'price': to_price(row['price']),
+            'link': row['link'],
+        }
+        for row in rows
+    ]
+
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+
+def recipe_rows(rows, fields=None):
+    """Arma la salida de RecipeSerializer desde filas de values()
+
+    Las relaciones que no estan en fields no se consultan.
+    """
+    ids = [row['id'] for row in rows]
+    if not ids:
+        return []
+
+    return build_recipe_rows(
+        rows,
+        group_related(ids, ingredient_pairs(ids)) if wants(fields, 'ingredients') else None,
+        group_related(ids, tag_pairs(ids)) if wants(fields, 'tags') else None,
+        fields,
+    )
+
+
+async def arecipe_rows(rows, fields=None):
+    """Version asincrona de recipe_rows"""
+    ids = [row['id'] for row in rows]
+    if not ids:
+        return []
+
+    return build_recipe_rows(
+        rows,
+        group_related(ids, [pair async for pair in ingredient_pairs(ids)])
+        if wants(fields, 'ingredients') else None,
+        group_related(ids, [pair async for pair in tag_pairs(ids)])
+        if wants(fields, 'tags') else None,
+        fields,
+    )
+
+
+class FastListMixin:
+    """Arma el listado desde values() sin instanciar modelos ni serializadores
+
+    La salida debe ser identica a la del serializador de la vista; se
+    desactiva con FAST_LIST_RESPONSES = False.
+    """
+    list_values = ('id', 'name')
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_RESPONSES:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.prefetch_related(None).values(*self.get_list_values())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        with serializer_timer():
+            rows = self.get_list_rows(rows)
+        if page is not None:
+            return self.get_paginated_response(rows)
+
+        return Response(rows)
+
+    def get_list_values(self):
+        return self.list_values
+
+    def get_list_rows(self, rows):
+        return list(rows)
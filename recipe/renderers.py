@@ -0,0 +1,49 @@
+import csv
+from rest_framework.renderers import BaseRenderer
+from core.renderers import dumps
+
+
+class EchoBuffer:
+    """Buffer que retorna lo escrito, para generar CSV por filas"""
+    def write(self, value):
+        return value
+
+
+class StreamingRenderer(BaseRenderer):
+    """Renderer que tambien sabe generar su salida fila por fila"""
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.render_stream(rows))
+
+    def render_stream(self, rows):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_stream(self, rows):
+        for row in rows:
+            yield dumps(row) + b'\n'
+
+
+class CSVRenderer(StreamingRenderer):
+    """Renderiza filas planas; las listas se separan con espacios"""
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_stream(self, rows):
+        writer = csv.writer(EchoBuffer())
+        header = None
+        for row in rows:
+            if header is None:
+                header = list(row)
+                yield writer.writerow(header).encode()
+
+            yield writer.writerow([
+                ' '.join(map(str, value)) if isinstance(value, list) else value
+                for value in (row.get(field) for field in header)
+            ]).encode()
@@ -0,0 +1,142 @@
+import re
+from itertools import islice
+from django.db import connections, router, transaction
+from django.db.models import F
+from core.models import Recipe, Tag, Ingredient, RecipeSearch
+
+INDEX_CHUNK_SIZE = 500
+MAX_TERMS = 10
+
+TERM = re.compile(r'\w+')
+
+# Orden por relevancia; el rank de bm25 depende de todo el indice, asi que
+# el cursor guarda las filas ya mostradas (ver KeysetPagination.get_snapshot_queryset)
+ORDERING = ('rank', 'id')
+
+
+def get_connection():
+    return connections[router.db_for_write(RecipeSearch)]
+
+
+def is_enabled(connection):
+    """El indice FTS5 solo existe en SQLite"""
+    return connection.vendor == 'sqlite'
+
+
+def search_terms(user_id, text):
+    """Califica cada palabra con el usuario: 'u1_sopa u1_tomate'"""
+    if not text:
+        return ''
+
+    return ' '.join(f'u{user_id}_{word}' for word in TERM.findall(text))
+
+
+def register_functions(connection):
+    """Registra recipe_search_terms en una conexion SQLite nueva"""
+    connection.connection.create_function(
+        'recipe_search_terms', 2, search_terms, deterministic=True
+    )
+
+
+def documents_sql():
+    """Arma las filas del indice (rowid, title, ingredients, tags)"""
+    recipe = Recipe._meta.db_table
+    ingredients = Recipe.ingredients.through._meta.db_table
+    tags = Recipe.tags.through._meta.db_table
+
+    return f"""
+        SELECT r.id,
+            recipe_search_terms(r.user_id, r.title),
+            recipe_search_terms(r.user_id, (
+                SELECT group_concat(i.name, ' ') FROM {ingredients} ri
+                JOIN {Ingredient._meta.db_table} i ON i.id = ri.ingredient_id
+                WHERE ri.recipe_id = r.id
+            )),
+            recipe_search_terms(r.user_id, (
+                SELECT group_concat(t.name, ' ') FROM {tags} rt
+                JOIN {Tag._meta.db_table} t ON t.id = rt.tag_id
+                WHERE rt.recipe_id = r.id
+            ))
+        FROM {recipe} r
+    """
+
+
+def insert_sql(replace=False):
+    return (
+        f'INSERT {"OR REPLACE " if replace else ""}INTO {RecipeSearch._meta.db_table}'
+        '(rowid, title, ingredients, tags) '
+        + documents_sql()
+    )
+
+
+def chunked_ids(ids):
+    ids = iter(dict.fromkeys(ids))
+    while chunk := list(islice(ids, INDEX_CHUNK_SIZE)):
+        yield chunk, ', '.join(['%s'] * len(chunk))
+
+
+def index_recipes(ids):
+    """Agrega o reemplaza las recetas en el indice"""
+    connection = get_connection()
+    if not is_enabled(connection):
+        return
+
+    with connection.cursor() as cursor:
+        for chunk, placeholders in chunked_ids(ids):
+            cursor.execute(insert_sql(replace=True) + f' WHERE r.id IN ({placeholders})', chunk)
+
+
+def unindex_recipes(ids):
+    """Quita recetas borradas del indice"""
+    connection = get_connection()
+    if not is_enabled(connection):
+        return
+
+    table = RecipeSearch._meta.db_table
+    with connection.cursor() as cursor:
+        for chunk, placeholders in chunked_ids(ids):
+            cursor.execute(f'DELETE FROM {table} WHERE rowid IN ({placeholders})', chunk)
+
+
+def rebuild(connection=None):
+    """Regenera el indice completo desde las tablas de recetas
+
+    En una transaccion: las busquedas de mientras ven el indice anterior
+    y un error deja el indice como estaba.
+    """
+    connection = connection or get_connection()
+    if not is_enabled(connection):
+        return
+
+    table = RecipeSearch._meta.db_table
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(insert_sql())
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+
+def get_query(request):
+    return request.GET.get('q', '').strip()
+
+
+def match_expression(text, user_id):
+    """Convierte el texto del usuario en una consulta FTS5 segura
+
+    Cada palabra se califica con el usuario y se cita para que no se
+    interprete como sintaxis; la ultima se busca como prefijo.
+    """
+    terms = search_terms(user_id, ' '.join(TERM.findall(text)[:MAX_TERMS]))
+    if not terms:
+        return None
+
+    return ' '.join(f'"{term}"' for term in terms.split()) + '*'
+
+
+def search_recipes(queryset, text, user_id):
+    """Filtra las recetas por la busqueda y anota su rank de bm25"""
+    expression = match_expression(text, user_id)
+    queryset = queryset.annotate(rank=F('search__rank'))
+    if expression is None:
+        return queryset.none()
+
+    return queryset.filter(search__document__match=expression)
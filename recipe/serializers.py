@@ -1,25 +1,46 @@
 from unicodedata import name
 from rest_framework import serializers
 from core.models import Ingredient, Tag, Recipe
+from recipe import cache
+from recipe.fields import UserPrimaryKeyRelatedField
 
-class TagSerializer(serializers.ModelSerializer):
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """Crea todos los elementos de la lista con un solo bulk_create"""
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return cache.bulk_create(model, [model(**attrs) for attrs in validated_data])
+
+class SparseFieldsMixin:
+    """Acepta fields con los campos a mostrar, como en la documentacion de DRF
+
+    Los serializadores anidados no lo reciben y conservan sus campos.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkCreateListSerializer
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkCreateListSerializer
 
-class RecipeSerializer(serializers.ModelSerializer):
-    ingredients = serializers.PrimaryKeyRelatedField(
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    ingredients = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
@@ -33,4 +54,13 @@ class RecipeSerializer(serializers.ModelSerializer):
 
 class RecipeDetailSerializer(RecipeSerializer):
     ingredients = IngredientSerializer(many=True, read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
\ No newline at end of file
+    tags = TagSerializer(many=True, read_only=True)
+
+class RecipeImportSerializer(serializers.ModelSerializer):
+    """Valida una receta importada; las relaciones se resuelven por bloque"""
+    ingredients = serializers.ListField(child=serializers.IntegerField(), default=list)
+    tags = serializers.ListField(child=serializers.IntegerField(), default=list)
+
+    class Meta:
+        model = Recipe
+        fields = ('title', 'ingredients', 'tags', 'price', 'link')
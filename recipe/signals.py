@@ -0,0 +1,149 @@
+from decimal import Decimal
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from core.models import Tag, Ingredient, Recipe
+from recipe import cache, search, stats
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipes(sender, instance, **kwargs):
+    """Invalida las recetas del usuario"""
+    cache.invalidate(instance.user_id, cache.RECIPES)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(sender, instance, **kwargs):
+    """Invalida los tags y las recetas, que muestran sus nombres"""
+    cache.invalidate(instance.user_id, cache.TAGS, cache.RECIPES)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(sender, instance, **kwargs):
+    """Invalida los ingredientes y las recetas, que muestran sus nombres"""
+    cache.invalidate(instance.user_id, cache.INGREDIENTS, cache.RECIPES)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_on_m2m(sender, instance, action, **kwargs):
+    """Invalida las recetas al cambiar sus tags o ingredientes"""
+    if action.startswith('post_'):
+        cache.invalidate(instance.user_id, cache.RECIPES)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, **kwargs):
+    """Actualiza la receta en el indice de busqueda"""
+    search.index_recipes([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(sender, instance, **kwargs):
+    search.unindex_recipes([instance.pk])
+
+
+def linked_recipe_ids(instance):
+    through = Recipe.tags.through if isinstance(instance, Tag) else Recipe.ingredients.through
+    field = instance._meta.model_name + '_id'
+
+    return list(
+        through.objects.filter(**{field: instance.pk}).values_list('recipe_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def index_renamed(sender, instance, created, **kwargs):
+    """Reindexa las recetas que muestran el nombre modificado"""
+    if not created:
+        search.index_recipes(linked_recipe_ids(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_linked_recipes(sender, instance, **kwargs):
+    # Las filas intermedias se borran en cascada sin m2m_changed
+    instance._search_recipe_ids = linked_recipe_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def index_unlinked(sender, instance, **kwargs):
+    search.index_recipes(getattr(instance, '_search_recipe_ids', []))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def index_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reindexa las recetas cuyos tags o ingredientes cambiaron"""
+    if not reverse:
+        if action.startswith('post_'):
+            search.index_recipes([instance.pk])
+    elif action == 'pre_clear':
+        instance._search_recipe_ids = linked_recipe_ids(instance)
+    elif action == 'post_clear':
+        search.index_recipes(instance._search_recipe_ids)
+    elif action in ('post_add', 'post_remove'):
+        search.index_recipes(pk_set)
+
+
+@receiver(connection_created)
+def register_search_functions(sender, connection, **kwargs):
+    if search.is_enabled(connection):
+        search.register_functions(connection)
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_price(sender, instance, update_fields=None, **kwargs):
+    """Lee el precio guardado para mover las estadisticas si cambia"""
+    instance._stats_price = None
+    if instance._state.adding or (update_fields is not None and 'price' not in update_fields):
+        return
+
+    instance._stats_price = (
+        Recipe.objects.filter(pk=instance.pk).values_list('price', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def update_price_stats(sender, instance, **kwargs):
+    old = getattr(instance, '_stats_price', None)
+    if old is not None and old != Decimal(str(instance.price)):
+        stats.change_price(instance.pk, old, instance.price)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remember_recipe_prices(sender, instance, **kwargs):
+    # Las filas intermedias se borran en cascada sin m2m_changed
+    instance._stats_prices = {
+        kind: stats.linked_prices(kind, instance, reverse=False)
+        for kind in stats.RELATIONS
+    }
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_prices(sender, instance, **kwargs):
+    for kind, pairs in getattr(instance, '_stats_prices', {}).items():
+        stats.remove_prices(kind, pairs)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_stats_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Suma o resta los precios de los enlaces agregados o quitados"""
+    kind = stats.kind_for(sender)
+    if action == 'post_add' and pk_set:
+        if reverse:
+            pairs = stats.linked_prices(kind, instance, reverse, pk_set)
+        else:
+            pairs = [(pk, instance.price) for pk in pk_set]
+        stats.add_prices(kind, pairs)
+    elif action in ('pre_remove', 'pre_clear'):
+        # remove() no filtra pk_set por los enlaces existentes
+        instance._stats_removed = stats.linked_prices(kind, instance, reverse, pk_set)
+    elif action in ('post_remove', 'post_clear'):
+        stats.remove_prices(kind, instance._stats_removed)
@@ -0,0 +1,249 @@
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from core.models import Recipe, TagPriceStats, IngredientPriceStats
+from recipe.projections import price_field
+
+STATS_CHUNK_SIZE = 500
+
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+
+# Tipo -> (modelo resumen, tabla intermedia, columna del relacionado)
+RELATIONS = {
+    TAGS: (TagPriceStats, Recipe.tags.through, 'tag_id'),
+    INGREDIENTS: (IngredientPriceStats, Recipe.ingredients.through, 'ingredient_id'),
+}
+
+CENT = Decimal('0.01')
+
+
+def kind_for(through):
+    """Tipo de estadistica de una tabla intermedia"""
+    for kind, (_, relation, _) in RELATIONS.items():
+        if relation is through:
+            return kind
+
+
+def get_connection(kind):
+    return connections[router.db_for_write(RELATIONS[kind][0])]
+
+
+def summarize(pairs):
+    """Agrupa pares (relacionado, precio) en (count, total, min, max)"""
+    prices = defaultdict(list)
+    for pk, price in pairs:
+        prices[pk].append(Decimal(price))
+
+    return [
+        (pk, len(values), sum(values), min(values), max(values))
+        for pk, values in prices.items()
+    ]
+
+
+def chunked(rows):
+    rows = iter(rows)
+    while chunk := list(islice(rows, STATS_CHUNK_SIZE)):
+        yield chunk, ', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk))
+
+
+def table_names(kind, connection):
+    model, through, column = RELATIONS[kind]
+    qn = connection.ops.quote_name
+
+    return (
+        qn(model._meta.db_table),
+        qn(through._meta.db_table),
+        qn(Recipe._meta.db_table),
+        qn(column),
+    )
+
+
+def least_greatest(connection):
+    # En SQLite min() y max() con dos argumentos son escalares
+    if connection.vendor == 'sqlite':
+        return 'MIN', 'MAX'
+
+    return 'LEAST', 'GREATEST'
+
+
+def add_prices(kind, pairs):
+    """Suma precios al resumen con un upsert por bloque"""
+    rows = summarize(pairs)
+    if not rows:
+        return
+
+    connection = get_connection(kind)
+    table, _, _, key = table_names(kind, connection)
+    least, greatest = least_greatest(connection)
+    with connection.cursor() as cursor:
+        for chunk, values in chunked(rows):
+            cursor.execute(
+                f'INSERT INTO {table} ({key}, count, total, min_price, max_price) '
+                f'VALUES {values} '
+                f'ON CONFLICT ({key}) DO UPDATE SET '
+                f'count = {table}.count + excluded.count, '
+                f'total = {table}.total + excluded.total, '
+                f'min_price = {least}(COALESCE({table}.min_price, excluded.min_price), excluded.min_price), '
+                f'max_price = {greatest}(COALESCE({table}.max_price, excluded.max_price), excluded.max_price)',
+                [value for row in chunk for value in row],
+            )
+
+
+def remove_prices(kind, pairs):
+    """Resta precios del resumen
+
+    count y total se actualizan por diferencia. El minimo y el maximo
+    solo se recalculan, con el indice (relacionado, receta), cuando el
+    precio quitado era el extremo; las filas ya no estan en la tabla
+    intermedia cuando esto se ejecuta.
+    """
+    rows = summarize(pairs)
+    if not rows:
+        return
+
+    connection = get_connection(kind)
+    table, through, recipe, key = table_names(kind, connection)
+    live = (
+        f'SELECT {{}}(r.price) FROM {through} x JOIN {recipe} r ON r.id = x.recipe_id '
+        f'WHERE x.{key} = {table}.{key}'
+    )
+    with connection.cursor() as cursor:
+        for chunk, values in chunked(rows):
+            cursor.execute(
+                f'WITH removed(pk, count, total, min_price, max_price) AS (VALUES {values}) '
+                f'UPDATE {table} SET '
+                f'count = {table}.count - removed.count, '
+                f'total = CASE WHEN {table}.count = removed.count THEN 0 '
+                f'ELSE {table}.total - removed.total END, '
+                f'min_price = CASE WHEN removed.min_price <= {table}.min_price '
+                f'THEN ({live.format("MIN")}) ELSE {table}.min_price END, '
+                f'max_price = CASE WHEN removed.max_price >= {table}.max_price '
+                f'THEN ({live.format("MAX")}) ELSE {table}.max_price END '
+                f'FROM removed WHERE {table}.{key} = removed.pk',
+                [value for row in chunk for value in row],
+            )
+
+
+def linked_prices(kind, instance, reverse, pk_set=None):
+    """Pares (relacionado, precio) enlazados con instance
+
+    Sin reverse instance es una receta y pk_set son tags o ingredientes;
+    con reverse es al reves. Sin pk_set trae todos los enlaces.
+    """
+    _, through, column = RELATIONS[kind]
+    source, target = (column, 'recipe_id') if reverse else ('recipe_id', column)
+    queryset = through.objects.filter(**{source: instance.pk})
+    if pk_set is not None:
+        queryset = queryset.filter(**{target + '__in': pk_set})
+
+    return list(queryset.values_list(column, 'recipe__price'))
+
+
+def recipe_keys(kind, recipe_id):
+    _, through, column = RELATIONS[kind]
+
+    return list(through.objects.filter(recipe_id=recipe_id).values_list(column, flat=True))
+
+
+def change_price(recipe_id, old, new):
+    """Mueve la receta de precio en los resumenes de sus relaciones"""
+    for kind in RELATIONS:
+        keys = recipe_keys(kind, recipe_id)
+        remove_prices(kind, [(key, old) for key in keys])
+        add_prices(kind, [(key, new) for key in keys])
+
+
+def live_stats(kind):
+    """Agregacion en vivo sobre la tabla intermedia, por relacionado"""
+    _, through, column = RELATIONS[kind]
+
+    return {
+        row[column]: (row['count'], row['total'], row['min_price'], row['max_price'])
+        for row in (
+            through.objects
+            .values(column)
+            .annotate(
+                count=Count('*'),
+                total=Sum('recipe__price'),
+                min_price=Min('recipe__price'),
+                max_price=Max('recipe__price'),
+            )
+            .order_by()
+        )
+    }
+
+
+def stored_stats(kind):
+    model = RELATIONS[kind][0]
+
+    return {
+        row[0]: row[1:]
+        for row in model.objects.filter(count__gt=0).values_list(
+            'pk', 'count', 'total', 'min_price', 'max_price'
+        )
+    }
+
+
+def normalize(stats):
+    if stats is None:
+        return None
+
+    count, total, min_price, max_price = stats
+    return (count, Decimal(total).quantize(CENT), min_price, max_price)
+
+
+def compare(kind):
+    """Ids cuyo resumen no coincide con la agregacion en vivo"""
+    live = live_stats(kind)
+    stored = stored_stats(kind)
+
+    return sorted(
+        pk for pk in live.keys() | stored.keys()
+        if normalize(live.get(pk)) != normalize(stored.get(pk))
+    )
+
+
+def recompute(kind):
+    """Regenera el resumen completo con un INSERT ... SELECT agrupado"""
+    connection = get_connection(kind)
+    table, through, recipe, key = table_names(kind, connection)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(
+            f'INSERT INTO {table} ({key}, count, total, min_price, max_price) '
+            f'SELECT x.{key}, COUNT(*), SUM(r.price), MIN(r.price), MAX(r.price) '
+            f'FROM {through} x JOIN {recipe} r ON r.id = x.recipe_id '
+            f'GROUP BY x.{key}'
+        )
+
+
+def with_price_stats(queryset):
+    """Agrega las estadisticas a un listado de tags o ingredientes con values()"""
+    return queryset.values(
+        'id',
+        'name',
+        count=F('price_stats__count'),
+        min_price=F('price_stats__min_price'),
+        max_price=F('price_stats__max_price'),
+        total=F('price_stats__total'),
+    )
+
+
+def stats_rows(rows):
+    """Arma la salida del endpoint: count, min, max y average por fila"""
+    to_price = price_field().to_representation
+
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'count': row['count'] or 0,
+            'min': to_price(row['min_price']) if row['count'] else None,
+            'max': to_price(row['max_price']) if row['count'] else None,
+            'average': to_price(Decimal(row['total']) / row['count']) if row['count'] else None,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,268 @@
+from unittest import mock
+import orjson
+from django.test import TestCase, AsyncClient, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from core.models import Recipe, Tag, Ingredient
+from recipe import async_views
+from recipe.cache import get_cache
+
+ASYNC_URLS = 'app.async_urls'
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id], urlconf=ASYNC_URLS)
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncViewsTest(TestCase):
+    """Prueba las vistas asincronas de la API de recetas"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        self.recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        self.recipe.tags.add(self.tag)
+        self.recipe.ingredients.add(self.ingredient)
+
+    def test_routes_use_async_views(self):
+        """Prueba que las rutas conserven nombre y usen la vista asincrona"""
+        for name in ('tag-list', 'ingredient-list', 'recipe-list'):
+            url = reverse('recipe:' + name, urlconf=ASYNC_URLS)
+            self.assertTrue(hasattr(resolve(url, ASYNC_URLS).func, 'view_class'))
+
+    async def test_requires_authentication(self):
+        """Prueba que sin token se responda 401"""
+        res = await AsyncClient().get(reverse('recipe:recipe-list'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    async def test_invalid_token(self):
+        """Prueba que un token invalido se rechace"""
+        client = AsyncClient(AUTHORIZATION='Token invalid')
+
+        res = await client.get(reverse('recipe:tag-list'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_recipes(self):
+        """Prueba que el listado sea igual al de la vista DRF"""
+        res = await self.client.get(reverse('recipe:recipe-list'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {
+            'next': None,
+            'previous': None,
+            'results': [{
+                'id': self.recipe.id,
+                'title': 'Soup',
+                'ingredients': [self.ingredient.id],
+                'tags': [self.tag.id],
+                'price': '5.00',
+                'link': '',
+            }],
+        })
+
+    async def test_same_output_as_drf_view(self):
+        """Prueba que la salida sea identica a la de la vista DRF"""
+        for url in (reverse('recipe:recipe-list'), detail_url(self.recipe.id),
+                    reverse('recipe:tag-list')):
+            res = await self.client.get(url)
+            drf = await self.client.get(url + '?format=json')
+
+            self.assertEqual(res.content, drf.content)
+            self.assertEqual(res['ETag'], drf['ETag'])
+
+    async def test_search_same_output_as_drf_view(self):
+        """Prueba la busqueda con ?q= en la vista asincrona"""
+        url = reverse('recipe:recipe-list') + '?q=soup'
+
+        res = await self.client.get(url)
+        drf = await self.client.get(url + '&format=json')
+
+        self.assertEqual(res.json()['results'][0]['title'], 'Soup')
+        self.assertEqual(res.content, drf.content)
+
+    async def test_search_paginated_as_drf_view(self):
+        """Prueba que las paginas de una busqueda coincidan con las de la vista DRF"""
+        for i in range(2):
+            await Recipe.objects.acreate(user=self.user, title=f'Soup {i}', price=i)
+        url = reverse('recipe:recipe-list') + '?q=soup&page_size=2'
+
+        first = (await self.client.get(url)).json()
+        second = (await self.client.get(first['next'])).json()
+        drf = (await self.client.get(first['next'] + '&format=json')).json()
+
+        self.assertEqual(len(second['results']), 1)
+        self.assertEqual(second['results'], drf['results'])
+        self.assertIsNone(second['next'])
+
+    @override_settings(FAST_LIST_RESPONSES=False)
+    async def test_fast_list_disabled_uses_drf_view(self):
+        """Prueba que sin FAST_LIST_RESPONSES los listados los sirva la vista DRF"""
+        with mock.patch.object(async_views.AsyncRecipeListView, 'render_list') as render_list:
+            res = await self.client.get(reverse('recipe:recipe-list'))
+
+        render_list.assert_not_called()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['results'][0]['title'], 'Soup')
+
+    async def test_list_tags_paginated(self):
+        """Prueba la paginacion por cursor del listado de tags"""
+        url = reverse('recipe:tag-list') + '?page_size=1'
+        await self.client.post(reverse('recipe:tag-list'), {'name': 'Dessert'},
+                               content_type='application/json')
+
+        first = (await self.client.get(url)).json()
+        second = (await self.client.get(first['next'])).json()
+
+        self.assertEqual(first['results'][0]['name'], 'Vegan')
+        self.assertEqual(second['results'][0]['name'], 'Dessert')
+        self.assertIsNone(second['next'])
+
+    async def test_retrieve_recipe(self):
+        """Prueba el detalle con tags e ingredientes anidados"""
+        res = await self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['tags'], [{'id': self.tag.id, 'name': 'Vegan'}])
+
+    async def test_retrieve_unknown_recipe(self):
+        """Prueba que una receta inexistente responda 404"""
+        res = await self.client.get(detail_url(self.recipe.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_retrieve_other_user_recipe(self):
+        """Prueba que no se vean recetas de otro usuario"""
+        other = await get_user_model().objects.acreate(email='other@test.com')
+        recipe = await Recipe.objects.acreate(user=other, title='Pie', price=3)
+
+        res = await self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_conditional_get(self):
+        """Prueba que el ETag coincida y se responda 304"""
+        url = reverse('recipe:recipe-list')
+        etag = (await self.client.get(url))['ETag']
+
+        res = await self.client.get(url, **{'If-None-Match': etag})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_create_tag(self):
+        """Prueba el alta de un tag"""
+        res = await self.client.post(reverse('recipe:tag-list'), {'name': 'Dessert'},
+                                     content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Tag.objects.filter(user=self.user, name='Dessert').aexists())
+
+    async def test_bulk_create_ingredients(self):
+        """Prueba el alta en bloque e invalida el listado"""
+        url = reverse('recipe:ingredient-list')
+        etag = (await self.client.get(url))['ETag']
+        payload = [{'name': 'Pepper'}, {'name': 'Oil'}]
+
+        res = await self.client.post(url, payload, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['name'] for item in res.json()], ['Pepper', 'Oil'])
+        res = await self.client.get(url, **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()['results']), 3)
+
+    async def test_create_tag_invalid(self):
+        """Prueba que un alta invalida responda 400"""
+        res = await self.client.post(reverse('recipe:tag-list'), {'name': ''},
+                                     content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.json())
+
+    async def test_create_recipe(self):
+        """Prueba el alta de una receta con sus relaciones"""
+        payload = {
+            'title': 'Pie',
+            'price': '3.50',
+            'tags': [self.tag.id],
+            'ingredients': [self.ingredient.id],
+        }
+
+        res = await self.client.post(reverse('recipe:recipe-list'), payload,
+                                     content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = await Recipe.objects.aget(id=res.json()['id'])
+        self.assertEqual([tag.id async for tag in recipe.tags.all()], [self.tag.id])
+
+    async def test_invalid_json(self):
+        """Prueba que un cuerpo mal formado responda 400"""
+        res = await self.client.post(reverse('recipe:tag-list'), b'{',
+                                     content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_other_methods_use_drf_view(self):
+        """Prueba que los metodos sin version asincrona sigan funcionando"""
+        res = await self.client.patch(detail_url(self.recipe.id), {'title': 'Stew'},
+                                      content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['title'], 'Stew')
+
+    async def test_export_streams_async(self):
+        """Prueba que la exportacion se entregue con un iterador asincrono"""
+        with self.assertNoLogs('django.request', 'WARNING'):
+            res = await self.client.get(reverse('recipe:recipe-export'), {'format': 'ndjson'})
+            body = b''.join([chunk async for chunk in res.streaming_content])
+
+        self.assertTrue(res.is_async)
+        self.assertEqual([orjson.loads(line)['title'] for line in body.splitlines()], ['Soup'])
+
+    async def test_import_streams_async(self):
+        """Prueba que el resultado de la importacion se entregue con un iterador asincrono"""
+        lines = b'{"title": "Stew", "price": "3.00"}\n{"title": ""}\n'
+
+        res = await self.client.post(reverse('recipe:recipe-import'), lines,
+                                     content_type='application/x-ndjson')
+        results = [orjson.loads(line) async for line in res.streaming_content]
+
+        self.assertTrue(res.is_async)
+        self.assertIn('id', results[0])
+        self.assertIn('errors', results[1])
+        self.assertTrue(await Recipe.objects.filter(title='Stew').aexists())
+
+    async def test_browsable_api_uses_drf_view(self):
+        """Prueba que el formato HTML lo sirva la vista DRF"""
+        res = await self.client.get(reverse('recipe:recipe-list'), ACCEPT='text/html')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/html'))
+
+    async def test_filter_same_output_as_drf_view(self):
+        """Prueba los filtros ?tags= en la vista asincrona"""
+        url = reverse('recipe:recipe-list') + f'?tags={self.tag.id}&tags_match=any'
+
+        res = await self.client.get(url)
+        drf = await self.client.get(url + '&format=json')
+
+        self.assertEqual(res.json()['results'][0]['title'], 'Soup')
+        self.assertEqual(res.content, drf.content)
+
+    async def test_filter_invalid(self):
+        """Prueba que un filtro invalido responda 400"""
+        res = await self.client.get(reverse('recipe:recipe-list') + '?tags=x')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', res.json())
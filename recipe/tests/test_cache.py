@@ -0,0 +1,91 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag
+from recipe.cache import get_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class RecipeResponseCacheTest(TestCase):
+    """Prueba el cache de respuestas de recetas"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+    def test_list_served_from_cache(self):
+        """Prueba que la segunda lectura no consulte la base de datos"""
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+
+    def test_query_params_cached_separately(self):
+        """Prueba que cada combinacion de parametros tenga su entrada"""
+        Recipe.objects.create(user=self.user, title='Pie', price=3)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(RECIPES_URL + '?page_size=1')
+
+        self.assertEqual(len(res.json()['results']), 1)
+
+    def test_create_invalidates_list(self):
+        """Prueba que el usuario vea su propia escritura"""
+        self.client.get(RECIPES_URL)
+        payload = {'title': 'Pie', 'price': 3}
+        self.client.post(RECIPES_URL, payload)
+
+        res = self.client.get(RECIPES_URL)
+
+        titles = [item['title'] for item in res.json()['results']]
+        self.assertEqual(titles, ['Soup', 'Pie'])
+
+    def test_tag_rename_invalidates_detail(self):
+        """Prueba que renombrar un tag invalide el detalle"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.recipe.tags.add(tag)
+        self.client.get(detail_url(self.recipe.id))
+        tag.name = 'Vegetarian'
+        tag.save()
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.json()['tags'][0]['name'], 'Vegetarian')
+
+    def test_m2m_change_invalidates_list(self):
+        """Prueba que agregar un tag invalide el listado"""
+        self.client.get(RECIPES_URL)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        tag.recipe_set.add(self.recipe)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.json()['results'][0]['tags'], [tag.id])
+
+    def test_cache_is_per_user(self):
+        """Prueba que un usuario no reciba respuestas de otro"""
+        self.client.get(RECIPES_URL)
+        user2 = get_user_model().objects.create_user(
+            'test2@test.com',
+            'password'
+        )
+        self.client.force_authenticate(user2)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.json()['results'], [])
@@ -0,0 +1,137 @@
+import multiprocessing
+from django.conf import settings
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag
+from core.counters import Counters
+from recipe import cache
+from recipe.cache import get_cache
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def write_in_other_worker(user_id):
+    """Proceso que invalida las recetas como una escritura en otro worker"""
+    cache.bump_version(user_id, cache.RECIPES)
+
+
+class ConditionalGetTest(TestCase):
+    """Prueba los ETag y las respuestas 304"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+    def assertNotModified(self, url):
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+        return etag
+
+    def test_not_modified(self):
+        """Prueba que cada endpoint responda 304 sin consultas"""
+        for url in (RECIPES_URL, detail_url(self.recipe.id), TAGS_URL, INGREDIENTS_URL):
+            self.assertNotModified(url)
+
+    def test_recipe_write_changes_etag(self):
+        """Prueba que crear una receta cambie el ETag del listado"""
+        etag = self.assertNotModified(RECIPES_URL)
+        self.client.post(RECIPES_URL, {'title': 'Pie', 'price': 3})
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(len(res.json()['results']), 2)
+
+    def test_write_in_other_process(self):
+        """Prueba que una escritura en otro proceso cambie el ETag de este"""
+        etag = self.assertNotModified(RECIPES_URL)
+        process = multiprocessing.get_context('fork').Process(
+            target=write_in_other_worker, args=(self.user.id,)
+        )
+        process.start()
+        process.join()
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_same_version_in_every_process(self):
+        """Prueba que otro mapeo de los contadores vea la misma version"""
+        version = cache.get_version(self.user.id, cache.RECIPES)
+        other = Counters(settings.COUNTERS_FILE, settings.COUNTERS_SLOTS)
+        self.addCleanup(other.close)
+
+        self.assertEqual(other.get(cache.version_key(self.user.id, cache.RECIPES)), version)
+
+    def test_tag_write_changes_tags_and_recipes(self):
+        """Prueba que renombrar un tag cambie tags y recetas, no ingredientes"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        etags = {url: self.client.get(url)['ETag']
+                 for url in (TAGS_URL, RECIPES_URL, INGREDIENTS_URL)}
+        tag.name = 'Vegetarian'
+        tag.save()
+
+        for url, changed in ((TAGS_URL, True), (RECIPES_URL, True), (INGREDIENTS_URL, False)):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(res.status_code == status.HTTP_200_OK, changed)
+
+    def test_bulk_create_changes_etag(self):
+        """Prueba que la creacion en bloque cambie el ETag"""
+        etag = self.client.get(TAGS_URL)['ETag']
+        self.client.post(TAGS_URL, [{'name': 'a'}, {'name': 'b'}], format='json')
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_create_helper(self):
+        """Prueba que bulk_create invalide la coleccion de cada usuario creado"""
+        other = get_user_model().objects.create_user('other@test.com', 'password')
+        versions = {
+            (user.pk, collection): cache.get_version(user.pk, collection)
+            for user in (self.user, other) for collection in (cache.RECIPES, cache.TAGS)
+        }
+
+        cache.bulk_create(Recipe, [
+            Recipe(user=self.user, title='Pie', price=3),
+            Recipe(user=other, title='Stew', price=4),
+        ])
+
+        for (user_id, collection), version in versions.items():
+            changed = cache.get_version(user_id, collection) != version
+            self.assertEqual(changed, collection == cache.RECIPES)
+
+    def test_etag_per_user_and_format(self):
+        """Prueba que el ETag dependa del usuario y del formato"""
+        etag = self.client.get(RECIPES_URL)['ETag']
+        html = self.client.get(RECIPES_URL, HTTP_ACCEPT='text/html')
+        user2 = get_user_model().objects.create_user('test2@test.com', 'password')
+        self.client.force_authenticate(user2)
+        other = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertNotEqual(html['ETag'], etag)
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(other['ETag'], etag)
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient
+from recipe.serializers import RecipeSerializer
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+class RecipeExportTest(TestCase):
+    """Prueba la exportacion de recetas"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        for i in range(5):
+            recipe = Recipe.objects.create(user=self.user, title=f'r{i}', price=i)
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+        other = get_user_model().objects.create_user('other@test.com', 'password')
+        Recipe.objects.create(user=other, title='other', price=1)
+
+    def get(self, fmt):
+        res = self.client.get(EXPORT_URL, {'format': fmt})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+
+        return res, b''.join(res.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """Prueba exportar en NDJSON con el mismo formato que la API"""
+        res, content = self.get('ndjson')
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        recipes = Recipe.objects.filter(user=self.user).order_by('id')
+        self.assertEqual(rows, RecipeSerializer(recipes, many=True).data)
+        self.assertIn('recipes.ndjson', res['Content-Disposition'])
+
+    def test_export_csv(self):
+        """Prueba exportar en CSV"""
+        res, content = self.get('csv')
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['title'], 'r0')
+        self.assertEqual(rows[0]['price'], '0.00')
+
+    def test_export_prefetches_by_chunk(self):
+        """Prueba que las relaciones se precarguen por bloque"""
+        with mock.patch('recipe.exporter.EXPORT_CHUNK_SIZE', 2):
+            # un cursor de recetas leido en 3 bloques, cada uno con 2 precargas
+            with self.assertNumQueries(7):
+                self.get('ndjson')
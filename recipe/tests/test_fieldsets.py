@@ -0,0 +1,164 @@
+from django.test import TestCase, AsyncClient, override_settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import get_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+ASYNC_URLS = 'app.async_urls'
+
+ALL_FIELDS = ['id', 'title', 'ingredients', 'tags', 'price', 'link']
+
+# Parametros -> (campos de la respuesta, consultas del listado y del detalle).
+# Recetas + una consulta por relacion pedida
+COMBINATIONS = [
+    ({}, ALL_FIELDS, 3),
+    ({'fields': 'id,title'}, ['id', 'title'], 1),
+    ({'fields': 'title,price,link'}, ['title', 'price', 'link'], 1),
+    ({'fields': 'id,tags'}, ['id', 'tags'], 2),
+    ({'fields': 'ingredients'}, ['ingredients'], 2),
+    ({'exclude': 'ingredients,tags'}, ['id', 'title', 'price', 'link'], 1),
+    ({'exclude': 'tags'}, ['id', 'title', 'ingredients', 'price', 'link'], 2),
+    ({'fields': 'id,title,tags', 'exclude': 'title'}, ['id', 'tags'], 2),
+]
+
+
+def detail_url(recipe_id, urlconf=None):
+    return reverse('recipe:recipe-detail', args=[recipe_id], urlconf=urlconf)
+
+
+class SparseFieldsetTest(TestCase):
+    """Prueba ?fields= y ?exclude= en las lecturas"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        for i in range(3):
+            recipe = Recipe.objects.create(user=self.user, title=f'Soup {i}', price=5, link='x')
+            recipe.tags.add(self.tag)
+            recipe.ingredients.add(self.ingredient)
+        self.recipe = recipe
+
+    def get(self, url, params):
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res, queries
+
+    def test_list_combinations(self):
+        """Prueba los campos y las consultas del listado por combinacion"""
+        for params, fields, count in COMBINATIONS:
+            with self.subTest(params=params):
+                res, queries = self.get(RECIPES_URL, params)
+
+                self.assertEqual(len(queries), count)
+                for row in res.data['results']:
+                    self.assertEqual(list(row), fields)
+
+    def test_detail_combinations(self):
+        """Prueba los campos y las consultas del detalle por combinacion"""
+        for params, fields, count in COMBINATIONS:
+            with self.subTest(params=params):
+                res, queries = self.get(detail_url(self.recipe.id), params)
+
+                self.assertEqual(len(queries), count)
+                self.assertEqual(list(res.data), fields)
+
+    @override_settings(FAST_LIST_RESPONSES=False)
+    def test_list_with_serializer(self):
+        """Prueba el listado con el serializador igual que el rapido"""
+        for params, fields, count in COMBINATIONS:
+            with self.subTest(params=params):
+                res, queries = self.get(RECIPES_URL, params)
+
+                self.assertEqual(len(queries), count)
+                for row in res.data['results']:
+                    self.assertEqual(list(row), fields)
+
+    def test_prunes_columns(self):
+        """Prueba que no se lean las columnas que no se piden"""
+        for url in (RECIPES_URL, detail_url(self.recipe.id)):
+            _, queries = self.get(url, {'fields': 'title'})
+
+            sql = queries[0]['sql']
+            self.assertIn('"title"', sql)
+            self.assertNotIn('"link"', sql)
+            self.assertNotIn('"price"', sql)
+
+    def test_pagination_without_id(self):
+        """Prueba que el cursor se arme aunque id no se pida"""
+        res, _ = self.get(RECIPES_URL, {'fields': 'title', 'page_size': 2})
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual([row['title'] for row in res.data['results']], ['Soup 2'])
+
+    def test_detail_nested_fields(self):
+        """Prueba que los serializadores anidados conserven sus campos"""
+        res, _ = self.get(detail_url(self.recipe.id), {'fields': 'title,tags'})
+
+        self.assertEqual(res.data['tags'], [{'id': self.tag.id, 'name': 'Vegan'}])
+
+    def test_unknown_field(self):
+        """Prueba que un campo desconocido responda 400"""
+        res = self.client.get(RECIPES_URL, {'fields': 'title,secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_exclude_everything(self):
+        """Prueba que excluir todos los campos responda 400"""
+        res = self.client.get(RECIPES_URL, {'exclude': ','.join(ALL_FIELDS)})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        """Prueba que las altas respondan todos los campos"""
+        payload = {'title': 'Stew', 'price': '3.00', 'tags': [self.tag.id], 'ingredients': []}
+
+        res = self.client.post(RECIPES_URL + '?fields=id', payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(res.data), ALL_FIELDS)
+
+    def test_tags(self):
+        """Prueba ?fields= en el listado de tags"""
+        res, _ = self.get(TAGS_URL, {'fields': 'name'})
+
+        self.assertEqual(res.data['results'], [{'name': 'Vegan'}])
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLS)
+    async def test_async_views(self):
+        """Prueba que las vistas asincronas respondan igual"""
+        token = await Token.objects.acreate(user=self.user)
+        client = AsyncClient(AUTHORIZATION='Token ' + token.key)
+        for params, fields, count in COMBINATIONS:
+            with self.subTest(params=params):
+                await get_cache().aclear()
+                res = await client.get(RECIPES_URL, params)
+                for row in res.json()['results']:
+                    self.assertEqual(list(row), fields)
+
+                res = await client.get(detail_url(self.recipe.id, ASYNC_URLS), params)
+                self.assertEqual(list(res.json()), fields)
+
+        res = await client.get(TAGS_URL, {'fields': 'name'})
+        self.assertEqual(res.json()['results'], [{'name': 'Vegan'}])
+
+        res = await client.get(RECIPES_URL, {'fields': 'secret'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
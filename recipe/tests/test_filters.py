@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import get_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class RecipeFilterTest(TestCase):
+    """Prueba los filtros ?tags= y ?ingredients= del listado"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.quick = Tag.objects.create(user=self.user, name='Quick')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.garlic = Ingredient.objects.create(user=self.user, name='Garlic')
+        self.soup = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        self.soup.tags.add(self.vegan, self.quick)
+        self.soup.ingredients.add(self.salt)
+        self.salad = Recipe.objects.create(user=self.user, title='Salad', price=3)
+        self.salad.tags.add(self.vegan)
+        self.salad.ingredients.add(self.garlic)
+        Recipe.objects.create(user=self.user, title='Bread', price=2)
+
+    def titles(self, **params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in res.json()['results']]
+
+    def test_filter_tags_all(self):
+        """Prueba que por defecto se exijan todos los tags"""
+        tags = f'{self.vegan.id},{self.quick.id}'
+
+        self.assertEqual(self.titles(tags=tags), ['Soup'])
+        self.assertEqual(self.titles(tags=self.vegan.id), ['Soup', 'Salad'])
+
+    def test_filter_ingredients_any(self):
+        """Prueba la semantica any sin recetas repetidas"""
+        ingredients = f'{self.salt.id},{self.garlic.id}'
+
+        titles = self.titles(ingredients=ingredients, ingredients_match='any')
+
+        self.assertEqual(titles, ['Soup', 'Salad'])
+
+    def test_filter_combined(self):
+        """Prueba combinar tags e ingredientes"""
+        titles = self.titles(
+            tags=f'{self.vegan.id},{self.quick.id}',
+            tags_match='any',
+            ingredients=self.garlic.id,
+        )
+
+        self.assertEqual(titles, ['Salad'])
+
+    def test_filter_other_user_ids(self):
+        """Prueba que los ids de otro usuario no devuelvan sus recetas"""
+        other = get_user_model().objects.create_user('other@test.com', 'password')
+        tag = Tag.objects.create(user=other, name='Vegan')
+        Recipe.objects.create(user=other, title='Pie', price=3).tags.add(tag)
+
+        self.assertEqual(self.titles(tags=tag.id), [])
+
+    def test_filter_with_search(self):
+        """Prueba que los filtros se combinen con la busqueda"""
+        self.assertEqual(self.titles(q='salad', tags=self.vegan.id), ['Salad'])
+        self.assertEqual(self.titles(q='salad', tags=self.quick.id), [])
+
+    def test_filter_invalid(self):
+        """Prueba que ids o semantica invalidos respondan 400"""
+        for params in ({'tags': 'a,b'}, {'tags': '1', 'tags_match': 'some'},
+                       {'ingredients': ','.join(map(str, range(100)))}):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_queries_constant(self):
+        """Prueba que filtrar no agregue consultas al listado"""
+        with self.assertNumQueries(3):
+            self.client.get(RECIPES_URL, {'tags': f'{self.vegan.id},{self.quick.id}'})
+
+    def test_export_filtered(self):
+        """Prueba que la exportacion respete los filtros"""
+        res = self.client.get(reverse('recipe:recipe-export'),
+                              {'tags': self.quick.id}, HTTP_ACCEPT='application/x-ndjson')
+
+        lines = b''.join(res.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn(b'Soup', lines[0])
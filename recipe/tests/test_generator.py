@@ -0,0 +1,105 @@
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, F
+from core.models import Recipe, Tag, Ingredient, RecipeSearch
+from recipe import stats
+from recipe.generator import Generator
+
+
+class GeneratorTest(TestCase):
+    """Prueba el generador de datos sinteticos"""
+
+    def generate(self, **kwargs):
+        options = dict(users=20, recipes=500, tags=8, ingredients=15, seed=1, batch_size=100)
+        options.update(kwargs)
+        Generator(**options).run()
+
+    def test_creates_rows(self):
+        """Prueba que se creen las filas pedidas y sus enlaces"""
+        self.generate()
+
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertEqual(Recipe.objects.count(), 500)
+        self.assertEqual(Tag.objects.count(), 20 * 8)
+        self.assertEqual(Ingredient.objects.count(), 20 * 15)
+        links = Recipe.objects.annotate(n=Count('ingredients')).values_list('n', flat=True)
+        self.assertTrue(all(2 <= n <= 12 for n in links))
+
+    def test_links_belong_to_owner(self):
+        """Prueba que los tags e ingredientes sean del dueño de la receta"""
+        self.generate()
+
+        self.assertFalse(Recipe.tags.through.objects.exclude(tag__user=F('recipe__user')).exists())
+        self.assertFalse(
+            Recipe.ingredients.through.objects.exclude(ingredient__user=F('recipe__user')).exists()
+        )
+
+    def test_deterministic(self):
+        """Prueba que la misma semilla genere los mismos datos"""
+        def snapshot():
+            first = Recipe.objects.order_by('id').first().pk
+            return [
+                (title, price, pk - first)
+                for pk, title, price in Recipe.objects.order_by('id').values_list('id', 'title', 'price')
+            ]
+
+        self.generate()
+        expected = snapshot()
+        get_user_model().objects.all().delete()
+        self.generate()
+
+        self.assertEqual(snapshot(), expected)
+
+    def test_skewed_owners(self):
+        """Prueba que pocos usuarios concentren muchas recetas"""
+        self.generate()
+
+        counts = sorted(
+            Recipe.objects.values('user').annotate(n=Count('id')).values_list('n', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+
+    def test_rebuilds_derived_tables(self):
+        """Prueba que el indice y las estadisticas queden consistentes"""
+        self.generate()
+
+        self.assertEqual(RecipeSearch.objects.count(), Recipe.objects.count())
+        for kind in stats.RELATIONS:
+            self.assertEqual(stats.compare(kind), [])
+
+    def test_restores_indexes(self):
+        """Prueba que los indices de las tablas intermedias se vuelvan a crear"""
+        def indexes():
+            with connection.cursor() as cursor:
+                return {
+                    name: set(info['columns'])
+                    for table in (Recipe.tags.through, Recipe.ingredients.through)
+                    for name, info in connection.introspection.get_constraints(
+                        cursor, table._meta.db_table
+                    ).items()
+                    if info['index']
+                }
+
+        expected = indexes()
+        self.generate()
+
+        self.assertEqual(indexes(), expected)
+
+    def test_shared_password(self):
+        """Prueba que los usuarios generados puedan loguearse"""
+        self.generate(password='secret123')
+
+        for user in get_user_model().objects.all()[:3]:
+            self.assertTrue(user.check_password('secret123'))
+
+    def test_command(self):
+        """Prueba el comando generate_data"""
+        out = StringIO()
+        call_command('generate_data', users=3, recipes=10, stdout=out)
+
+        self.assertEqual(Recipe.objects.count(), 10)
+        self.assertIn('10 recetas', out.getvalue())
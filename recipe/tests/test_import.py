@@ -0,0 +1,100 @@
+import json
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient
+from recipe import importer
+
+IMPORT_URL = reverse('recipe:recipe-import')
+
+
+def ndjson(*lines):
+    return '\n'.join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    )
+
+
+class RecipeImportTest(TestCase):
+    """Prueba la importacion NDJSON de recetas"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+
+    def post(self, body):
+        res = self.client.post(IMPORT_URL, body, content_type='application/x-ndjson')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        content = b''.join(res.streaming_content).decode()
+
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_import_recipes(self):
+        """Prueba importar recetas con sus relaciones"""
+        results = self.post(ndjson(
+            {'title': 'Soup', 'price': '4.50',
+             'tags': [self.tag.id], 'ingredients': [self.ingredient.id]},
+            {'title': 'Salad', 'price': 3},
+        ))
+
+        self.assertEqual([r['line'] for r in results], [1, 2])
+        soup = Recipe.objects.get(id=results[0]['id'])
+        self.assertEqual(soup.user, self.user)
+        self.assertEqual(soup.price, Decimal('4.50'))
+        self.assertEqual(list(soup.tags.all()), [self.tag])
+        self.assertEqual(list(soup.ingredients.all()), [self.ingredient])
+        salad = Recipe.objects.get(id=results[1]['id'])
+        self.assertEqual(salad.tags.count(), 0)
+
+    def test_invalid_lines_reported(self):
+        """Prueba que las lineas invalidas se reporten sin frenar el resto"""
+        other = get_user_model().objects.create_user('other@test.com', 'password')
+        foreign_tag = Tag.objects.create(user=other, name='Foreign')
+        results = self.post(ndjson(
+            '{not json',
+            {'title': 'No price'},
+            '',
+            {'title': 'Foreign tag', 'price': 1, 'tags': [foreign_tag.id, 999]},
+            {'title': 'Ok', 'price': 1},
+        ))
+
+        self.assertEqual([r['line'] for r in results], [1, 2, 4, 5])
+        self.assertIn('non_field_errors', results[0]['errors'])
+        self.assertIn('price', results[1]['errors'])
+        self.assertEqual(len(results[2]['errors']['tags']), 2)
+        self.assertIn('id', results[3])
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_import_batches_queries(self):
+        """Prueba que las consultas dependan de los bloques y no de las lineas"""
+        body = ndjson(*[
+            {'title': f'r{i}', 'price': 1,
+             'tags': [self.tag.id], 'ingredients': [self.ingredient.id]}
+            for i in range(50)
+        ])
+
+        # ids de tags e ingredientes + recetas + dos tablas intermedias +
+        # indice de busqueda + estadisticas de precio de tags e
+        # ingredientes, dentro de un savepoint por estar el test en una
+        # transaccion
+        with self.assertNumQueries(10):
+            results = list(importer.import_recipes(body.encode().splitlines(), self.user))
+
+        self.assertEqual(len(results), 50)
+        self.assertEqual(Recipe.tags.through.objects.count(), 50)
+
+    def test_import_invalidates_cache(self):
+        """Prueba que el listado muestre las recetas importadas"""
+        self.client.get(reverse('recipe:recipe-list'))
+        self.post(ndjson({'title': 'Soup', 'price': 1}))
+
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        self.assertEqual(len(res.data['results']), 1)
@@ -40,7 +40,7 @@ class PrivateIngredients(TestCase):
         ingredient = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredient, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Prueba que los ingredientes sean del usuario"""
@@ -53,8 +53,8 @@ class PrivateIngredients(TestCase):
 
         res = self.client.get(INGREDIENTS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
     
     def test_create_tag(self):
         """prueba crear ingredientes"""
@@ -72,4 +72,27 @@ class PrivateIngredients(TestCase):
         payload = {'name': ''}
         res = self.client.post(INGREDIENTS_URL, payload)
 
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create(self):
+        """Prueba crear varios ingredientes con un solo INSERT"""
+        payload = [{'name': 'b'}, {'name': 'a'}, {'name': 'c'}]
+
+        with self.assertNumQueries(1):
+            res = self.client.post(INGREDIENTS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        names = [item['name'] for item in res.data]
+        self.assertEqual(names, ['b', 'a', 'c'])
+        for item in res.data:
+            obj = Ingredient.objects.get(id=item['id'])
+            self.assertEqual(obj.name, item['name'])
+            self.assertEqual(obj.user, self.user)
+
+    def test_bulk_create_invalid(self):
+        """Prueba que un elemento invalido cancele toda la creacion"""
+        payload = [{'name': 'ok'}, {'name': ''}]
+        res = self.client.post(INGREDIENTS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ingredient.objects.exists())
@@ -0,0 +1,113 @@
+import json
+from base64 import b64encode
+from urllib.parse import urlencode
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def encode_cursor(position):
+    """Arma un cursor como los de CursorPagination con la posicion dada"""
+    query = urlencode({'p': json.dumps(position)})
+    return b64encode(query.encode()).decode()
+
+
+class KeysetPaginationTest(TestCase):
+    """Prueba la paginacion por cursor de los listados"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, key='next'):
+        """Recorre todas las paginas y retorna los ids en orden"""
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in res.data['results'])
+            url = res.data[key]
+
+        return ids
+
+    def test_tags_pages_cover_all_rows(self):
+        """Prueba que las paginas respeten el orden con nombres repetidos"""
+        for name in ['b', 'a', 'b', 'c', 'b', 'a', 'c']:
+            Tag.objects.create(user=self.user, name=name)
+
+        ids = self.walk(TAGS_URL + '?page_size=2')
+
+        expected = Tag.objects.order_by('-name', 'id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_previous_link(self):
+        """Prueba volver a la pagina anterior"""
+        for i in range(5):
+            Recipe.objects.create(user=self.user, title=f'r{i}', price=1)
+
+        first = self.client.get(RECIPES_URL + '?page_size=2')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_cursor_stable_after_insert(self):
+        """Prueba que un cursor siga siendo valido al insertar filas"""
+        for name in ['d', 'c', 'b', 'a']:
+            Tag.objects.create(user=self.user, name=name)
+
+        first = self.client.get(TAGS_URL + '?page_size=2')
+        Tag.objects.create(user=self.user, name='e')
+        Tag.objects.create(user=self.user, name='bb')
+        second = self.client.get(first.data['next'])
+
+        names = [item['name'] for item in second.data['results']]
+        self.assertEqual(names, ['bb', 'b'])
+
+    def test_no_count_query(self):
+        """Prueba que no se ejecute COUNT ni OFFSET"""
+        for i in range(3):
+            Tag.objects.create(user=self.user, name=f'tag {i}')
+
+        first = self.client.get(TAGS_URL + '?page_size=1')
+        with self.assertNumQueries(1) as ctx:
+            self.client.get(first.data['next'])
+
+        sql = ctx.captured_queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_invalid_cursor(self):
+        """Prueba que un cursor invalido retorne 404"""
+        res = self.client.get(TAGS_URL + '?cursor=cD14')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_wrong_types(self):
+        """Prueba que un cursor con valores de otro tipo retorne 404"""
+        positions = (
+            [{'a': 1}, 1],
+            ['Vegan', [1]],
+            ['Vegan', 'one'],
+            ['Vegan', None],
+            ['Vegan', True],
+            [None, 1],
+        )
+        for position in positions:
+            with self.subTest(position=position):
+                res = self.client.get(TAGS_URL, {'cursor': encode_cursor(position)})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(RECIPES_URL, {'cursor': encode_cursor([{'id': 1}])})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
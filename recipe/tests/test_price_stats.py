@@ -0,0 +1,159 @@
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient, TagPriceStats
+from recipe import importer, stats
+
+TAG_STATS_URL = reverse('recipe:tag-price-stats')
+INGREDIENT_STATS_URL = reverse('recipe:ingredient-price-stats')
+
+
+class PriceStatsTest(TestCase):
+    """Prueba las estadisticas de precio por tag e ingrediente"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.quick = Tag.objects.create(user=self.user, name='Quick')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+
+    def create_recipe(self, price, tags=(), ingredients=()):
+        recipe = Recipe.objects.create(user=self.user, title='Recipe', price=price)
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+        return recipe
+
+    def tag_stats(self):
+        res = self.client.get(TAG_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {row['name']: row for row in res.json()['results']}
+
+    def assertConsistent(self):
+        for kind in stats.RELATIONS:
+            self.assertEqual(stats.compare(kind), [])
+
+    def test_stats_endpoint(self):
+        """Prueba count, minimo, maximo y promedio por tag"""
+        self.create_recipe('5.00', tags=[self.vegan])
+        self.create_recipe('2.50', tags=[self.vegan, self.quick])
+
+        result = self.tag_stats()
+
+        self.assertEqual(result['Vegan'], {
+            'id': self.vegan.id, 'name': 'Vegan', 'count': 2,
+            'min': '2.50', 'max': '5.00', 'average': '3.75',
+        })
+        self.assertEqual(result['Quick']['count'], 1)
+
+    def test_stats_without_recipes(self):
+        """Prueba que un tag sin recetas tenga count 0"""
+        self.assertEqual(self.tag_stats()['Vegan'], {
+            'id': self.vegan.id, 'name': 'Vegan', 'count': 0,
+            'min': None, 'max': None, 'average': None,
+        })
+
+    def test_stats_ingredients(self):
+        """Prueba el endpoint de ingredientes"""
+        self.create_recipe('4.00', ingredients=[self.salt])
+
+        res = self.client.get(INGREDIENT_STATS_URL)
+
+        self.assertEqual(res.json()['results'][0]['average'], '4.00')
+
+    def test_stats_limited_to_user(self):
+        """Prueba que solo se vean los tags propios"""
+        other = get_user_model().objects.create_user('other@test.com', 'password')
+        Tag.objects.create(user=other, name='Other')
+
+        self.assertNotIn('Other', self.tag_stats())
+
+    def test_price_change(self):
+        """Prueba mover el precio de una receta, incluido el extremo"""
+        recipe = self.create_recipe('9.00', tags=[self.vegan])
+        self.create_recipe('3.00', tags=[self.vegan])
+
+        recipe.price = Decimal('1.00')
+        recipe.save()
+
+        vegan = self.tag_stats()['Vegan']
+        self.assertEqual((vegan['min'], vegan['max']), ('1.00', '3.00'))
+        self.assertConsistent()
+
+    def test_remove_and_clear(self):
+        """Prueba quitar enlaces en ambos sentidos"""
+        first = self.create_recipe('9.00', tags=[self.vegan, self.quick])
+        second = self.create_recipe('3.00', tags=[self.vegan])
+
+        first.tags.remove(self.vegan, self.quick)
+        self.assertEqual(self.tag_stats()['Vegan']['max'], '3.00')
+        self.assertEqual(self.tag_stats()['Quick']['count'], 0)
+
+        self.vegan.recipe_set.add(first)
+        self.vegan.recipe_set.remove(second)
+        self.assertEqual(self.tag_stats()['Vegan']['min'], '9.00')
+
+        self.vegan.recipe_set.clear()
+        self.assertEqual(self.tag_stats()['Vegan']['count'], 0)
+        self.assertConsistent()
+
+    def test_remove_unlinked(self):
+        """Prueba que quitar un tag no enlazado no cambie nada"""
+        recipe = self.create_recipe('9.00', tags=[self.vegan])
+
+        recipe.tags.remove(self.quick)
+
+        self.assertEqual(self.tag_stats()['Quick']['count'], 0)
+        self.assertConsistent()
+
+    def test_delete_recipe(self):
+        """Prueba que borrar una receta la quite de las estadisticas"""
+        recipe = self.create_recipe('9.00', tags=[self.vegan], ingredients=[self.salt])
+        self.create_recipe('3.00', tags=[self.vegan])
+
+        recipe.delete()
+
+        vegan = self.tag_stats()['Vegan']
+        self.assertEqual((vegan['count'], vegan['max']), (1, '3.00'))
+        self.assertConsistent()
+
+    def test_api_and_import(self):
+        """Prueba el alta por la API y la importacion en bloque"""
+        self.client.post(reverse('recipe:recipe-list'), {
+            'title': 'Soup', 'price': '4.00',
+            'tags': [self.vegan.id], 'ingredients': [self.salt.id],
+        }, format='json')
+        line = f'{{"title": "Pie", "price": 2, "tags": [{self.vegan.id}]}}'.encode()
+        list(importer.import_recipes([line], self.user))
+
+        vegan = self.tag_stats()['Vegan']
+        self.assertEqual((vegan['count'], vegan['average']), (2, '3.00'))
+        self.assertConsistent()
+
+    def test_reads_constant_queries(self):
+        """Prueba que leer no dependa de la cantidad de recetas"""
+        for _ in range(20):
+            self.create_recipe('1.00', tags=[self.vegan, self.quick])
+
+        with self.assertNumQueries(1):
+            self.client.get(TAG_STATS_URL)
+
+    def test_recompute_command(self):
+        """Prueba detectar y corregir diferencias con el comando"""
+        self.create_recipe('5.00', tags=[self.vegan])
+        TagPriceStats.objects.update(count=7)
+
+        with self.assertRaises(CommandError):
+            call_command('recompute_price_stats', check=True, stdout=StringIO())
+        call_command('recompute_price_stats', stdout=StringIO())
+
+        self.assertEqual(self.tag_stats()['Vegan']['count'], 1)
+        call_command('recompute_price_stats', check=True, stdout=StringIO())
@@ -0,0 +1,73 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import get_cache
+from recipe.tests.test_recipe_queries import RECIPE_LIST_QUERIES
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class FastListTest(TestCase):
+    """Prueba que el listado rapido sea identico al del serializador"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        tags = [Tag.objects.create(user=self.user, name=n) for n in ('b', 'ñ', 'a', 'b')]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=n) for n in ('salt', 'oil')
+        ]
+        for i, price in enumerate(['1', '2.5', '999.99', '0.1']):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'recipe "{i}"', price=price, link=f'l{i}'
+            )
+            # se agregan en distinto orden que los ids
+            recipe.tags.add(*reversed(tags[:i + 1]))
+            recipe.ingredients.add(*reversed(ingredients[:i % 3]))
+
+    def assertSameOutput(self, url):
+        responses = []
+        for fast in (False, True):
+            get_cache().clear()
+            with override_settings(FAST_LIST_RESPONSES=fast):
+                responses.append(self.client.get(url))
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].content, responses[1].content)
+
+        return responses[1]
+
+    def test_recipes_identical(self):
+        """Prueba el listado de recetas"""
+        res = self.assertSameOutput(RECIPES_URL)
+
+        self.assertEqual(len(res.json()['results']), 4)
+
+    def test_recipes_pages_identical(self):
+        """Prueba una pagina intermedia de recetas"""
+        first = self.client.get(RECIPES_URL + '?page_size=2')
+
+        self.assertSameOutput(first.json()['next'])
+
+    def test_tags_identical(self):
+        """Prueba el listado de tags"""
+        self.assertSameOutput(TAGS_URL)
+        self.assertSameOutput(TAGS_URL + '?page_size=1')
+
+    def test_ingredients_identical(self):
+        """Prueba el listado de ingredientes"""
+        self.assertSameOutput(INGREDIENTS_URL)
+
+    def test_recipe_queries(self):
+        """Prueba que el listado rapido use las mismas consultas"""
+        get_cache().clear()
+
+        with self.assertNumQueries(RECIPE_LIST_QUERIES):
+            self.client.get(RECIPES_URL)
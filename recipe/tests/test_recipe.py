@@ -1,3 +1,5 @@
+import json
+from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -50,7 +52,7 @@ class PublicRecipeApiTest(TestCase):
         recipe = Recipe.objects.all().order_by('id')
         serializer = RecipeSerializer(recipe, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
     
     def test_recipes_limited_to_user(self):
         """PRueba que las recetas sean del usuario"""
@@ -67,8 +69,8 @@ class PublicRecipeApiTest(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)        
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_detail(self):
         """Prueba ver detalles de receta"""
@@ -127,4 +129,67 @@ class PublicRecipeApiTest(TestCase):
         ingredients = recipe.ingredients.all()
         self.assertEqual(ingredients.count(), 2)
         self.assertIn(ingredient1, ingredients)
-        self.assertIn(ingredient2, ingredients)
\ No newline at end of file
+        self.assertIn(ingredient2, ingredients)
+
+    def test_create_recipe_missing_tags(self):
+        """Prueba que se reporten juntos todos los tags inexistentes"""
+        tag = sample_tag(user=self.user)
+        payload = {
+            'title': 'Test recipe',
+            'tags': [tag.id, 998, 999],
+            'price': 10.00
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['tags']), 2)
+        self.assertIn('998', res.data['tags'][0])
+        self.assertIn('999', res.data['tags'][1])
+
+    def test_create_recipe_foreign_tag(self):
+        """Prueba que no se puedan usar tags de otro usuario"""
+        user2 = get_user_model().objects.create_user(
+           'test2@test.com',
+            'password'
+        )
+        payload = {
+            'title': 'Test recipe',
+            'tags': [sample_tag(user=user2).id],
+            'price': 10.00
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_update_recipe_ingredients(self):
+        """Prueba actualizar los ingredientes de una receta"""
+        recipe = sample_recipe(user=self.user)
+        recipe.ingredients.add(sample_ingredient(user=self.user))
+        ingredient = sample_ingredient(user=self.user, name='salt')
+        payload = {'ingredients': [ingredient.id]}
+
+        res = self.client.patch(detail_url(recipe.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(recipe.ingredients.all()), [ingredient])
+
+    def test_create_recipe_json_price(self):
+        """Prueba que el precio enviado en JSON conserve sus decimales"""
+        payload = {'title': 'Test recipe', 'price': 10.10, 'tags': [], 'ingredients': []}
+        res = self.client.post(
+            RECIPES_URL, json.dumps(payload), content_type='application/json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['price'], '10.10')
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.price, Decimal('10.10'))
+
+    def test_browsable_api(self):
+        """Prueba que la API navegable siga funcionando"""
+        sample_recipe(user=self.user)
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT='text/html')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertContains(res, 'sample recipe')
@@ -0,0 +1,100 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+# Consultas esperadas: recetas + precarga de ingredientes + precarga de tags
+RECIPE_LIST_QUERIES = 3
+RECIPE_DETAIL_QUERIES = 3
+# Validacion de tags e ingredientes + INSERT de la receta + set() de cada
+# relacion (3 consultas) + lectura de las relaciones para la respuesta +
+# una actualizacion del indice de busqueda por el INSERT y cada relacion +
+# una actualizacion de las estadisticas de precio por relacion
+RECIPE_CREATE_QUERIES = 16
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def seed_recipes(user, count, relations=3):
+    """Crea recetas con tags e ingredientes asociados"""
+    tags = [Tag.objects.create(user=user, name=f'tag {i}') for i in range(relations)]
+    ingredients = [
+        Ingredient.objects.create(user=user, name=f'ingredient {i}')
+        for i in range(relations)
+    ]
+    recipes = []
+    for i in range(count):
+        recipe = Recipe.objects.create(user=user, title=f'recipe {i}', price=5)
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+        recipes.append(recipe)
+
+    return recipes
+
+
+class RecipeQueryBudgetTest(TestCase):
+    """Prueba que las consultas no crezcan con la cantidad de recetas"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_queries_constant(self):
+        """Prueba que el listado use una cantidad fija de consultas"""
+        for count in (1, 25):
+            Recipe.objects.all().delete()
+            seed_recipes(self.user, count)
+
+            with self.assertNumQueries(RECIPE_LIST_QUERIES):
+                res = self.client.get(RECIPES_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['results']), count)
+            self.assertEqual(len(res.data['results'][0]['tags']), 3)
+            self.assertEqual(len(res.data['results'][0]['ingredients']), 3)
+
+    def test_detail_queries_constant(self):
+        """Prueba que el detalle use una cantidad fija de consultas"""
+        for relations in (1, 25):
+            Recipe.objects.all().delete()
+            recipe = seed_recipes(self.user, 1, relations=relations)[0]
+
+            with self.assertNumQueries(RECIPE_DETAIL_QUERIES):
+                res = self.client.get(detail_url(recipe.id))
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['tags']), relations)
+            self.assertEqual(len(res.data['ingredients']), relations)
+
+    def test_create_validation_queries_constant(self):
+        """Prueba que validar relaciones no dependa de cuantas se envien"""
+        queries = []
+        for count in (1, 40):
+            tags = [Tag.objects.create(user=self.user, name=f't{i}') for i in range(count)]
+            ingredients = [
+                Ingredient.objects.create(user=self.user, name=f'i{i}')
+                for i in range(count)
+            ]
+            payload = {
+                'title': 'recipe',
+                'price': 5,
+                'tags': [tag.id for tag in tags],
+                'ingredients': [ingredient.id for ingredient in ingredients],
+            }
+
+            with self.assertNumQueries(RECIPE_CREATE_QUERIES):
+                res = self.client.post(RECIPES_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            recipe = Recipe.objects.get(id=res.data['id'])
+            self.assertEqual(recipe.tags.count(), count)
+            self.assertEqual(recipe.ingredients.count(), count)
@@ -0,0 +1,231 @@
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Recipe, Tag, Ingredient, RecipeSearch
+from recipe import importer, search
+from recipe.cache import get_cache
+from recipe.pagination import RecipeKeysetPagination
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class RecipeSearchTest(TestCase):
+    """Prueba la busqueda de recetas con ?q="""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, text, **params):
+        res = self.client.get(RECIPES_URL, {'q': text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json()
+
+    def titles(self, text):
+        return [item['title'] for item in self.search(text)['results']]
+
+    def test_search_title(self):
+        """Prueba buscar por titulo"""
+        Recipe.objects.create(user=self.user, title='Tomato soup', price=5)
+        Recipe.objects.create(user=self.user, title='Bread', price=2)
+
+        self.assertEqual(self.titles('soup'), ['Tomato soup'])
+
+    def test_search_related_names(self):
+        """Prueba buscar por nombres de ingredientes y tags"""
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        recipe.ingredients.add(Ingredient.objects.create(user=self.user, name='Garlic'))
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        self.assertEqual(self.titles('garlic'), ['Soup'])
+        self.assertEqual(self.titles('vegan'), ['Soup'])
+
+    def test_search_prefix_and_accents(self):
+        """Prueba la ultima palabra como prefijo y sin acentos"""
+        Recipe.objects.create(user=self.user, title='Café con leche', price=2)
+
+        self.assertEqual(self.titles('cafe'), ['Café con leche'])
+        self.assertEqual(self.titles('cafe lec'), ['Café con leche'])
+
+    def test_search_limited_to_user(self):
+        """Prueba que solo se encuentren recetas propias"""
+        user2 = get_user_model().objects.create_user('other@test.com', 'password')
+        Recipe.objects.create(user=user2, title='Soup', price=5)
+
+        self.assertEqual(self.titles('soup'), [])
+
+    def test_search_ranks_title_first(self):
+        """Prueba que una coincidencia en el titulo pese mas"""
+        by_ingredient = Recipe.objects.create(user=self.user, title='Stew', price=5)
+        by_ingredient.ingredients.add(Ingredient.objects.create(user=self.user, name='Lentils'))
+        Recipe.objects.create(user=self.user, title='Lentils', price=3)
+
+        self.assertEqual(self.titles('lentils'), ['Lentils', 'Stew'])
+
+    def test_search_pagination(self):
+        """Prueba recorrer los resultados por paginas sin repetidos"""
+        for i in range(5):
+            Recipe.objects.create(user=self.user, title=f'Soup {i}', price=i)
+        Recipe.objects.create(user=self.user, title='Bread', price=1)
+
+        ids = []
+        page = self.search('soup', page_size=2)
+        while True:
+            ids += [item['id'] for item in page['results']]
+            if not page['next']:
+                break
+            page = self.client.get(page['next']).json()
+
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    def search_ids(self, text, between_pages=None, **params):
+        """Recorre todas las paginas; between_pages corre tras la primera"""
+        page = self.search(text, **params)
+        ids = [item['id'] for item in page['results']]
+        if between_pages is not None:
+            between_pages()
+        while page['next']:
+            page = self.client.get(page['next']).json()
+            ids += [item['id'] for item in page['results']]
+
+        return ids
+
+    def test_search_pages_survive_reordering(self):
+        """Prueba que si el orden cambia entre paginas no se repitan ni salteen resultados"""
+        titles = (
+            'Soup',
+            'Soup soup with rice',
+            'Soup soup soup with garlic onion pepper cheese lemon honey ginger curry',
+            'Tomato soup and beans',
+        )
+        expected = [Recipe.objects.create(user=self.user, title=title, price=1).id for title in titles]
+        # Con la mayoria de las filas coincidiendo bm25 anula el idf
+        for i in range(10):
+            Recipe.objects.create(user=self.user, title=f'Bread {i}', price=i)
+        user2 = get_user_model().objects.create_user('other@test.com', 'password')
+
+        def insert():
+            # Los documentos largos cambian el largo promedio del indice y
+            # con el los ranks: 'Soup' pasa del primer al tercer lugar
+            for _ in range(30):
+                Recipe.objects.create(user=user2, title=' '.join(['word'] * 40), price=1)
+            Recipe.objects.create(user=self.user, title='Soup', price=1)
+
+        first = [item['id'] for item in self.search('soup', page_size=2)['results']]
+        ids = self.search_ids('soup', insert, page_size=2)
+
+        self.assertEqual(first, expected[:2])
+        self.assertEqual(ids[:2], expected[:2])
+        self.assertEqual(sorted(ids), sorted(expected))
+
+    def test_search_max_rows(self):
+        """Prueba que la busqueda se recorra hasta max_snapshot_rows filas"""
+        for i in range(5):
+            Recipe.objects.create(user=self.user, title=f'Soup {i}', price=i)
+
+        with mock.patch.object(RecipeKeysetPagination, 'max_snapshot_rows', 3):
+            ids = self.search_ids('soup', page_size=2)
+
+        self.assertEqual(len(ids), 3)
+
+    def test_search_previous_page(self):
+        """Prueba volver a la pagina anterior de una busqueda"""
+        for i in range(4):
+            Recipe.objects.create(user=self.user, title=f'Soup {i}', price=i)
+        first = self.search('soup', page_size=2)
+
+        second = self.client.get(first['next']).json()
+        previous = self.client.get(second['previous']).json()
+
+        self.assertIsNone(second['next'])
+        self.assertEqual(previous['results'], first['results'])
+
+    def test_search_invalid_cursor(self):
+        """Prueba que un cursor de otro listado no sirva para la busqueda"""
+        for i in range(3):
+            Recipe.objects.create(user=self.user, title=f'Soup {i}', price=i)
+        listed = self.client.get(RECIPES_URL, {'page_size': 2}).json()
+        cursor = parse_qs(urlparse(listed['next']).query)['cursor'][0]
+
+        res = self.client.get(RECIPES_URL, {'q': 'soup', 'cursor': cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_ignores_query_syntax(self):
+        """Prueba que los operadores de FTS5 no rompan la consulta"""
+        Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+        self.assertEqual(self.titles('"soup*) ('), ['Soup'])
+        self.assertEqual(self.titles('"()*'), [])
+
+    def test_index_follows_changes(self):
+        """Prueba que el indice siga los cambios de recetas y relaciones"""
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        tag.recipe_set.add(recipe)
+        self.assertEqual(self.titles('vegan'), ['Soup'])
+
+        tag.name = 'Spicy'
+        tag.save()
+        self.assertEqual(self.titles('vegan'), [])
+        self.assertEqual(self.titles('spicy'), ['Soup'])
+
+        tag.recipe_set.clear()
+        self.assertEqual(self.titles('spicy'), [])
+
+        recipe.title = 'Stew'
+        recipe.save()
+        self.assertEqual(self.titles('soup'), [])
+        self.assertEqual(self.titles('stew'), ['Stew'])
+
+        recipe.delete()
+        self.assertFalse(RecipeSearch.objects.exists())
+
+    def test_deleting_ingredient_reindexes(self):
+        """Prueba que borrar un ingrediente lo quite del indice"""
+        recipe = Recipe.objects.create(user=self.user, title='Soup', price=5)
+        ingredient = Ingredient.objects.create(user=self.user, name='Garlic')
+        recipe.ingredients.add(ingredient)
+
+        ingredient.delete()
+
+        self.assertEqual(self.titles('garlic'), [])
+
+    def test_import_indexes_recipes(self):
+        """Prueba que la importacion en bloque indexe las recetas"""
+        lines = [b'{"title": "Imported soup", "price": 1}']
+        list(importer.import_recipes(lines, self.user))
+
+        self.assertEqual(self.titles('imported'), ['Imported soup'])
+
+    def test_rebuild_command(self):
+        """Prueba que el comando regenere el indice completo"""
+        Recipe.objects.create(user=self.user, title='Soup', price=5)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM core_recipe_search')
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual(self.titles('soup'), ['Soup'])
+
+    def test_rebuild_failure_keeps_index(self):
+        """Prueba que un error al regenerar deje el indice anterior"""
+        Recipe.objects.create(user=self.user, title='Soup', price=5)
+
+        with mock.patch.object(search, 'insert_sql', return_value='INSERT INTO missing_table VALUES (1)'):
+            with self.assertRaises(DatabaseError):
+                search.rebuild()
+
+        self.assertEqual(self.titles('soup'), ['Soup'])
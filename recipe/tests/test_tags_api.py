@@ -40,7 +40,7 @@ class PrivateTagsApiTest(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """PRueba que los tags sean del usuario"""
@@ -53,8 +53,8 @@ class PrivateTagsApiTest(TestCase):
 
         res = self.client.get(TAGS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tag(self):
         """prueba crear tags"""
@@ -72,4 +72,27 @@ class PrivateTagsApiTest(TestCase):
         payload = {'name': ''}
         res = self.client.post(TAGS_URL, payload)
 
-        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create(self):
+        """Prueba crear varios tags con un solo INSERT"""
+        payload = [{'name': 'b'}, {'name': 'a'}, {'name': 'c'}]
+
+        with self.assertNumQueries(1):
+            res = self.client.post(TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        names = [item['name'] for item in res.data]
+        self.assertEqual(names, ['b', 'a', 'c'])
+        for item in res.data:
+            obj = Tag.objects.get(id=item['id'])
+            self.assertEqual(obj.name, item['name'])
+            self.assertEqual(obj.user, self.user)
+
+    def test_bulk_create_invalid(self):
+        """Prueba que un elemento invalido cancele toda la creacion"""
+        payload = [{'name': 'ok'}, {'name': ''}]
+        res = self.client.post(TAGS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.exists())
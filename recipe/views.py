@@ -1,42 +1,124 @@
 from multiprocessing import reduction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import IsAuthenticated
 from core.models import Tag, Ingredient, Recipe
-from recipe import serializers
+from core.metrics import SerializerMetricsMixin, serializer_timer
+from core.routers import ReplicaReadMixin
+from core.renderers import dumps
+from recipe import serializers, importer, exporter, cache, search, filters, stats, fieldsets
+from recipe.cache import CachedResponseMixin, ConditionalGetMixin
+from recipe.fieldsets import SparseFieldsetMixin
+from recipe.pagination import NameKeysetPagination, RecipeKeysetPagination
+from recipe.projections import FastListMixin, recipe_rows
+from recipe.renderers import NDJSONRenderer, CSVRenderer
+from user.authentication import CachedTokenAuthentication
 
 
-class BasicAttrViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
+class BasicAttrViewSet(ReplicaReadMixin, ConditionalGetMixin, FastListMixin, SparseFieldsetMixin, SerializerMetricsMixin, viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
     """Viewsets base"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = NameKeysetPagination
+    bulk_max_items = 1000
     
     def get_queryset(self):
         """retorna objetos para el usuario auntenticado"""
         return self.queryset.filter(user=self.request.user).order_by('-name')
+
+    def get_serializer(self, *args, **kwargs):
+        """Acepta una lista de elementos para crearlos en bloque"""
+        if isinstance(kwargs.get('data'), list):
+            kwargs.update(many=True, allow_empty=False, max_length=self.bulk_max_items)
+
+        return super().get_serializer(*args, **kwargs)
+
+    def get_list_rows(self, rows):
+        return fieldsets.project(rows, self.sparse_fields)
     
     def perform_create(self, serializer):
         """crea nuevo elemento"""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'], url_path='price-stats', url_name='price-stats')
+    def price_stats(self, request):
+        """Cantidad, minimo, maximo y promedio de precio de sus recetas"""
+        queryset = stats.with_price_stats(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        with serializer_timer():
+            rows = stats.stats_rows(page)
+
+        return self.get_paginated_response(rows)
+
 
 class TagViewSet(BasicAttrViewSet):
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    version_collection = cache.TAGS
 
 class IngredientViewSet(BasicAttrViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    version_collection = cache.INGREDIENTS
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, FastListMixin, SparseFieldsetMixin, SerializerMetricsMixin, viewsets.ModelViewSet):
     serializer_class = serializers.RecipeSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipeKeysetPagination
+    version_collection = cache.RECIPES
+    list_values = ('id', 'title', 'price', 'link')
 
     def get_queryset(self):
         """retorna objetos para el usuario auntenticado"""
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ('list', 'export'):
+            queryset = filters.filter_recipes(queryset, self.request.query_params)
+        if self.search_query:
+            queryset = search.search_recipes(queryset, self.search_query, self.request.user.pk)
+        if self.sparse_fields is not None:
+            queryset = queryset.only(*fieldsets.recipe_columns(self.list_values, self.sparse_fields))
+
+        return queryset.prefetch_related(*self.get_prefetches())
+
+    @property
+    def search_query(self):
+        """Texto de ?q= en el listado"""
+        if self.action != 'list':
+            return ''
+
+        return search.get_query(self.request)
+
+    @property
+    def snapshot_ordering(self):
+        """Las busquedas se paginan por relevancia"""
+        return search.ORDERING if self.search_query else None
+
+    def get_list_values(self):
+        values = fieldsets.recipe_columns(self.list_values, self.sparse_fields)
+        if self.search_query:
+            return (*values, 'rank')
+
+        return values
+
+    def get_prefetches(self):
+        """Precarga las relaciones que necesita el serializador de la accion"""
+        if self.action == 'retrieve':
+            return fieldsets.prefetches_for(('ingredients', 'tags'), self.sparse_fields)
+
+        # El serializador de listado solo usa las claves primarias, en el
+        # mismo orden que arma recipe_rows
+        return fieldsets.prefetches_for((
+            Prefetch('ingredients', queryset=Ingredient.objects.only('id').order_by('id')),
+            Prefetch('tags', queryset=Tag.objects.only('id').order_by('id')),
+        ), self.sparse_fields)
+
+    def get_list_rows(self, rows):
+        return recipe_rows(rows, self.sparse_fields)
 
     def get_serializer_class(self):
         """Retorna el serializador apropiado"""
@@ -47,4 +129,31 @@ class RecipeViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """crea nuevo elemento"""
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_recipes(self, request):
+        """Importa recetas desde un cuerpo NDJSON, una receta por linea"""
+        if request.stream is None:
+            raise ParseError('Empty body')
+
+        results = importer.import_recipes(request.stream, request.user)
+
+        return StreamingHttpResponse(
+            (dumps(result) + b'\n' for result in results),
+            content_type='application/x-ndjson',
+        )
+
+    @action(detail=False, methods=['get'], renderer_classes=(NDJSONRenderer, CSVRenderer))
+    def export(self, request):
+        """Exporta todas las recetas del usuario en NDJSON o CSV"""
+        renderer = request.accepted_renderer
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+
+        response = StreamingHttpResponse(
+            renderer.render_stream(exporter.export_rows(queryset)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="recipes.{renderer.format}"'
+
+        return response
@@ -0,0 +1,6 @@
+from user.async_views import async_urlpatterns
+from user.urls import urlpatterns as sync_urlpatterns
+
+app_name = 'user'
+
+urlpatterns = async_urlpatterns(sync_urlpatterns)
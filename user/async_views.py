@@ -0,0 +1,74 @@
+import orjson
+from asgiref.sync import sync_to_async
+from django.urls import URLPattern
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from recipe.async_views import JSON, accepts_json, error_response, json_response
+from user import login
+from user.serializers import CredentialsSerializer, INVALID_CREDENTIALS
+
+FORM = 'application/x-www-form-urlencoded'
+
+
+def get_data(request):
+    if request.content_type == FORM:
+        return request.POST.dict()
+
+    try:
+        return orjson.loads(request.body)
+    except orjson.JSONDecodeError as exc:
+        raise exceptions.ParseError(f'JSON parse error - {exc}')
+
+
+async def create_token(request):
+    """Igual que CreateTokenView, sin bloquear el event loop durante el hash"""
+    serializer = CredentialsSerializer(data=get_data(request))
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    user = await login.acheck_credentials(request, **serializer.validated_data)
+    if user is None:
+        return json_response(
+            {'non_field_errors': [INVALID_CREDENTIALS]}, status.HTTP_400_BAD_REQUEST
+        )
+
+    token, _ = await Token.objects.aget_or_create(user=user)
+
+    return json_response({'token': token.key})
+
+
+def async_token_view(fallback):
+    """Atiende los logins JSON y de formulario; el resto va a la vista DRF"""
+    sync_fallback = sync_to_async(fallback)
+
+    async def view(request, *args, **kwargs):
+        if (
+            request.method != 'POST'
+            or request.content_type not in (JSON, FORM)
+            or not accepts_json(request)
+        ):
+            return await sync_fallback(request, *args, **kwargs)
+
+        try:
+            return await create_token(request)
+        except exceptions.APIException as exc:
+            return error_response(exc)
+
+    view.csrf_exempt = True
+    view.fallback = fallback
+
+    return view
+
+
+def async_urlpatterns(patterns):
+    """Cambia la vista del token por su version asincrona"""
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_token_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if pattern.name == 'token' else pattern
+        for pattern in patterns
+    ]
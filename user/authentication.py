@@ -0,0 +1,121 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from core.counters import get_counters
+
+TOKEN_CACHE = 'tokens'
+
+
+def get_cache():
+    return caches[TOKEN_CACHE]
+
+
+def token_cache_key(key):
+    """Clave de cache sin exponer el token en texto plano"""
+    return 'authtoken:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def revocation_key(key):
+    """Contador compartido que cambia cada vez que se revoca el token"""
+    return 'revoked:' + token_cache_key(key)
+
+
+def forget_tokens(*keys):
+    """Invalida tokens del cache de autenticacion en todos los procesos
+
+    El cache es por proceso: el contador de revocacion, compartido, hace
+    que los demas procesos descarten su copia en la siguiente peticion.
+    """
+    counters = get_counters()
+    for key in keys:
+        counters.incr(revocation_key(key))
+    get_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+def get_cached_token(key):
+    """Retorna (token cacheado o None, version de revocacion actual)
+
+    La version se lee antes de consultar la base: si el token se revoca
+    durante la consulta, lo que se guarde con esa version ya no vale.
+    """
+    version = get_counters().get(revocation_key(key))
+    cached = get_cache().get(token_cache_key(key))
+    if cached is not None and cached[1] == version:
+        return cached[0], version
+
+    return None, version
+
+
+def cache_token(key, token, version):
+    get_cache().set(token_cache_key(key), (token, version), settings.TOKEN_CACHE_TIMEOUT)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Autenticacion por token que cachea el token con su usuario
+
+    Evita la consulta Token + User en cada peticion. Las entradas se
+    invalidan en todos los procesos al borrar el token o al guardar el
+    usuario (por ejemplo al desactivarlo) y expiran tras
+    TOKEN_CACHE_TIMEOUT segundos.
+    """
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        return self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        """Version asincrona de authenticate para las vistas nativas"""
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        token, version = get_cached_token(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+            cache_token(key, token, version)
+
+        return (token.user, token)
+
+    def get_key(self, request):
+        """Extrae el token del encabezado Authorization, igual que DRF"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. No credentials provided.')
+            )
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain spaces.')
+            )
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    def authenticate_credentials(self, key):
+        token, version = get_cached_token(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache_token(key, token, version)
+
+        return (token.user, token)
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_login_failed
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import exceptions, status
+
+
+class LoginUnavailable(exceptions.APIException):
+    """La cola de verificacion de contraseñas esta llena"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again later.'
+    default_code = 'login_unavailable'
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        # El exception handler de DRF lo envia como Retry-After
+        self.wait = wait
+
+
+class BoundedExecutor:
+    """Pool de hilos que rechaza tareas cuando la cola esta llena"""
+
+    def __init__(self, workers, queue_size):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='login-hash')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def submit(self, func, *args):
+        """Retorna un Future, o None si no hay lugar"""
+        if not self.slots.acquire(blocking=False):
+            return None
+
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self.slots.release())
+
+        return future
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return BoundedExecutor(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE)
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    if setting in ('LOGIN_HASH_WORKERS', 'LOGIN_HASH_QUEUE'):
+        get_executor.cache_clear()
+
+
+def verify_password(encoded, password):
+    """Verifica la contraseña; retorna (valida, hay que rehashear)
+
+    Corre en el pool, sin tocar la base de datos. Sin usuario se hashea
+    igual para que la respuesta tarde lo mismo, como ModelBackend.
+    """
+    if encoded is None:
+        make_password(password)
+        return False, False
+
+    must_update = []
+    valid = check_password(password, encoded, setter=must_update.append)
+
+    return valid, bool(must_update)
+
+
+def submit(encoded, password):
+    future = get_executor().submit(verify_password, encoded, password)
+    if future is None:
+        raise LoginUnavailable(settings.LOGIN_RETRY_AFTER)
+
+    return future
+
+
+def find_user(email):
+    model = get_user_model()
+    try:
+        return model._default_manager.get_by_natural_key(email)
+    except model.DoesNotExist:
+        return None
+
+
+async def afind_user(email):
+    model = get_user_model()
+    try:
+        return await model._default_manager.aget(**{model.USERNAME_FIELD: email})
+    except model.DoesNotExist:
+        return None
+
+
+def finish(request, user, email, password, result):
+    """Aplica el resultado del hash: usuario valido o None"""
+    valid, must_update = result
+    if user is None or not valid or not user.is_active:
+        user_login_failed.send(
+            sender=__name__, credentials={'username': email}, request=request
+        )
+        return None, False
+
+    if must_update:
+        user.set_password(password)
+
+    return user, must_update
+
+
+def check_credentials(request, email, password):
+    """Equivale a authenticate() con ModelBackend, hasheando en el pool
+
+    El hilo de la peticion espera el resultado, pero el pool limita los
+    hashes simultaneos del proceso y el exceso se rechaza enseguida.
+    """
+    user = find_user(email)
+    result = submit(user and user.password, password).result()
+    user, must_update = finish(request, user, email, password, result)
+    if must_update:
+        user.save(update_fields=['password'])
+
+    return user
+
+
+async def acheck_credentials(request, email, password):
+    """Version asincrona: el event loop no se bloquea durante el hash"""
+    user = await afind_user(email)
+    result = await asyncio.wrap_future(submit(user and user.password, password))
+    user, must_update = finish(request, user, email, password, result)
+    if must_update:
+        await user.asave(update_fields=['password'])
+
+    return user
@@ -1,6 +1,9 @@
 from tkinter.ttk import Style
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from user import login
+
+INVALID_CREDENTIALS = 'Unable to authenticate with provided credentials'
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,24 +26,26 @@ class UserSerializer(serializers.ModelSerializer):
         
         return user
 
-class AuthTokenSerializer(serializers.Serializer):
-    """Serializador para token"""
+class CredentialsSerializer(serializers.Serializer):
+    """Campos del login, sin autenticar"""
     email = serializers.CharField()
     password = serializers.CharField(
         style = {'input_type': 'password'},
         trim_whitespace = False
     )
+
+class AuthTokenSerializer(CredentialsSerializer):
+    """Serializador para token"""
     def validate(self, attrs):
         """Validar y auntenticar usuarios"""
         email = attrs.get('email')
         password = attrs.get('password')
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,
-            password=password
+        user = login.check_credentials(
+            self.context.get('request'),
+            email,
+            password
         )
         if user is None:
-            msg = 'Unable to authenticate with provided credentials'
-            raise serializers.ValidationError(msg, code='authorization')
+            raise serializers.ValidationError(INVALID_CREDENTIALS, code='authorization')
         attrs['user'] = user
         return attrs
\ No newline at end of file
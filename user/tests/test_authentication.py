@@ -0,0 +1,116 @@
+import multiprocessing
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from user.authentication import CachedTokenAuthentication, forget_tokens, get_cache
+
+ME_URL = reverse('user:me')
+
+
+def revoke_in_child(key):
+    """Revoca el token desde otro proceso, con su propio cache local"""
+    context = multiprocessing.get_context('fork')
+    process = context.Process(target=forget_tokens, args=(key,))
+    process.start()
+    process.join()
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """Prueba la autenticacion por token cacheada"""
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='password',
+            name='name'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_token_lookup_cached(self):
+        """Prueba que el token se consulte una sola vez"""
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_deleted_token_rejected(self):
+        """Prueba que un token borrado deje de autenticar"""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_rejected(self):
+        """Prueba que un usuario desactivado deje de autenticar"""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_in_other_process(self):
+        """Prueba que una revocacion en otro worker invalide el cache local"""
+        self.client.get(ME_URL)
+        Token.objects.filter(pk=self.token.pk).delete()
+        revoke_in_child(self.token.key)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_during_lookup(self):
+        """Prueba que no se cachee un token revocado durante su consulta"""
+        lookup = TokenAuthentication.authenticate_credentials
+
+        def revoke_after_lookup(auth, key):
+            result = lookup(auth, key)
+            self.token.delete()
+            return result
+
+        with mock.patch.object(TokenAuthentication, 'authenticate_credentials', revoke_after_lookup):
+            self.client.get(ME_URL)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_update_refreshes_cache(self):
+        """Prueba que los cambios del usuario se vean en la siguiente peticion"""
+        self.client.patch(ME_URL, {'name': 'new name'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'new name')
+
+    async def test_async_authenticate_shares_cache(self):
+        """Prueba que la version asincrona use el mismo cache"""
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Token ' + self.token.key)
+        auth = CachedTokenAuthentication()
+
+        user, token = await auth.aauthenticate(request)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(auth.authenticate(request)[1].key, token.key)
+
+    async def test_async_authenticate_invalid_token(self):
+        """Prueba que la version asincrona rechace tokens invalidos"""
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION='Token invalid')
+
+        with self.assertRaises(AuthenticationFailed):
+            await CachedTokenAuthentication().aauthenticate(request)
@@ -0,0 +1,148 @@
+import threading
+from unittest import mock
+from django.test import TestCase, AsyncClient, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from user import login
+
+TOKEN_URL = reverse('user:token')
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+def block_pool(test):
+    """Ocupa el unico hilo del pool hasta el final del test"""
+    release = threading.Event()
+    future = login.get_executor().submit(release.wait)
+    # El hilo libera su lugar despues de resolver el futuro; el siguiente
+    # test usa un pool nuevo
+    test.addCleanup(login.get_executor.cache_clear)
+    test.addCleanup(future.result)
+    test.addCleanup(release.set)
+
+
+@override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0)
+class LoginTest(TestCase):
+    """Prueba la verificacion de contraseñas del login en el pool"""
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('test@test.com', 'testpass')
+        self.client = APIClient()
+        self.payload = {'email': 'test@test.com', 'password': 'testpass'}
+
+    def test_hash_runs_in_pool(self):
+        """Prueba que el hash no corra en el hilo de la peticion"""
+        threads = []
+        verify = login.verify_password
+
+        def spy(*args):
+            threads.append(threading.current_thread().name)
+            return verify(*args)
+
+        with mock.patch.object(login, 'verify_password', spy):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(threads[0].startswith('login-hash'))
+
+    def test_saturated_returns_503(self):
+        """Prueba que con la cola llena se responda 503 con Retry-After"""
+        block_pool(self)
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+    def test_unknown_user(self):
+        """Prueba que un email desconocido tambien pase por el pool"""
+        with mock.patch.object(login, 'make_password', wraps=make_password) as hashed:
+            res = self.client.post(TOKEN_URL, {'email': 'x@test.com', 'password': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        hashed.assert_called_once()
+
+    def test_inactive_user(self):
+        """Prueba que un usuario inactivo no obtenga token"""
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_HASHERS=PASSWORD_HASHERS)
+    def test_rehash_outdated_password(self):
+        """Prueba que un hash viejo se actualice al loguearse"""
+        self.user.password = make_password('testpass', hasher='md5')
+        self.user.save()
+
+        self.client.post(TOKEN_URL, self.payload)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+
+@override_settings(ROOT_URLCONF='app.async_urls', LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0)
+class AsyncLoginTest(TestCase):
+    """Prueba la vista asincrona del token"""
+    def setUp(self):
+        get_user_model().objects.create_user('test@test.com', 'testpass')
+        self.payload = {'email': 'test@test.com', 'password': 'testpass'}
+
+    async def test_create_token_json(self):
+        """Prueba el login JSON igual que la vista DRF"""
+        res = await AsyncClient().post(TOKEN_URL, self.payload, content_type='application/json')
+        drf = await AsyncClient().post(TOKEN_URL + '?format=json', self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), drf.json())
+
+    async def test_create_token_form(self):
+        """Prueba el login con un formulario"""
+        res = await AsyncClient().post(
+            TOKEN_URL, 'email=test%40test.com&password=testpass',
+            content_type='application/x-www-form-urlencoded',
+        )
+
+        self.assertIn('token', res.json())
+
+    async def test_invalid_credentials(self):
+        """Prueba el mismo error que la vista DRF"""
+        payload = {'email': 'test@test.com', 'password': 'wrong'}
+
+        res = await AsyncClient().post(TOKEN_URL, payload, content_type='application/json')
+        drf = await AsyncClient().post(TOKEN_URL + '?format=json', payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json(), drf.json())
+
+    async def test_saturated_returns_503(self):
+        """Prueba el 503 con Retry-After en la vista asincrona"""
+        block_pool(self)
+
+        res = await AsyncClient().post(TOKEN_URL, self.payload, content_type='application/json')
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+
+class BoundedExecutorTest(TestCase):
+    """Prueba el pool con cola acotada"""
+    def test_rejects_when_full(self):
+        executor = login.BoundedExecutor(workers=1, queue_size=1)
+        release = threading.Event()
+        futures = [executor.submit(release.wait) for _ in range(2)]
+
+        self.assertIsNone(executor.submit(release.wait))
+
+        release.set()
+        executor.executor.shutdown(wait=True)
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertTrue(executor.slots.acquire(blocking=False))
+        self.assertTrue(executor.slots.acquire(blocking=False))
@@ -1,9 +1,12 @@
 from user.serializers import UserSerializer, AuthTokenSerializer
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.settings import api_settings
+from core.metrics import SerializerMetricsMixin
+from core.routers import ReplicaReadMixin
+from user.authentication import CachedTokenAuthentication
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(SerializerMetricsMixin, generics.CreateAPIView):
     """ Crea un nuevo usuario """
     serializer_class = UserSerializer
 
@@ -12,10 +15,10 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
     
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ReplicaReadMixin, SerializerMetricsMixin, generics.RetrieveUpdateAPIView):
     """Maneja usuario autenticado"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):